@@ -1,15 +1,30 @@
 # main_gui.py
 from tkinter import *
 from tkinter import filedialog, messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import math
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+import os
+import sys
+import numpy as np
+import history
+import instrument
+import jobs
 import logic
+import stream
 
-selected_path = "" 
+selected_paths = []
+
+SIGNAL_FILETYPES = [
+    ("Signal Files", f"*.txt *{logic.BINARY_SIGNAL_EXT}"),
+    ("Text Files", "*.txt"),
+    ("Binary Signal Files", f"*{logic.BINARY_SIGNAL_EXT}"),
+]
 
 quantized_vals = None
 quant_error = None
+quant_idxs = None
+quant_input = None
 encoded_levels = None
 quant_levels = None
 quant_bits = None
@@ -22,16 +37,25 @@ dft_magnitude = None
 dft_phase = None
 dft_freqs = None
 dft_sampling_freq = None
+dft_spectrum = None
+dft_version = None
+dft_idxs = None
+
+spectrogram_db = None
+spectrogram_times = None
+spectrogram_freqs = None
+
+live_stream = None
 
 def show_moving_average_window():
     """Open a window to input window size for moving average."""
-    if not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
         return
 
     input_window = Toplevel(rootWin)
     input_window.title("Moving Average")
-    input_window.geometry("300x150")
+    input_window.geometry("300x200")
     input_window.resizable(False, False)
 
     Label(input_window, text="Window Size:", font=("Segoe UI", 10)).pack(pady=10)
@@ -39,21 +63,33 @@ def show_moving_average_window():
     window_entry.pack()
     window_entry.insert(0, "3")
 
+    Label(input_window, text="Alignment:", font=("Segoe UI", 10)).pack(pady=(6, 0))
+    mode_var = StringVar(value="trailing")
+    OptionMenu(input_window, mode_var, *logic.MOVING_AVERAGE_MODES).pack()
+
     def apply_moving_avg():
-        global processed_vals, processed_idxs, processed_type
         try:
             window_size = int(window_entry.get())
             if window_size <= 0:
                 raise ValueError("Window size must be positive")
             
-            result = logic.moving_average(logic.cur_vals, window_size)
-            processed_vals = result
-            processed_idxs = logic.cur_idxs[:]
-            processed_type = "moving_avg"
+            if window_size > len(logic.current):
+                raise ValueError("Window size must be <= signal length")
             
+            mode = mode_var.get()
+            idxs = logic.cur_idxs
+
+            def done(result):
+                global processed_vals, processed_idxs, processed_type
+                processed_vals = result
+                # "valid" only has outputs where the full window fits
+                processed_idxs = idxs[window_size - 1:] if mode == "valid" else idxs[:]
+                processed_type = "moving_avg"
+                plot_processed()
+                messagebox.showinfo("Success", f"Moving average applied (window={window_size})")
+
             input_window.destroy()
-            plot_processed()
-            messagebox.showinfo("Success", f"Moving average applied (window={window_size})")
+            start_job("Moving average", logic.moving_average, logic.cur_vals, window_size, mode, on_done=done)
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {e}")
         except Exception as e:
@@ -62,60 +98,395 @@ def show_moving_average_window():
     Button(input_window, text="Apply", command=apply_moving_avg, width=12).pack(pady=10)
     Button(input_window, text="Cancel", command=input_window.destroy, width=12).pack()
 
-def plot_processed():
-    """Plot processed signal safely."""
-    clear_plot_area()
-
-    if processed_vals is None or processed_idxs is None:
-        default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
-        return
+# Stems and lines draw every sample while the visible part fits in the axes
+# width; beyond that they are decimated (min/max envelope for stems, LTTB
+# for lines) and refined from the full data whenever the view changes.
+
+def _axes_pixels(ax):
+    return max(int(ax.bbox.width), 100)
+
+def _split_fmt(fmt):
+    """Split a format like 'C1--' or 'C0o' into (color, style)."""
+    color = fmt[:2] if fmt.startswith('C') else fmt[:1]
+    return color, fmt[len(color):]
+
+class StemPlot:
+    """Stem plot as one LineCollection plus a marker line, updated in place."""
+
+    def __init__(self, ax, linefmt='C0-', markerfmt='C0o', label=None):
+        color, style = _split_fmt(linefmt)
+        marker_color, marker = _split_fmt(markerfmt)
+        self.ax = ax
+        self.x = self.y = np.zeros(0)
+        self.stale = False
+        self.stems = LineCollection([], colors=color, linestyles=style or '-', linewidths=1,
+                                    label=label, animated=True)
+        ax.add_collection(self.stems, autolim=False)
+        self.markers, = ax.plot([], [], linestyle='none', marker=marker or 'o',
+                                color=marker_color, animated=True)
+        self.artists = [self.stems, self.markers]
+        ax.callbacks.connect('xlim_changed', self.refresh)
+
+    def set_data(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.stale = True
+
+    def limits(self):
+        if len(self.x) == 0:
+            return None
+        return self.x[0], self.x[-1], min(float(self.y.min()), 0.0), max(float(self.y.max()), 0.0)
+
+    def refresh(self, ax):
+        bx, lo, hi = logic.minmax_envelope(self.x, self.y, _axes_pixels(ax), ax.get_xlim())
+        # one vertical stroke per sample, or per pixel column when decimated
+        segments = np.empty((len(bx), 2, 2))
+        segments[:, :, 0] = bx[:, None]
+        segments[:, 0, 1] = np.minimum(lo, 0)
+        segments[:, 1, 1] = np.maximum(hi, 0)
+        self.stems.set_segments(segments)
+        self.stale = False
+        if lo is hi:
+            self.markers.set_data(bx, hi)
+        else:
+            self.markers.set_data([], [])
+
+class LinePlot:
+    """Line plot updated in place, decimated when it has too many points.
+
+    decimation is "lttb" (keeps the shape) or "minmax" (a min and a max per
+    pixel column, much cheaper, for plots redrawn many times a second).
+    """
 
-    # Remove old default label if present
-    try:
-        default_ploting_label.place_forget()
-    except:
-        pass
+    def __init__(self, ax, marker=None, decimation="lttb", **kwargs):
+        self.ax = ax
+        self.marker = marker
+        self.decimation = decimation
+        self.x = self.y = np.zeros(0)
+        self.stale = False
+        self.line, = ax.plot([], [], marker=marker, animated=True, **kwargs)
+        self.artists = [self.line]
+        ax.callbacks.connect('xlim_changed', self.refresh)
+
+    def set_data(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.stale = True
+
+    def limits(self):
+        if len(self.x) == 0:
+            return None
+        return self.x[0], self.x[-1], float(self.y.min()), float(self.y.max())
+
+    def refresh(self, ax):
+        n_out = 2 * _axes_pixels(ax)
+        if self.decimation == "minmax":
+            x, lo, hi = logic.minmax_envelope(self.x, self.y, n_out // 2, ax.get_xlim())
+            if lo is not hi:
+                x = np.repeat(x, 2)
+                y = np.column_stack((lo, hi)).ravel()
+            else:
+                y = hi
+        else:
+            x, y = logic.lttb(self.x, self.y, n_out, ax.get_xlim())
+        self.line.set_data(x, y)
+        self.line.set_marker(self.marker if self.marker and len(x) < n_out else 'None')
+        self.stale = False
+
+class ImagePlot:
+    """Image over (x, y) grid positions, reduced to the visible pixels on every view change.
+
+    set_data takes ((x, y), image) with image[i, j] at x[i], y[j]; x and y
+    ascending and evenly spaced.
+    """
 
-    fig, ax = plt.subplots(2, 1, figsize=(7, 7), dpi=100)
+    def __init__(self, ax, dynamic_range=80.0, **kwargs):
+        self.ax = ax
+        self.dynamic_range = dynamic_range
+        self.x = self.y = np.zeros(0)
+        self.image = np.zeros((0, 0))
+        self.stale = False
+        self.artist = ax.imshow(np.zeros((1, 1)), origin='lower', aspect='auto',
+                                interpolation='nearest', animated=True, **kwargs)
+        self.artists = [self.artist]
+        ax.callbacks.connect('xlim_changed', self.refresh)
+
+    def set_data(self, xy, image):
+        self.x, self.y = (np.asarray(v) for v in xy)
+        self.image = np.asarray(image)
+        top = float(self.image.max()) if self.image.size else 0.0
+        self.artist.set_clim(top - self.dynamic_range, top)
+        self.stale = True
+
+    def limits(self):
+        if len(self.x) == 0 or len(self.y) == 0:
+            return None
+        return self.x[0], self.x[-1], self.y[0], self.y[-1]
+
+    def refresh(self, ax):
+        left, right = ax.get_xlim()
+        lo = max(np.searchsorted(self.x, left) - 1, 0)
+        hi = np.searchsorted(self.x, right, side='right') + 1
+        x, image = self.x[lo:hi], self.image[lo:hi]
+        self.stale = False
+        if len(x) == 0 or len(self.y) == 0:
+            return
+        height = max(int(ax.bbox.height), 100)
+        shown = logic.downsample_image(image, _axes_pixels(ax), height)
+        dx = (x[-1] - x[0]) / max(len(x) - 1, 1) or 1.0
+        dy = (self.y[-1] - self.y[0]) / max(len(self.y) - 1, 1) or 1.0
+        # rows of the array are y, so the frames go along the columns
+        self.artist.set_data(shown.T)
+        self.artist.set_extent((x[0] - dx / 2, x[-1] + dx / 2, self.y[0] - dy / 2, self.y[-1] + dy / 2))
+
+class PlotLayout:
+    """A persistent figure, canvas and toolbar for one plot layout.
+
+    Artists are created once and only get new data. The plotted artists are
+    animated, so when titles and limits did not change the update is a
+    blit over the cached background instead of a full redraw.
+    """
 
+    def __init__(self, master, nrows, figsize):
+        self.frame = Frame(master)
+        self.figure = Figure(figsize=figsize, dpi=100)
+        self.axes = self.figure.subplots(nrows, 1, squeeze=False)[:, 0]
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.frame, pack_toolbar=False)
+        self.toolbar.update()
+        self.toolbar.pack(side=BOTTOM, fill=X)
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.plots = {}
+        self._background = None
+        self._drawn_state = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add(self, name, plot):
+        self.plots[name] = plot
+        return plot
+
+    def update(self, data):
+        """Set new data, given as {plot name: (x, y)}, and repaint."""
+        for name, (x, y) in data.items():
+            self.plots[name].set_data(x, y)
+        for ax in self.axes:
+            limits = [p.limits() for p in self.plots.values() if p.ax is ax]
+            limits = [l for l in limits if l is not None]
+            if not limits:
+                continue
+            x0, x1, y0, y1 = (min(l[0] for l in limits), max(l[1] for l in limits),
+                              min(l[2] for l in limits), max(l[3] for l in limits))
+            xpad = (x1 - x0) * 0.05 or 1.0
+            ypad = (y1 - y0) * 0.05 or 1.0
+            ax.set_ylim(y0 - ypad, y1 + ypad)
+            ax.set_xlim(x0 - xpad, x1 + xpad)
+        # a limit change already refreshed its plots through xlim_changed
+        for plot in self.plots.values():
+            if plot.stale:
+                plot.refresh(plot.ax)
+        self.redraw()
+
+    def _state(self):
+        return [(ax.get_xlim(), ax.get_ylim(), ax.get_title()) for ax in self.axes]
+
+    def redraw(self):
+        if self._background is not None and self._state() == self._drawn_state and self.canvas.supports_blit:
+            self.canvas.restore_region(self._background)
+            self._draw_plots()
+            self.canvas.blit(self.figure.bbox)
+        else:
+            self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        # full redraw: cache everything but the plotted data as the background
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._drawn_state = self._state()
+        self._draw_plots()
+
+    def _draw_plots(self):
+        for plot in self.plots.values():
+            for artist in plot.artists:
+                plot.ax.draw_artist(artist)
+
+    def release(self):
+        self._background = None
+        self.plots.clear()
+        self.figure.clear()
+        self.frame.destroy()
+
+class PlotManager:
+    """Keeps one PlotLayout per kind of plot and shows one at a time."""
+
+    def __init__(self, master, placeholder):
+        self.master = master
+        self.placeholder = placeholder
+        self.layouts = {}
+        self.active = None
+
+    def show(self, name, build):
+        layout = self.layouts.get(name)
+        if layout is None:
+            layout = self.layouts[name] = build(self.master)
+        if self.active is not layout:
+            if self.active is not None:
+                self.active.frame.pack_forget()
+            self.placeholder.place_forget()
+            layout.frame.pack(fill='both', expand=True)
+            self.active = layout
+        return layout
+
+    def hide(self):
+        if self.active is not None:
+            self.active.frame.pack_forget()
+            self.active = None
+        self.placeholder.place(relx=0.5, rely=0.5, anchor=CENTER)
+
+    def release(self):
+        """Destroy every layout and free its figure."""
+        self.hide()
+        for layout in self.layouts.values():
+            layout.release()
+        self.layouts.clear()
+
+PROCESSED_TITLES = {
+    "moving_avg": "Moving Average",
+    "first_deriv": "First Derivative: y(n) = x(n) - x(n-1)",
+    "second_deriv": "Second Derivative: y(n) = x(n+1) - 2x(n) + x(n-1)",
+    "convolution": "Convolution"
+}
+
+def _build_processed_layout(master):
+    layout = PlotLayout(master, 2, (7, 7))
+    ax = layout.axes
     # Top: original vs processed
-    ax[0].stem(logic.cur_idxs, logic.cur_vals, linefmt='C0-', markerfmt='C0o', basefmt=" ", label="Original")
-    ax[0].stem(processed_idxs, processed_vals, linefmt='C1--', markerfmt='C1s', basefmt=" ", label="Processed")
-    
-    title_map = {
-        "moving_avg": "Moving Average",
-        "first_deriv": "First Derivative: y(n) = x(n) - x(n-1)",
-        "second_deriv": "Second Derivative: y(n) = x(n+1) - 2x(n) + x(n-1)",
-        "convolution": "Convolution"
-    }
-    ax[0].set_title(title_map.get(processed_type, "Processed Signal"))
+    layout.add("original", StemPlot(ax[0], linefmt='C0-', markerfmt='C0o', label="Original"))
+    layout.add("processed", StemPlot(ax[0], linefmt='C1--', markerfmt='C1s', label="Processed"))
     ax[0].set_ylabel("Amplitude")
     ax[0].grid(True)
     ax[0].legend()
 
     # Bottom: processed signal only
-    ax[1].stem(processed_idxs, processed_vals, linefmt='C2-', markerfmt='C2o', basefmt=" ")
-    ax[1].plot(processed_idxs, processed_vals, marker='o', linestyle='-', color='C2', alpha=0.6)
-    ax[1].set_title(f"{title_map.get(processed_type, 'Processed')} Signal (Continuous)")
+    layout.add("stem", StemPlot(ax[1], linefmt='C2-', markerfmt='C2o'))
+    layout.add("line", LinePlot(ax[1], marker='o', linestyle='-', color='C2', alpha=0.6))
     ax[1].set_xlabel("Sample Index")
     ax[1].set_ylabel("Amplitude")
     ax[1].grid(True)
+    layout.figure.tight_layout()
+    return layout
 
-    plt.tight_layout()
+def _build_quantization_layout(master):
+    layout = PlotLayout(master, 3, (7, 8))
+    ax = layout.axes
+    # Top: original vs quantized
+    layout.add("original", StemPlot(ax[0], linefmt='C0-', markerfmt='C0o', label="Original"))
+    layout.add("quantized", StemPlot(ax[0], linefmt='C1--', markerfmt='C1s', label="Quantized"))
+    ax[0].set_ylabel("Amplitude")
+    ax[0].grid(True)
+    ax[0].legend()
 
-    # Create canvas
-    canvas = FigureCanvasTkAgg(fig, master=remaining_space_frame)
-    canvas.draw()
+    # Middle: quantization error
+    layout.add("error", StemPlot(ax[1], linefmt='C2-', markerfmt='C2o'))
+    ax[1].set_title("Quantization Error (original - quantized)")
+    ax[1].set_ylabel("Error")
+    ax[1].grid(True)
+
+    # Bottom: encoded integer levels
+    layout.add("codes", StemPlot(ax[2], linefmt='C3-', markerfmt='C3o'))
+    ax[2].set_title("Encoded Levels (integer codes)")
+    ax[2].set_xlabel("Sample Index")
+    ax[2].set_ylabel("Level Code")
+    ax[2].grid(True)
+    layout.figure.tight_layout()
+    return layout
 
-    # Pack safely
-    widget = canvas.get_tk_widget()
-    widget.pack(fill='both', expand=True)
+def _build_accumulated_layout(master):
+    layout = PlotLayout(master, 2, (6, 6))
+    ax = layout.axes
+    layout.add("discrete", StemPlot(ax[0], label="Discrete Signal"))
+    ax[0].set_title("Discrete Accumulated Signal")
+    ax[0].set_xlabel("Sample Index")
+    ax[0].set_ylabel("Sample Value")
+    ax[0].grid(True)
+    ax[0].legend()
+
+    layout.add("continuous", LinePlot(ax[1], marker='o', label="Continuous Signal"))
+    ax[1].set_title("Continuous Accumulated Signal")
+    ax[1].set_xlabel("Sample Index")
+    ax[1].set_ylabel("Sample Value")
+    ax[1].grid(True)
+    ax[1].legend()
+    layout.figure.tight_layout()
+    return layout
+
+def _build_dft_layout(master):
+    layout = PlotLayout(master, 2, (7, 6))
+    ax = layout.axes
+    layout.add("magnitude", StemPlot(ax[0]))
+    ax[0].set_title("DFT - Magnitude")
+    ax[0].set_xlabel("Frequency (Hz)")
+    ax[0].set_ylabel("Amplitude")
+    ax[0].grid(True)
+
+    layout.add("phase", StemPlot(ax[1]))
+    ax[1].set_title("DFT - Phase (radians)")
+    ax[1].set_xlabel("Frequency (Hz)")
+    ax[1].set_ylabel("Phase (rad)")
+    ax[1].grid(True)
+    layout.figure.tight_layout()
+    return layout
+
+def _build_spectrogram_layout(master):
+    layout = PlotLayout(master, 1, (7, 6))
+    ax = layout.axes
+    layout.add("spectrogram", ImagePlot(ax[0], cmap='viridis'))
+    layout.figure.colorbar(layout.plots["spectrogram"].artist, ax=ax[0], label="Magnitude (dB)")
+    ax[0].set_title("Spectrogram")
+    ax[0].set_xlabel("Time (s)")
+    ax[0].set_ylabel("Frequency (Hz)")
+    layout.figure.tight_layout()
+    return layout
+
+def _build_live_layout(master):
+    layout = PlotLayout(master, 2, (7, 6))
+    ax = layout.axes
+    layout.add("signal", LinePlot(ax[0], decimation="minmax", color='C0', linewidth=0.8, label="Signal"))
+    layout.add("moving_avg", LinePlot(ax[0], decimation="minmax", color='C1', linewidth=1.2, label="Moving Average"))
+    ax[0].set_title("Live Input")
+    ax[0].set_ylabel("Amplitude")
+    ax[0].grid(True)
+    ax[0].legend(loc="upper left")
+
+    layout.add("first_deriv", LinePlot(ax[1], decimation="minmax", color='C2', linewidth=0.8, label="First Derivative"))
+    layout.add("second_deriv", LinePlot(ax[1], decimation="minmax", color='C3', linewidth=0.8, label="Second Derivative"))
+    ax[1].set_xlabel("Sample Index")
+    ax[1].set_ylabel("Amplitude")
+    ax[1].grid(True)
+    ax[1].legend(loc="upper left")
+    layout.figure.tight_layout()
+    return layout
+
+def plot_processed():
+    """Plot processed signal safely."""
+    if processed_vals is None or processed_idxs is None:
+        plots.hide()
+        return
+
+    layout = plots.show("processed", _build_processed_layout)
+    ax = layout.axes
+    ax[0].set_title(PROCESSED_TITLES.get(processed_type, "Processed Signal"))
+    ax[1].set_title(f"{PROCESSED_TITLES.get(processed_type, 'Processed')} Signal (Continuous)")
+    layout.update({
+        "original": (logic.cur_idxs, logic.cur_vals),
+        "processed": (processed_idxs, processed_vals),
+        "stem": (processed_idxs, processed_vals),
+        "line": (processed_idxs, processed_vals),
+    })
 
 
 
 def show_derivative_window():
     """Open a window to choose first or second derivative."""
-    if not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
         return
 
@@ -161,7 +532,7 @@ def show_derivative_window():
     
 def show_convolution_window():
     """Open a window to select second signal for convolution."""
-    if not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
         
         return
@@ -176,7 +547,7 @@ def show_convolution_window():
     selected_signal2_path = [None]
     
     def browse_signal2():
-        path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
+        path = filedialog.askopenfilename(filetypes=SIGNAL_FILETYPES)
         if path:
             selected_signal2_path[0] = path
             Label(conv_window, text=path.split("/")[-1], font=("Segoe UI", 8), fg="green").pack()
@@ -184,48 +555,235 @@ def show_convolution_window():
     Button(conv_window, text="Browse Signal 2", command=browse_signal2, width=20).pack(padx=10, pady=5)
 
     def apply_convolution():
-        global processed_vals, processed_idxs, processed_type
         try:
             if not selected_signal2_path[0]:
                 messagebox.showerror("Error", "Please select a second signal.")
                 return
 
-            # Read second signal
-            idxs2 = []
-            vals2 = []
-            logic.read_signal(selected_signal2_path[0], idxs2, vals2)
+            def convolve(vals, path, progress):
+                # Read second signal, then convolve
+                idxs2, vals2 = logic.read_signal(path)
+                progress(0.0)
+                return logic.convolve_signals(vals, vals2, progress=progress)
+
+            def done(result):
+                global processed_vals, processed_idxs, processed_type
+                processed_vals, processed_idxs = result
+                processed_type = "convolution"
+                plot_processed()
+                messagebox.showinfo("Success", f"Convolution applied. Output length: {len(processed_vals)}")
 
-            # Convolve
-            result_vals, result_idxs = logic.convolve_signals(logic.cur_vals, vals2)
-            processed_vals = result_vals
-            processed_idxs = result_idxs
-            processed_type = "convolution"
-            
             conv_window.destroy()
-            rootWin.after(50, plot_processed)  # Safe delay
-            messagebox.showinfo("Success", f"Convolution applied. Output length: {len(result_vals)}")
+            start_job("Convolution", convolve, logic.cur_vals, selected_signal2_path[0], on_done=done)
         except Exception as e:
             messagebox.showerror("Error", f"Failed: {e}")
 
     Button(conv_window, text="Apply Convolution", command=apply_convolution, width=20).pack(padx=10, pady=5)
     Button(conv_window, text="Cancel", command=conv_window.destroy, width=20).pack(padx=10, pady=5)
 
-def clear_plot_area():
-    """Safely destroy all widgets in the plot area."""
-    for widget in remaining_space_frame.winfo_children():
+current_job = None
+
+def start_job(title, func, *args, on_done, **kwargs):
+    """Run func(*args, progress=..., **kwargs) in the background.
+
+    Progress and a Cancel button are shown in the left panel while it runs;
+    on_done gets the result on the Tk thread once the job finished.
+    """
+    global current_job
+    if current_job is not None:
+        messagebox.showerror("Busy", "Another operation is still running.")
+        return
+
+    def finish():
+        global current_job
+        current_job = None
+        job_section.pack_forget()
+
+    def done(result):
+        finish()
+        on_done(result)
+
+    def failed(e):
+        finish()
+        messagebox.showerror("Error", f"{title} failed: {e}")
+
+    def cancelled():
+        finish()
+        messagebox.showinfo("Cancelled", f"{title} cancelled.")
+
+    job_label.config(text=f"{title}: 0%")
+    job_section.pack(fill=X, pady=10)
+    current_job = jobs.run_job(rootWin, func, *args, on_done=done, on_error=failed, on_cancel=cancelled,
+                               on_progress=lambda f: job_label.config(text=f"{title}: {f:.0%}"), **kwargs)
+
+def cancel_job():
+    if current_job is not None:
+        job_label.config(text="Cancelling...")
+        current_job.cancel()
+
+def show_live_window():
+    """Open the Live Input panel: stream samples from a pipe or socket and plot them as they arrive."""
+    win = Toplevel(rootWin)
+    win.title("Live Input")
+    win.geometry("320x380")
+    win.resizable(False, False)
+
+    entries = {}
+    for key, text, default in (("source", "Source (-, pipe path, tcp:PORT, udp:PORT):", "tcp:5000"),
+                               ("capacity", "Buffer size (samples):", str(1 << 18)),
+                               ("window", "Moving average window:", "5"),
+                               ("fps", "Max refresh rate (frames/s):", "20")):
+        Label(win, text=text, font=("Segoe UI", 10)).pack(pady=(6, 0))
+        entries[key] = Entry(win, width=28)
+        entries[key].pack()
+        entries[key].insert(0, default)
+
+    Label(win, text="Format:", font=("Segoe UI", 10)).pack(pady=(6, 0))
+    fmt_var = StringVar(value="text")
+    OptionMenu(win, fmt_var, *stream.STREAM_FORMATS).pack()
+
+    status = Label(win, text="Stopped", font=("Segoe UI", 9))
+
+    def start():
+        global live_stream
+        if live_stream is not None and live_stream.running:
+            messagebox.showerror("Busy", "Live input is already running.")
+            return
+        try:
+            capacity = int(entries["capacity"].get())
+            window_size = int(entries["window"].get())
+            fps = float(entries["fps"].get())
+            if fps <= 0:
+                raise ValueError("Refresh rate must be positive.")
+            live_stream = stream.LiveStream(entries["source"].get().strip(), capacity,
+                                            fmt_var.get(), window_size).start()
+        except ValueError as ve:
+            messagebox.showerror("Error", f"Invalid input: {ve}")
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot open source: {e}")
+            return
+        refresh(max(int(1000 / fps), 1), live_stream, -1)
+
+    def refresh(interval, live, shown):
+        # a newer stream took over, or the panel was closed
+        if live is not live_stream:
+            return
+        running = live.running
+        total = live.total
+        if total != shown:
+            plot_live()
+        if running:
+            if win.winfo_exists():
+                status.config(text=f"Receiving: {total} samples")
+            rootWin.after(interval, refresh, interval, live, total)
+            return
+        if win.winfo_exists():
+            status.config(text=f"Stopped: {total} samples")
+        if live.error is not None:
+            messagebox.showerror("Error", f"Live input failed: {live.error}")
+
+    def stop():
+        if live_stream is not None:
+            live_stream.stop()
+
+    def use_samples():
+        if live_stream is None or not len(live_stream.buffers["signal"]):
+            messagebox.showerror("Error", "No live samples received yet.")
+            return
+        signal_history.apply("live input", logic.current.set, *live_stream.buffers["signal"].latest())
+        plot_accumulated()
+        messagebox.showinfo("Live Input", f"{len(logic.current)} samples loaded as the current signal.")
+
+    def close():
+        stop()
+        win.destroy()
+
+    buttons = Frame(win)
+    buttons.pack(pady=8)
+    Button(buttons, text="Start", command=start, width=8).pack(side=LEFT, padx=2)
+    Button(buttons, text="Stop", command=stop, width=8).pack(side=LEFT, padx=2)
+    Button(buttons, text="Use as Signal", command=use_samples, width=12).pack(side=LEFT, padx=2)
+    status.pack()
+    win.protocol("WM_DELETE_WINDOW", close)
+
+def plot_live():
+    """Plot the latest samples of the live input and its running moving average and derivatives."""
+    if live_stream is None:
+        plots.hide()
+        return
+
+    layout = plots.show("live", _build_live_layout)
+    layout.update({name: live_stream.buffers[name].latest() for name in stream.LiveStream.STREAMS})
+
+def show_performance_window():
+    """Open the Performance panel: per-operation statistics from the instrument module."""
+    win = Toplevel(rootWin)
+    win.title("Performance")
+    win.geometry("760x420")
+
+    controls = Frame(win)
+    controls.pack(fill=X, padx=10, pady=5)
+    record_var = BooleanVar(value=instrument.is_enabled())
+    memory_var = BooleanVar(value=False)
+
+    def toggle():
+        instrument.disable()
+        if record_var.get():
+            instrument.enable(memory=memory_var.get())
+
+    Checkbutton(controls, text="Record", variable=record_var, command=toggle).pack(side=LEFT)
+    Checkbutton(controls, text="Track memory (slow)", variable=memory_var, command=toggle).pack(side=LEFT)
+
+    def export(kind):
+        path = filedialog.asksaveasfilename(defaultextension="." + kind, filetypes=[(kind.upper() + " Files", "*." + kind)])
+        if not path:
+            return
         try:
-            widget.destroy()
-        except:
-            pass  # In case widget is already gone
+            if kind == "json":
+                instrument.export_json(path)
+            else:
+                instrument.export_csv(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Export failed: {e}")
+
+    Button(controls, text="Reset", command=lambda: (instrument.reset(), refresh(False)), width=8).pack(side=RIGHT, padx=2)
+    Button(controls, text="Export CSV", command=lambda: export("csv"), width=10).pack(side=RIGHT, padx=2)
+    Button(controls, text="Export JSON", command=lambda: export("json"), width=10).pack(side=RIGHT, padx=2)
+
+    table = Text(win, font=("Consolas", 9), wrap="none")
+    table.pack(fill=BOTH, expand=True, padx=10, pady=5)
+
+    def refresh(repeat=True):
+        if not win.winfo_exists():
+            return
+        stats = sorted(instrument.stats().items(), key=lambda item: -item[1]["total"])
+        lines = [f"{'operation':24s} {'calls':>7s} {'total ms':>10s} {'mean ms':>9s} {'max ms':>9s} "
+                 f"{'in':>10s} {'out':>10s} {'peak MB':>8s}"]
+        for name, s in stats:
+            lines.append(f"{name:24s} {s['calls']:7d} {s['total'] * 1e3:10.1f} {s['mean'] * 1e3:9.2f} "
+                         f"{s['max'] * 1e3:9.2f} {s['in_samples']:10d} {s['out_samples']:10d} "
+                         f"{s['peak_bytes'] / 1e6:8.1f}")
+        table.delete("1.0", END)
+        table.insert(END, "\n".join(lines))
+        if repeat:
+            win.after(1000, refresh)
+
+    refresh()
+
+def clear_plot_area():
+    """Hide the current plot and show the placeholder label."""
+    plots.hide()
 
 
 def browse():
-    global selected_path
-    path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
-    if not path:
+    global selected_paths
+    paths = filedialog.askopenfilenames(filetypes=SIGNAL_FILETYPES)
+    if not paths:
         return
-    filepath.set(path.split("/")[-1])
-    selected_path = path
+    names = [path.split("/")[-1] for path in paths]
+    filepath.set(names[0] if len(names) == 1 else f"{len(names)} files: " + ", ".join(names))
+    selected_paths = list(paths)
 
 def show_quantization_window():
     """Open a window to input number of bits or levels and perform quantization.
@@ -241,13 +799,13 @@ def show_quantization_window():
     """
     global quantized_vals, quant_error, encoded_levels, quant_levels, quant_bits
 
-    if not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No signal available to quantize. Load or generate a signal first.")
         return
 
     input_window = Toplevel(rootWin)
     input_window.title("Signal Quantization")
-    input_window.geometry("350x260")
+    input_window.geometry("350x300")
     input_window.resizable(False, False)
 
     mode_var = StringVar(value="bits")
@@ -264,6 +822,9 @@ def show_quantization_window():
 
     Label(input_window, text="(Quantization is uniform over signal range)", font=("Segoe UI", 8)).pack(pady=(6,0))
 
+    kind_var = StringVar(value="mid_rise")
+    OptionMenu(input_window, kind_var, *logic.QUANTIZER_KINDS).pack()
+
     def do_quantize():
         nonlocal mode_var, bits_entry, levels_entry
         global quantized_vals, quant_error, encoded_levels, quant_levels, quant_bits
@@ -273,6 +834,8 @@ def show_quantization_window():
                 b = int(bits_entry.get())
                 if b <= 0:
                     raise ValueError("Bits must be positive")
+                if b > logic.QUANTIZER_MAX_BITS:
+                    raise ValueError(f"Bits must be at most {logic.QUANTIZER_MAX_BITS}")
                 L = 2 ** b
                 quant_bits = b
                 quant_levels = L
@@ -280,42 +843,26 @@ def show_quantization_window():
                 L = int(levels_entry.get())
                 if L <= 1:
                     raise ValueError("Levels must be integer > 1")
+                if L > 2 ** logic.QUANTIZER_MAX_BITS:
+                    raise ValueError(f"Levels must be at most 2**{logic.QUANTIZER_MAX_BITS}")
                 quant_bits = None
                 quant_levels = L
 
-            # perform uniform quantization on logic.cur_vals
-            x = logic.cur_vals
-            xmin = min(x)
-            xmax = max(x)
-            if xmax == xmin:
-                # degenerate: all samples equal -> single level
-                step = 0.0
-                q_vals = [xmin for _ in x]
-                codes = [0 for _ in x]
-                errors = [0.0 for _ in x]
-            else:
-                step = (xmax - xmin) / quant_levels
-                # mid-rise quantizer: reconstruction levels at xmin + (i+0.5)*step
-                q_vals = []
-                codes = []
-                errors = []
-                for xi in x:
-                    idx = int((xi - xmin) / step)
-                    if idx < 0:
-                        idx = 0
-                    if idx >= quant_levels:
-                        idx = quant_levels - 1
-                    recon = xmin + (idx + 0.5) * step
-                    q_vals.append(recon)
-                    codes.append(idx)
-                    errors.append(xi - recon)
-
-            quantized_vals = q_vals
-            quant_error = errors
-            encoded_levels = codes
+            kind = kind_var.get()
+            # the signal may change while the job runs
+            idxs, vals = logic.cur_idxs, logic.cur_vals
+
+            def quantize(x, levels, progress):
+                return logic.quantize_signal(x, levels=levels, kind=kind)
+
+            def done(result):
+                global quantized_vals, quant_error, encoded_levels, quant_idxs, quant_input
+                quantized_vals, quant_error, encoded_levels = result
+                quant_idxs, quant_input = idxs, vals
+                plot_quantization()
 
             input_window.destroy()
-            plot_quantization()
+            start_job("Quantization", quantize, vals, quant_levels, on_done=done)
         except ValueError as ve:
             messagebox.showerror("Error", f"Invalid input: {ve}")
         except Exception as e:
@@ -327,85 +874,65 @@ def show_quantization_window():
 
 def plot_quantization():
     """Plot original vs quantized, quantization error, and encoded levels."""
-    clear_plot_area()
-
-    if not logic.cur_idxs or not logic.cur_vals:
-        default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
+    if not logic.current:
+        plots.hide()
         return
 
     if quantized_vals is None or quant_error is None or encoded_levels is None:
         plot_accumulated()
         return
 
-    fig, ax = plt.subplots(3, 1, figsize=(7, 8), dpi=100)
-
-    # Top: original vs quantized
-    ax[0].stem(logic.cur_idxs, logic.cur_vals, linefmt='C0-', markerfmt='C0o', basefmt=" ", label="Original")
-    ax[0].stem(logic.cur_idxs, quantized_vals, linefmt='C1--', markerfmt='C1s', basefmt=" ", label="Quantized")
+    layout = plots.show("quantization", _build_quantization_layout)
     title_info = f"Quantized Signal (levels={quant_levels}" + (f", bits={quant_bits})" if quant_bits is not None else ")")
-    ax[0].set_title("Original vs Quantized - " + title_info)
-    ax[0].set_ylabel("Amplitude")
-    ax[0].grid(True)
-    ax[0].legend()
-
-    # Middle: quantization error
-    ax[1].stem(logic.cur_idxs, quant_error, linefmt='C2-', markerfmt='C2o', basefmt=" ")
-    ax[1].set_title("Quantization Error (original - quantized)")
-    ax[1].set_ylabel("Error")
-    ax[1].grid(True)
-
-    # Bottom: encoded integer levels
-    ax[2].stem(logic.cur_idxs, encoded_levels, linefmt='C3-', markerfmt='C3o', basefmt=" ")
-    ax[2].set_title("Encoded Levels (integer codes)")
-    ax[2].set_xlabel("Sample Index")
-    ax[2].set_ylabel("Level Code")
-    ax[2].grid(True)
-
-    plt.tight_layout()
-    canvas = FigureCanvasTkAgg(fig, master=remaining_space_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill='both', expand=True)
-
+    layout.axes[0].set_title("Original vs Quantized - " + title_info)
+    layout.update({
+        "original": (quant_idxs, quant_input),
+        "quantized": (quant_idxs, quantized_vals),
+        "error": (quant_idxs, quant_error),
+        "codes": (quant_idxs, encoded_levels),
+    })
+
+
+def read_selected_signals():
+    """Read every browsed file; returns a list of (idxs, vals) or None on error."""
+    signals = []
+    for path in selected_paths:
+        try:
+            signals.append(logic.read_signal(path))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read file {path.split('/')[-1]}: {e}")
+            return None
+    return signals
 
 def add_signal_clicked():
-    """Read the currently browsed file and add it to the accumulated signal."""
-    global selected_path
-    if not selected_path:
+    """Read the browsed files and add them to the accumulated signal."""
+    if not selected_paths:
         messagebox.showerror("Error", "No file selected to add.")
         return
 
-    idxs = []
-    vals = []
-    try:
-        logic.read_signal(selected_path, idxs, vals)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to read file: {e}")
+    signals = read_selected_signals()
+    if signals is None:
         return
 
-    if not idxs or not vals:
-        messagebox.showerror("Error", "Selected file contains no data.")
+    if not any(len(idxs) for idxs, _ in signals):
+        messagebox.showerror("Error", "Selected files contain no data.")
         return
     
-    logic.add_signal(idxs, vals)
-    messagebox.showinfo("Added", f"Signal added to accumulation. Accumulated samples: {len(logic.cur_idxs)}")
+    signal_history.apply("add", logic.add_signals, signals)
+    messagebox.showinfo("Added", f"{len(signals)} signal(s) added to accumulation. Accumulated samples: {len(logic.current)}")
 
 def subtract_signal_clicked():
-    """Subtract the currently browsed file's signal from the accumulated signal."""
-    global selected_path
-    if not selected_path:
+    """Subtract the browsed files' signals from the accumulated signal."""
+    if not selected_paths:
         messagebox.showerror("Error", "No file selected to subtract.")
         return
 
-    idxs = []
-    vals = []
-    try:
-        logic.read_signal(selected_path, idxs, vals)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to read file: {e}")
+    signals = read_selected_signals()
+    if signals is None:
         return
     
-    logic.sub_signal(idxs, vals)
-    messagebox.showinfo("Subtracted", "Signal subtracted from accumulation.")
+    signal_history.apply("subtract", logic.add_signals, signals, weights=[-1] * len(signals))
+    messagebox.showinfo("Subtracted", f"{len(signals)} signal(s) subtracted from accumulation.")
     plot_accumulated()
 
 def advance_signal_clicked():
@@ -415,7 +942,7 @@ def advance_signal_clicked():
         if k < 0:
             messagebox.showerror("Error", "k must be non-negative.")
             return
-        logic.advance_signal(logic.cur_idxs, logic.cur_vals, k)
+        signal_history.shift(k)
         messagebox.showinfo("Advanced", f"Signal advanced by {k} steps.")
         plot_accumulated()
     except ValueError:
@@ -428,7 +955,7 @@ def delay_signal_clicked():
         if k < 0:
             messagebox.showerror("Error", "k must be non-negative.")
             return
-        logic.delay_signal(logic.cur_idxs, logic.cur_vals, k)
+        signal_history.shift(-k)
         messagebox.showinfo("Delayed", f"Signal delayed by {k} steps.")
         plot_accumulated()
     except ValueError:
@@ -436,11 +963,11 @@ def delay_signal_clicked():
 
 def fold_signal_clicked():
     """Fold (time-reverse) the accumulated signal."""
-    if not logic.cur_idxs or not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No accumulated signal to fold.")
         return
     try:
-        logic.fold_signal(logic.cur_idxs, logic.cur_vals)
+        signal_history.fold()
         messagebox.showinfo("Folded", "Signal has been folded.")
         plot_accumulated()
     except Exception as e:
@@ -450,7 +977,7 @@ def multiply_signal_clicked():
     """Multiply the accumulated signal by a scalar."""
     try:
         factor = float(multiply_entry.get())
-        logic.multiply(logic.cur_vals, factor)
+        signal_history.multiply(factor)
         messagebox.showinfo("Multiplied", f"Signal multiplied by {factor}.")
         plot_accumulated()
     except ValueError:
@@ -463,17 +990,10 @@ def generate_signal(wave_type, amplitude, analog_freq, sampling_freq, theta):
         return
 
     num_samples = 100
-    idxs = list(range(num_samples))
-    normalized_freq = float(analog_freq) / sampling_freq
-    vals = []
-
-    if wave_type == "sine":
-        vals = [amplitude * math.sin(2 * math.pi * normalized_freq * i + theta) for i in idxs]
-    else:  # cosine
-        vals = [amplitude * math.cos(2 * math.pi * normalized_freq * i + theta) for i in idxs]
+    tone = logic.synthesize(num_samples, [(amplitude, analog_freq, theta, wave_type)], sampling_freq)
 
-    logic.add_signal(idxs, vals)
-    messagebox.showinfo("Generated", f"{wave_type.capitalize()} wave generated and added. Samples: {len(idxs)}")
+    signal_history.apply(f"{wave_type} wave", logic.add_signal, tone.idxs, tone.vals)
+    messagebox.showinfo("Generated", f"{wave_type.capitalize()} wave generated and added. Samples: {len(tone)}")
     plot_accumulated()
 
 def show_signal_input_window(wave_type):
@@ -515,44 +1035,38 @@ def show_signal_input_window(wave_type):
 
 def plot_accumulated():
     """Plot the accumulated signal as two subplots: discrete and continuous."""
-    clear_plot_area()
-
-    if not logic.cur_idxs or not logic.cur_vals:
-        default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
+    if not logic.current:
+        plots.hide()
         return
 
-    fig, ax = plt.subplots(2, 1, figsize=(6, 6), dpi=100)
-
-    ax[0].stem(logic.cur_idxs, logic.cur_vals, label="Discrete Signal", basefmt=" ")
-    ax[0].set_title("Discrete Accumulated Signal")
-    ax[0].set_xlabel("Sample Index")
-    ax[0].set_ylabel("Sample Value")
-    ax[0].grid(True)
-    ax[0].legend()
-
-    ax[1].plot(logic.cur_idxs, logic.cur_vals, marker='o', label="Continuous Signal")
-    ax[1].set_title("Continuous Accumulated Signal")
-    ax[1].set_xlabel("Sample Index")
-    ax[1].set_ylabel("Sample Value")
-    ax[1].grid(True)
-    ax[1].legend()
+    layout = plots.show("accumulated", _build_accumulated_layout)
+    layout.update({
+        "discrete": (logic.cur_idxs, logic.cur_vals),
+        "continuous": (logic.cur_idxs, logic.cur_vals),
+    })
 
-    plt.tight_layout()
+def undo_clicked(event=None):
+    """Undo the last change to the accumulated signal."""
+    if signal_history.undo() is None:
+        messagebox.showinfo("Undo", "Nothing to undo.")
+        return
+    plot_accumulated()
 
-    canvas = FigureCanvasTkAgg(fig, master=remaining_space_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill='both', expand=True)
+def redo_clicked(event=None):
+    """Redo the last undone change to the accumulated signal."""
+    if signal_history.redo() is None:
+        messagebox.showinfo("Redo", "Nothing to redo.")
+        return
+    plot_accumulated()
 
 def reset_accumulated():
-    logic.cur_idxs.clear()
-    logic.cur_vals.clear()
-    clear_plot_area()
-    default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
+    signal_history.apply("reset", logic.current.clear)
+    plots.release()
     messagebox.showinfo("Reset", "Accumulated signal cleared.")
 
 def show_dft_window():
     """Ask sampling freq, compute DFT, and plot magnitude & phase vs frequency."""
-    if not logic.cur_vals:
+    if not logic.current:
         messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
         return
 
@@ -572,22 +1086,34 @@ def show_dft_window():
             fs = float(fs_entry.get())
             if fs <= 0:
                 raise ValueError("Sampling frequency must be positive.")
-            X = logic.dft(logic.cur_vals)
-            N = len(X)
-            freqs = [k * fs / N for k in range(N)]
-            mags = [abs(v) for v in X]
-            phases = [cmath_phase(v) for v in X]
-
-            # store global for potential later use
-            global dft_magnitude, dft_phase, dft_freqs, dft_sampling_freq, dft_spectrum
-            dft_magnitude = mags
-            dft_phase = phases
-            dft_freqs = freqs
-            dft_sampling_freq = fs
-            dft_spectrum = X
+
+            def compute(signal, progress):
+                # cached per signal version: repeating the DFT, e.g. with
+                # another sampling frequency, costs nothing
+                X = logic.spectrum_cache.get(signal, "dft")
+                progress(0.6)
+                mags = logic.spectrum_cache.get(signal, "magnitude")
+                progress(0.8)
+                phases = logic.spectrum_cache.get(signal, "phase")
+                return X, mags, phases
+
+            # the copy keeps the version, and stays unchanged while the job runs
+            signal = logic.current.copy()
+
+            def done(result):
+                # store global for potential later use
+                global dft_magnitude, dft_phase, dft_freqs, dft_sampling_freq, dft_spectrum, dft_version, dft_idxs
+                X, dft_magnitude, dft_phase = result
+                N = len(X)
+                dft_freqs = np.arange(N) * fs / N
+                dft_version = signal.version
+                dft_idxs = signal.idxs
+                dft_sampling_freq = fs
+                dft_spectrum = X
+                plot_dft_results()
 
             win.destroy()
-            plot_dft_results()
+            start_job("DFT", compute, signal, on_done=done)
         except ValueError as ve:
             messagebox.showerror("Error", f"Invalid input: {ve}")
         except Exception as e:
@@ -596,6 +1122,122 @@ def show_dft_window():
     Button(win, text="Compute DFT", command=do_dft, width=12).pack(pady=8)
     Button(win, text="Cancel", command=win.destroy, width=12).pack()
 
+def show_goertzel_window():
+    """Ask sampling freq and a list of frequencies, show the spectrum at just those."""
+    if not logic.current:
+        messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
+        return
+
+    win = Toplevel(rootWin)
+    win.title("Probe Frequencies")
+    win.geometry("460x340")
+
+    Label(win, text="Sampling frequency (Hz):", font=("Segoe UI", 10)).pack(pady=(8, 0))
+    fs_entry = Entry(win, width=20)
+    fs_entry.pack()
+    fs_entry.insert(0, "100.0")
+
+    Label(win, text="Frequencies (Hz, comma separated):", font=("Segoe UI", 10)).pack(pady=(8, 0))
+    freqs_entry = Entry(win, width=40)
+    freqs_entry.pack()
+    freqs_entry.insert(0, "1.0, 5.0")
+
+    results = Text(win, height=8, font=("Consolas", 9), wrap="none")
+
+    def do_probe():
+        try:
+            fs = float(fs_entry.get())
+            if fs <= 0:
+                raise ValueError("Sampling frequency must be positive.")
+            freqs = [float(f) for f in freqs_entry.get().replace(";", ",").split(",") if f.strip()]
+            if not freqs:
+                raise ValueError("Enter at least one frequency.")
+            X = logic.goertzel(logic.cur_vals, freqs, fs)
+            N = len(logic.current)
+            lines = [f"{'freq (Hz)':>12s} {'magnitude':>12s} {'phase (rad)':>12s} {'tone amp':>10s}"]
+            # a cosine of amplitude A at f gives |X| = A*N/2
+            for f, x in zip(freqs, X):
+                lines.append(f"{f:12.4f} {abs(x):12.4f} {np.angle(x):12.4f} {2 * abs(x) / N:10.4f}")
+            results.delete("1.0", END)
+            results.insert(END, "\n".join(lines))
+        except ValueError as ve:
+            messagebox.showerror("Error", f"Invalid input: {ve}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Probe failed: {e}")
+
+    Button(win, text="Probe", command=do_probe, width=12).pack(pady=8)
+    results.pack(fill=BOTH, expand=True, padx=10, pady=(0, 10))
+
+def show_spectrogram_window():
+    """Ask sampling freq, frame length, hop and window, compute the STFT and show it."""
+    if not logic.current:
+        messagebox.showerror("Error", "No signal available. Load or generate a signal first.")
+        return
+
+    win = Toplevel(rootWin)
+    win.title("Spectrogram")
+    win.geometry("300x300")
+    win.resizable(False, False)
+
+    entries = {}
+    for key, text, default in (("fs", "Sampling frequency (Hz):", "100.0"),
+                               ("frame", "Frame length (samples):", "64"),
+                               ("hop", "Hop (samples):", "16")):
+        Label(win, text=text, font=("Segoe UI", 10)).pack(pady=(6, 0))
+        entries[key] = Entry(win, width=20)
+        entries[key].pack()
+        entries[key].insert(0, default)
+
+    Label(win, text="Window:", font=("Segoe UI", 10)).pack(pady=(6, 0))
+    window_var = StringVar(value="hann")
+    OptionMenu(win, window_var, *logic.WINDOW_TYPES).pack()
+
+    def do_spectrogram():
+        try:
+            fs = float(entries["fs"].get())
+            frame_length = int(entries["frame"].get())
+            hop = int(entries["hop"].get())
+            if fs <= 0:
+                raise ValueError("Sampling frequency must be positive.")
+            if frame_length < 2:
+                raise ValueError("Frame length must be at least 2.")
+            if not 1 <= hop <= frame_length:
+                raise ValueError("Hop must be between 1 and the frame length.")
+            window = window_var.get()
+            # the signal may change while the job runs
+            start = logic.cur_idxs[0]
+
+            def compute(vals, progress):
+                spectra, centres = logic.stft(vals, frame_length, hop, window,
+                                              workers=os.cpu_count(), progress=progress)
+                return 20 * np.log10(np.abs(spectra) + 1e-12), centres
+
+            def done(result):
+                global spectrogram_db, spectrogram_times, spectrogram_freqs
+                spectrogram_db, centres = result
+                spectrogram_times = (centres + start) / fs
+                spectrogram_freqs = np.arange(spectrogram_db.shape[1]) * fs / frame_length
+                plot_spectrogram()
+
+            win.destroy()
+            start_job("Spectrogram", compute, logic.cur_vals, on_done=done)
+        except ValueError as ve:
+            messagebox.showerror("Error", f"Invalid input: {ve}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Spectrogram failed: {e}")
+
+    Button(win, text="Compute", command=do_spectrogram, width=12).pack(pady=8)
+    Button(win, text="Cancel", command=win.destroy, width=12).pack()
+
+def plot_spectrogram():
+    """Plot the magnitude of the last STFT over time and frequency."""
+    if spectrogram_db is None:
+        plots.hide()
+        return
+
+    layout = plots.show("spectrogram", _build_spectrogram_layout)
+    layout.update({"spectrogram": ((spectrogram_times, spectrogram_freqs), spectrogram_db)})
+
 def cmath_phase(c):
     """Return phase in radians for complex number (keeps defined if c==0)."""
     import math
@@ -609,28 +1251,15 @@ def cmath_phase(c):
 
 def plot_dft_results():
     """Plot frequency vs magnitude and frequency vs phase."""
-    clear_plot_area()
     if dft_freqs is None or dft_magnitude is None or dft_phase is None:
-        default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
+        plots.hide()
         return
 
-    fig, ax = plt.subplots(2, 1, figsize=(7, 6), dpi=100)
-    ax[0].stem(dft_freqs, dft_magnitude, basefmt=" ")
-    ax[0].set_title("DFT - Magnitude")
-    ax[0].set_xlabel("Frequency (Hz)")
-    ax[0].set_ylabel("Amplitude")
-    ax[0].grid(True)
-
-    ax[1].stem(dft_freqs, dft_phase, basefmt=" ")
-    ax[1].set_title("DFT - Phase (radians)")
-    ax[1].set_xlabel("Frequency (Hz)")
-    ax[1].set_ylabel("Phase (rad)")
-    ax[1].grid(True)
-
-    plt.tight_layout()
-    canvas = FigureCanvasTkAgg(fig, master=remaining_space_frame)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill='both', expand=True)
+    layout = plots.show("dft", _build_dft_layout)
+    layout.update({
+        "magnitude": (dft_freqs, dft_magnitude),
+        "phase": (dft_freqs, dft_phase),
+    })
 
 def show_idft_window():
     """Reconstruct time-domain signal from last computed DFT (or ask user to compute DFT first)."""
@@ -640,11 +1269,16 @@ def show_idft_window():
         return
 
     try:
-        x_recon = logic.dft(dft_spectrum, True)
+        if dft_version == logic.current.version:
+            x_recon = logic.spectrum_cache.get(logic.current, "idft")
+        else:
+            # the signal changed since the DFT, reconstruct the stored spectrum
+            x_recon = logic.dft(dft_spectrum, True)
         # set processed for plotting overlay
         global processed_vals, processed_idxs, processed_type
         processed_vals = x_recon
-        processed_idxs = logic.cur_idxs[:]  # spectrum length equals original N if used same length
+        # the indices of the signal the DFT was taken of
+        processed_idxs = dft_idxs
         processed_type = "idft_reconstruction"
         plot_processed()
         messagebox.showinfo("Reconstructed", "Signal reconstructed using IDFT and plotted.")
@@ -668,6 +1302,8 @@ signal_menu.add_command(label="Sine Wave", command=lambda: show_signal_input_win
 signal_menu.add_command(label="Cosine Wave", command=lambda: show_signal_input_window("cosine"))
 
 menubar.add_command(label="Quantize Signal", command=show_quantization_window)
+menubar.add_command(label="Live Input", command=show_live_window)
+menubar.add_command(label="Performance", command=show_performance_window)
 
 filepath = StringVar(value="No signal selected")
 
@@ -690,6 +1326,19 @@ default_ploting_label = Label(
 )
 default_ploting_label.place(relx=0.5, rely=0.5, anchor=CENTER)
 
+plots = PlotManager(remaining_space_frame, default_ploting_label)
+
+# Every change to the accumulated signal goes through the history so it can be undone.
+signal_history = history.History(logic.current)
+
+# Plotting as seen by the Performance panel; the plot functions are looked
+# up by name when called, so the instrumented versions are used.
+for _name in ("plot_accumulated", "plot_processed", "plot_quantization", "plot_dft_results",
+              "plot_spectrogram", "plot_live"):
+    instrument.register(sys.modules[__name__], _name)
+instrument.register(PlotLayout, "update", "PlotLayout.update")
+instrument.register(FigureCanvasTkAgg, "draw", "canvas.draw")
+
 # =================================================================
 # LEFT PANEL - CONTROL SECTIONS
 # =================================================================
@@ -714,7 +1363,7 @@ file_section.pack(fill=X, pady=10)
 filepath_label = Label(file_section, textvariable=filepath, font=("Segoe UI", 9), bg="#E8E8E8", wraplength=200, justify=LEFT)
 filepath_label.pack(padx=5, pady=5)
 
-browse_button = Button(file_section, text="Browse File", command=browse, width=20, bg="#4CAF50", fg="white")
+browse_button = Button(file_section, text="Browse File(s)", command=browse, width=20, bg="#4CAF50", fg="white")
 browse_button.pack(padx=5, pady=3)
 
 # --- Signal Operations Section ---
@@ -762,16 +1411,43 @@ fold_button.pack(padx=5, pady=3)
 plot_section = LabelFrame(left_panel, text="Display", font=("Segoe UI", 10, "bold"), bg="#E8E8E8", fg="#333")
 plot_section.pack(fill=X, pady=10)
 
-plot_button = Button(plot_section, text="Plot Accumulated", command=plot_accumulated, width=20, bg="#4CAF50", fg="white")
+plot_button = Button(plot_section, text="Plot Accumulated", command=lambda: plot_accumulated(), width=20, bg="#4CAF50", fg="white")
 plot_button.pack(padx=5, pady=3)
 
 reset_button = Button(plot_section, text="Reset All", command=reset_accumulated, width=20, bg="#F44336", fg="white")
 reset_button.pack(padx=5, pady=3)
 
+history_buttons_frame = Frame(plot_section, bg="#E8E8E8")
+history_buttons_frame.pack(fill=X, padx=5, pady=3)
+
+undo_button = Button(history_buttons_frame, text="Undo", command=undo_clicked, width=9, bg="#9E9E9E", fg="white")
+undo_button.pack(side=LEFT, padx=2)
+
+redo_button = Button(history_buttons_frame, text="Redo", command=redo_clicked, width=9, bg="#9E9E9E", fg="white")
+redo_button.pack(side=LEFT, padx=2)
+
+rootWin.bind("<Control-z>", undo_clicked)
+rootWin.bind("<Control-y>", redo_clicked)
+
 dft_button = Button(processing_section, text="DFT (Frequency)", command=lambda: show_dft_window(), width=20, bg="#3F51B5", fg="white")
 dft_button.pack(padx=5, pady=3)
 
 idft_button = Button(processing_section, text="IDFT (Reconstruct)", command=lambda: show_idft_window(), width=20, bg="#607D8B", fg="white")
 idft_button.pack(padx=5, pady=3)
 
+goertzel_button = Button(processing_section, text="Probe Frequencies", command=show_goertzel_window, width=20, bg="#009688", fg="white")
+goertzel_button.pack(padx=5, pady=3)
+
+spectrogram_button = Button(processing_section, text="Spectrogram", command=show_spectrogram_window, width=20, bg="#3949AB", fg="white")
+spectrogram_button.pack(padx=5, pady=3)
+
+# --- Background Job Section (packed only while a job runs) ---
+job_section = LabelFrame(left_panel, text="Running", font=("Segoe UI", 10, "bold"), bg="#E8E8E8", fg="#333")
+
+job_label = Label(job_section, text="", font=("Segoe UI", 9), bg="#E8E8E8")
+job_label.pack(padx=5, pady=3)
+
+job_cancel_button = Button(job_section, text="Cancel Job", command=cancel_job, width=20)
+job_cancel_button.pack(padx=5, pady=3)
+
 rootWin.mainloop()
\ No newline at end of file
@@ -0,0 +1,277 @@
+"""Benchmark suite for the logic operations.
+
+Usage:
+    python benchmark.py -o report.json
+    python benchmark.py --sizes 100,10000 --only convolve_short,dft
+    python benchmark.py --baseline report.json --threshold 0.25
+
+Every operation is timed on synthetic signals of 10^2 to 10^7 samples.
+Operations that look at the indices (reading, adding, shifting, folding)
+run on three index layouts:
+    dense    indices 0..N-1
+    sparse   N sorted unique indices spread over 0..10N
+    offset   dense indices starting at -10^9
+
+The report is JSON. With --baseline the run is compared against a saved
+report and exits with status 1 if any case got slower than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+import logic
+
+DEFAULT_SIZES = [10 ** k for k in range(2, 8)]
+LAYOUTS = ("dense", "sparse", "offset")
+
+# Differences below this many seconds are timer noise, never a regression.
+NOISE_FLOOR = 50e-6
+
+
+def make_signal(n, layout="dense", seed=0):
+    """Synthetic signal of n samples: a few tones plus noise on the given index layout."""
+    rng = np.random.default_rng(seed)
+    if layout == "dense":
+        idxs = np.arange(n, dtype=np.int64)
+    elif layout == "sparse":
+        idxs = np.cumsum(rng.integers(1, 20, n), dtype=np.int64)
+    elif layout == "offset":
+        idxs = np.arange(n, dtype=np.int64) - 10 ** 9
+    else:
+        raise ValueError(f"Unknown index layout: {layout}")
+    t = np.arange(n)
+    vals = (np.sin(2 * np.pi * 0.01 * t) + 0.5 * np.sin(2 * np.pi * 0.173 * t)
+            + 0.1 * rng.standard_normal(n))
+    return logic.Signal(idxs, vals)
+
+
+# Each benchmark takes (signal, layout, workdir) and returns the callable to time.
+
+def _bench_read_text(signal, layout, workdir):
+    path = os.path.join(workdir, f"read_{layout}_{len(signal)}.txt")
+    logic.write_signal(path, signal.idxs, signal.vals)
+    return lambda: logic.read_signal(path)
+
+
+def _bench_read_binary(signal, layout, workdir):
+    path = os.path.join(workdir, f"read_{layout}_{len(signal)}{logic.BINARY_SIGNAL_EXT}")
+    logic.write_signal_binary(path, signal.idxs, signal.vals)
+    # touch every value so the memory map is actually read
+    return lambda: logic.read_signal(path)[1].sum()
+
+
+def _bench_add(signal, layout, workdir):
+    other = make_signal(len(signal), layout, seed=1)
+    # includes copying the target, add_signal mutates it
+    return lambda: logic.add_signal(other.idxs, other.vals, target=signal.copy())
+
+
+def _bench_shift(signal, layout, workdir):
+    def run():
+        logic.advance_signal(signal, 3)
+        return signal.idxs
+    return run
+
+
+def _bench_fold(signal, layout, workdir):
+    def run():
+        logic.fold_signal(signal)
+        return signal.idxs
+    return run
+
+
+def _bench_multiply(signal, layout, workdir):
+    return lambda: logic.multiply(signal, 1.0)
+
+
+def _bench_moving_average(signal, layout, workdir):
+    return lambda: logic.moving_average(signal.vals, min(21, len(signal)))
+
+
+def _bench_first_derivative(signal, layout, workdir):
+    return lambda: logic.first_derivative(signal.vals)
+
+
+def _bench_second_derivative(signal, layout, workdir):
+    return lambda: logic.second_derivative(signal.vals)
+
+
+def _bench_convolve_short(signal, layout, workdir):
+    kernel = np.hanning(64)
+    return lambda: logic.convolve_signals(signal.vals, kernel)
+
+
+def _bench_convolve_long(signal, layout, workdir):
+    other = make_signal(max(len(signal) // 2, 1), seed=1).vals
+    return lambda: logic.convolve_signals(signal.vals, other)
+
+
+def _bench_convolve_parallel(signal, layout, workdir):
+    kernel = np.hanning(512)
+    return lambda: logic.convolve_signals(signal.vals, kernel, method="parallel")
+
+
+def _bench_dft(signal, layout, workdir):
+    return lambda: logic.dft(signal.vals)
+
+
+def _bench_idft(signal, layout, workdir):
+    spectrum = logic.dft(signal.vals)
+    return lambda: logic.dft(spectrum, inverse=True)
+
+
+def _bench_quantize(signal, layout, workdir):
+    return lambda: logic.quantize_signal(signal.vals, bits=8)
+
+
+def _bench_quantize_packed(signal, layout, workdir):
+    return lambda: logic.quantize_signal(signal.vals, bits=3, pack=True)
+
+
+# name -> (setup, whether the index layout matters)
+BENCHMARKS = {
+    "read_signal": (_bench_read_text, True),
+    "read_signal_binary": (_bench_read_binary, True),
+    "add_signal": (_bench_add, True),
+    "shift": (_bench_shift, True),
+    "fold": (_bench_fold, True),
+    "multiply": (_bench_multiply, False),
+    "moving_average": (_bench_moving_average, False),
+    "first_derivative": (_bench_first_derivative, False),
+    "second_derivative": (_bench_second_derivative, False),
+    "convolve_short": (_bench_convolve_short, False),
+    "convolve_long": (_bench_convolve_long, False),
+    "convolve_parallel": (_bench_convolve_parallel, False),
+    "dft": (_bench_dft, False),
+    "idft": (_bench_idft, False),
+    "quantize": (_bench_quantize, False),
+    "quantize_packed": (_bench_quantize_packed, False),
+}
+
+
+def time_call(func, repeat=5, min_time=0.02):
+    """Best seconds per call; calls are looped so one measurement takes about min_time."""
+    timer = timeit.Timer(func)
+    first = timer.timeit(1)
+    number = max(1, int(min_time / max(first, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(names, sizes, layouts=LAYOUTS, repeat=5, log=None):
+    """Time every benchmark in names for every size (and layout where it matters).
+
+    Returns the list of result dicts {"name", "layout", "n", "seconds"}.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            setup, uses_idxs = BENCHMARKS[name]
+            for n in sizes:
+                for layout in (layouts if uses_idxs else ("dense",)):
+                    func = setup(make_signal(n, layout), layout, workdir)
+                    seconds = time_call(func, repeat)
+                    results.append({"name": name, "layout": layout, "n": n, "seconds": seconds})
+                    if log is not None:
+                        log(f"{name:20s} {layout:7s} {n:>10d}  {seconds * 1e3:12.4f} ms")
+    return results
+
+
+def make_report(results):
+    return {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=0.25):
+    """Compare results against a baseline report.
+
+    Returns (rows, regressions): rows are (result, baseline seconds or None,
+    ratio or None) and regressions the rows that got slower by more than
+    threshold (0.25 = 25%) and by more than NOISE_FLOOR seconds.
+    """
+    saved = {(r["name"], r["layout"], r["n"]): r["seconds"] for r in baseline["results"]}
+    rows = []
+    regressions = []
+    for result in results:
+        before = saved.get((result["name"], result["layout"], result["n"]))
+        if before is None:
+            rows.append((result, None, None))
+            continue
+        ratio = result["seconds"] / before
+        rows.append((result, before, ratio))
+        if ratio > 1 + threshold and result["seconds"] - before > NOISE_FLOOR:
+            regressions.append(rows[-1])
+    return rows, regressions
+
+
+def _parse_list(text, allowed=None):
+    items = [item.strip() for item in text.split(",") if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown: {', '.join(unknown)}")
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the logic operations.")
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument("--sizes", help="comma separated sample counts (default 10^2..10^7)")
+    parser.add_argument("--only", help="comma separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--layouts", help="comma separated index layouts: " + ", ".join(LAYOUTS))
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats per case (best is kept)")
+    parser.add_argument("--baseline", help="saved report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail if a case is this much slower than the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    try:
+        names = _parse_list(args.only, BENCHMARKS) if args.only else list(BENCHMARKS)
+        layouts = _parse_list(args.layouts, LAYOUTS) if args.layouts else LAYOUTS
+        sizes = [int(float(s)) for s in _parse_list(args.sizes)] if args.sizes else DEFAULT_SIZES
+    except ValueError as e:
+        parser.error(str(e))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = run(names, sizes, layouts, args.repeat, log=print)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(make_report(results), file, indent=1)
+
+    if baseline is None:
+        return 0
+    rows, regressions = compare(results, baseline, args.threshold)
+    print()
+    print(f"{'benchmark':20s} {'layout':7s} {'n':>10s}  {'baseline ms':>12s} {'now ms':>12s}  ratio")
+    for result, before, ratio in rows:
+        flag = "  REGRESSION" if any(result is r[0] for r in regressions) else ""
+        before_ms = f"{before * 1e3:12.4f}" if before is not None else f"{'-':>12s}"
+        ratio_text = f"{ratio:5.2f}" if ratio is not None else "    -"
+        print(f"{result['name']:20s} {result['layout']:7s} {result['n']:>10d}  "
+              f"{before_ms} {result['seconds'] * 1e3:12.4f}  {ratio_text}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
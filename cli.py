@@ -0,0 +1,255 @@
+"""Headless batch processor: apply an operation chain to many signal files.
+
+Usage:
+    python cli.py -c "multiply:2,ma:5,derivative:1" -o out/ signals/*.txt
+    python cli.py -c "add:other.txt,fold,dft" -j 8 -o out/ signals/
+
+Operations (comma separated, arguments after colons):
+    add:FILE            add another signal file
+    sub:FILE            subtract another signal file
+    shift:K             advance by K steps (negative K delays)
+    fold                time-reverse
+    multiply:C          scale by C
+    ma:W[:MODE]         moving average, MODE trailing/centered/valid
+    derivative:1|2      first or second derivative
+    convolve:FILE[:METHOD]
+    quantize:BITS[:KIND] uniform quantizer, KIND mid_rise/mid_tread
+    dft                 spectrum, written as "amplitude phase" lines (last op,
+                        text only)
+
+Each result is written to the output directory under the base name of
+its input, so the inputs must have distinct base names. Files are fanned
+out over a process pool. Only logic and numpy are imported, never tkinter
+or matplotlib.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import logic
+
+
+def parse_chain(text):
+    """Parse "op:arg:arg,op,..." into a list of (name, args) tuples."""
+    chain = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, *args = item.split(":")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name}")
+        chain.append((name, _convert_args(name, args)))
+    if any(name == "dft" for name, _ in chain[:-1]):
+        raise ValueError("dft must be the last operation")
+    return chain
+
+
+def _convert_args(name, args):
+    """Check the number of arguments of an operation and convert them."""
+    required, optional = OPERATION_ARGS[name]
+    most = len(required) + len(optional)
+    if not len(required) <= len(args) <= most:
+        count = f"{len(required)} to {most}" if optional else f"{most}"
+        raise ValueError(f"{name} takes {count} argument(s), got {len(args)}")
+    converted = []
+    for convert, arg in zip(required + optional, args):
+        try:
+            converted.append(convert(arg))
+        except ValueError:
+            raise ValueError(f"Invalid argument for {name}: {arg!r}") from None
+    return converted
+
+
+def _positive_int(text):
+    value = int(text)
+    if value <= 0:
+        raise ValueError(text)
+    return value
+
+
+def _choice(options):
+    def convert(text):
+        if text not in options:
+            raise ValueError(text)
+        return text
+    return convert
+
+
+def _add(signal, path):
+    logic.add_signal(*logic.read_signal(path), target=signal)
+
+
+def _sub(signal, path):
+    logic.sub_signal(*logic.read_signal(path), target=signal)
+
+
+def _shift(signal, k):
+    logic.advance_signal(signal, k)
+
+
+def _fold(signal):
+    logic.fold_signal(signal)
+
+
+def _multiply(signal, c):
+    logic.multiply(signal, c)
+
+
+def _moving_average(signal, window_size, mode="trailing"):
+    vals = logic.moving_average(signal.vals, window_size, mode)
+    idxs = signal.idxs[window_size - 1:] if mode == "valid" else signal.idxs
+    signal.set(idxs, vals)
+
+
+def _derivative(signal, order="1"):
+    if order == "1":
+        signal.set(signal.idxs[1:], logic.first_derivative(signal.vals))
+    else:
+        signal.set(signal.idxs[1:-1], logic.second_derivative(signal.vals))
+
+
+def _convolve(signal, path, method="auto"):
+    _, vals2 = logic.read_signal(path)
+    vals, idxs = logic.convolve_signals(signal.vals, vals2, method)
+    signal.set(idxs, vals)
+
+
+def _quantize(signal, bits, kind="mid_rise"):
+    signal.vals, _, _ = logic.quantize_signal(signal.vals, bits=bits, kind=kind)
+
+
+OPERATIONS = {
+    "add": _add,
+    "sub": _sub,
+    "shift": _shift,
+    "fold": _fold,
+    "multiply": _multiply,
+    "ma": _moving_average,
+    "derivative": _derivative,
+    "convolve": _convolve,
+    "quantize": _quantize,
+    "dft": None,
+}
+
+# Converters of the required and the optional arguments of every operation;
+# parse_chain applies them so a bad chain fails before any file is read.
+OPERATION_ARGS = {
+    "add": ((str,), ()),
+    "sub": ((str,), ()),
+    "shift": ((int,), ()),
+    "fold": ((), ()),
+    "multiply": ((float,), ()),
+    "ma": ((_positive_int,), (_choice(logic.MOVING_AVERAGE_MODES),)),
+    "derivative": ((), (_choice(("1", "2")),)),
+    "convolve": ((str,), (_choice(logic.CONV_METHODS),)),
+    "quantize": ((_positive_int,), (_choice(logic.QUANTIZER_KINDS),)),
+    "dft": ((), ()),
+}
+
+
+def write_spectrum(filepath, spectrum):
+    """Write a spectrum as a frequency-domain signal file of "amplitude phase" lines."""
+    lines = map("{} {}\n".format, np.abs(spectrum).tolist(), np.angle(spectrum).tolist())
+    with open(filepath, "w") as file:
+        file.write(f"1\n0\n{len(spectrum)}\n")
+        file.write("".join(lines))
+
+
+def _output_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def process_file(path, chain, output_dir, binary=False):
+    """Apply the chain to one file and write the result; runs in a worker.
+
+    Returns (path, input samples, output samples, seconds).
+    """
+    start = time.perf_counter()
+    signal = logic.Signal(*logic.read_signal(path))
+    n_in = len(signal)
+    name = _output_name(path)
+
+    for op, args in chain:
+        if op == "dft":
+            spectrum = logic.dft(signal.vals)
+            write_spectrum(os.path.join(output_dir, name + ".txt"), spectrum)
+            return path, n_in, len(spectrum), time.perf_counter() - start
+        OPERATIONS[op](signal, *args)
+
+    if binary:
+        out_path = os.path.join(output_dir, name + logic.BINARY_SIGNAL_EXT)
+        logic.write_signal_binary(out_path, signal.idxs, signal.vals)
+    else:
+        logic.write_signal(os.path.join(output_dir, name + ".txt"), signal.idxs, signal.vals)
+    return path, n_in, len(signal), time.perf_counter() - start
+
+
+def collect_inputs(paths):
+    """Expand directories into the signal files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.listdir(path)):
+                if entry.lower().endswith((".txt", logic.BINARY_SIGNAL_EXT)):
+                    files.append(os.path.join(path, entry))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a DSP operation chain to many signal files.")
+    parser.add_argument("inputs", nargs="+", help="signal files or directories")
+    parser.add_argument("-c", "--chain", required=True, help='operations, e.g. "multiply:2,ma:5,dft"')
+    parser.add_argument("-o", "--output-dir", required=True, help="directory for the results")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--binary", action="store_true", help="write results in the binary format")
+    args = parser.parse_args(argv)
+
+    try:
+        chain = parse_chain(args.chain)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.binary and chain and chain[-1][0] == "dft":
+        parser.error("--binary cannot be used with dft (spectra are written as text)")
+    files = collect_inputs(args.inputs)
+    if not files:
+        parser.error("no input files")
+    by_name = {}
+    for path in files:
+        by_name.setdefault(_output_name(path), []).append(path)
+    clashes = [paths for paths in by_name.values() if len(paths) > 1]
+    if clashes:
+        parser.error("inputs would overwrite each other's results: "
+                     + "; ".join(", ".join(paths) for paths in clashes))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    total_samples = 0
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(process_file, f, chain, args.output_dir, args.binary) for f in files]
+        for path, future in zip(files, futures):
+            try:
+                _, n_in, n_out, seconds = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"{path}: FAILED: {e}", file=sys.stderr)
+                continue
+            total_samples += n_in
+            print(f"{path}: {n_in} -> {n_out} samples in {seconds * 1000:.1f} ms")
+    elapsed = time.perf_counter() - start
+
+    done = len(files) - failures
+    print(f"{done}/{len(files)} files, {total_samples} samples in {elapsed:.2f} s "
+          f"({done / elapsed:.1f} files/s, {total_samples / elapsed / 1e6:.2f} Msamples/s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
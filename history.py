@@ -0,0 +1,213 @@
+"""Undo/redo of the operations applied to a Signal.
+
+    history = History(logic.current)
+    history.shift(3)
+    history.multiply(2.0)
+    history.apply("add", logic.add_signals, signals)
+    history.undo()      # -> "add"
+    history.redo()
+
+Shifts and folds are recorded as just the operation; undo applies the
+inverse (shift by -k, fold again), which is O(1) and exact. A multiply by
+c != 0 of a float signal is recorded the same way, undo multiplies by 1/c,
+which is exact up to rounding; multiply(c, exact=True) keeps the state
+instead. Every other operation, including a multiply by 0 or of an
+integer signal, keeps the state of the signal from before it, taken with
+Signal.state(): the arrays are shared, not copied. Signal methods replace
+their arrays instead of writing into them, so a state only costs memory
+once later operations replaced the arrays it refers to. Undo and redo of
+those operations restore a state, also in O(1).
+
+Arrays that only the history keeps alive count against max_bytes. When it
+is exceeded the oldest states are dropped first. An exact multiply then
+falls back to undoing by 1/c; any other operation ends the undo history
+at that point.
+"""
+import logic
+
+
+class _Record:
+    __slots__ = ("name", "redo_op", "undo_op", "before", "after")
+
+    def __init__(self, name, redo_op=None, undo_op=None, before=None):
+        self.name = name
+        self.redo_op = redo_op
+        self.undo_op = undo_op
+        self.before = before
+        self.after = None
+
+
+class History:
+    """Undo and redo stacks for one Signal.
+
+    All changes to the signal must go through the history (shift, fold,
+    multiply, apply); if the signal changed behind its back, undo and redo
+    clear the history instead of restoring a stale state.
+    """
+
+    def __init__(self, signal, max_bytes=1 << 28, max_records=1000):
+        self.signal = signal
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self._undo = []
+        self._redo = []
+        self._version = signal.version
+        # id -> [array, number of states holding it] for the arrays of all
+        # kept states, and their total size, updated as states come and go
+        self._arrays = {}
+        self._held_bytes = 0
+
+    def __len__(self):
+        return len(self._undo)
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def shift(self, k):
+        """Move every index by +k (see Signal.shift)."""
+        self._check()
+        logic.advance_signal(self.signal, k)
+        self._push(_Record(f"shift {k:+d}", lambda s: logic.advance_signal(s, k),
+                           lambda s: logic.delay_signal(s, k)))
+
+    def fold(self):
+        self._check()
+        logic.fold_signal(self.signal)
+        self._push(_Record("fold", logic.fold_signal, logic.fold_signal))
+
+    def multiply(self, c, exact=False):
+        """Multiply the values by c (see logic.multiply).
+
+        Undo multiplies by 1/c unless c is 0 or the signal has integer
+        values; those, and every multiply with exact=True, keep the state
+        from before so undo restores it bit for bit.
+        """
+        self._check()
+        undo_op = None
+        if c != 0 and self.signal.dtype.kind not in "biu":
+            undo_op = lambda s: logic.multiply(s, 1 / c)
+        before = self._hold(self.signal.state()) if exact or undo_op is None else None
+        logic.multiply(self.signal, c)
+        self._push(_Record(f"multiply {c:g}", lambda s: logic.multiply(s, c), undo_op, before))
+
+    def apply(self, name, func, *args, **kwargs):
+        """Run func(*args, **kwargs), which changes the signal, as one undoable step.
+
+        Returns what func returned. Nothing is recorded if the signal did
+        not change.
+        """
+        self._check()
+        before = self.signal.state()
+        result = func(*args, **kwargs)
+        if self.signal.version != before[-1]:
+            self._push(_Record(name, before=self._hold(before)))
+        return result
+
+    def undo(self):
+        """Undo the last operation; returns its name, or None if there is none."""
+        if not self._check() or not self._undo:
+            return None
+        record = self._undo.pop()
+        if record.before is not None:
+            record.after = self._hold(self.signal.state())
+            self.signal.restore(record.before)
+            record.before = self._release(record.before)
+        else:
+            record.undo_op(self.signal)
+        self._redo.append(record)
+        self._version = self.signal.version
+        self._trim()
+        return record.name
+
+    def redo(self):
+        """Redo the last undone operation; returns its name, or None if there is none."""
+        if not self._check() or not self._redo:
+            return None
+        record = self._redo.pop()
+        if record.after is not None:
+            record.before = self._hold(self.signal.state())
+            self.signal.restore(record.after)
+            record.after = self._release(record.after)
+        else:
+            record.redo_op(self.signal)
+        self._undo.append(record)
+        self._version = self.signal.version
+        return record.name
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._arrays.clear()
+        self._held_bytes = 0
+        self._version = self.signal.version
+
+    def nbytes(self):
+        """Bytes of the arrays kept alive only by the history."""
+        total = self._held_bytes
+        for array in {id(a): a for a in self.signal.state()[:2]}.values():
+            if id(array) in self._arrays:
+                total -= array.nbytes
+        return total
+
+    def _hold(self, state):
+        """Count the arrays of a state that is about to be kept; returns it."""
+        for array in state[:2]:
+            entry = self._arrays.get(id(array))
+            if entry is None:
+                self._arrays[id(array)] = [array, 1]
+                self._held_bytes += array.nbytes
+            else:
+                entry[1] += 1
+        return state
+
+    def _release(self, state):
+        """Uncount the arrays of a state that is dropped; returns None."""
+        if state is not None:
+            for array in state[:2]:
+                entry = self._arrays[id(array)]
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._arrays[id(array)]
+                    self._held_bytes -= array.nbytes
+        return None
+
+    def _drop(self, records):
+        for record in records:
+            record.before = self._release(record.before)
+            record.after = self._release(record.after)
+
+    def _check(self):
+        if self.signal.version != self._version:
+            self.clear()
+            return False
+        return True
+
+    def _push(self, record):
+        self._undo.append(record)
+        self._drop(self._redo)
+        self._redo.clear()
+        self._version = self.signal.version
+        self._trim()
+
+    def _trim(self):
+        if len(self._undo) > self.max_records:
+            self._drop(self._undo[:-self.max_records])
+            del self._undo[:-self.max_records]
+        while self.nbytes() > self.max_bytes:
+            oldest = next((i for i, r in enumerate(self._undo) if r.before is not None), None)
+            if oldest is None:
+                # only undone operations hold states; give up redoing them
+                self._drop(self._redo)
+                self._redo.clear()
+                return
+            record = self._undo[oldest]
+            if record.undo_op is not None:
+                record.before = self._release(record.before)
+            else:
+                self._drop(self._undo[:oldest + 1])
+                del self._undo[:oldest + 1]
@@ -0,0 +1,213 @@
+"""Opt-in instrumentation of the logic operations and the GUI plotting.
+
+    import instrument
+    instrument.enable()             # memory=True also tracks peak allocations
+    ...
+    instrument.stats()["read_signal"]["total"]
+    instrument.export_csv("calls.csv")
+
+enable() replaces every registered function with a timing wrapper and
+disable() puts the originals back, so while disabled nothing is wrapped
+and there is no overhead at all. Calls made inside logic go through the
+module globals and are timed as well, e.g. _parse_block under read_signal
+or _merge_add under add_signal; times are inclusive of nested calls.
+
+Per call the wall time, the input and output sample counts and, with
+memory=True, the tracemalloc peak above the memory in use at the start are
+recorded. Tracing allocations slows everything down noticeably, which is
+why it is a separate switch.
+"""
+import csv
+import functools
+import inspect
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+import logic
+
+# Internal logic functions worth seeing on their own next to the public API.
+LOGIC_INTERNALS = (
+    "_parse_block", "_merge_add", "_fft_core", "_convolve_direct", "_convolve_fft",
+    "_convolve_overlap_add", "_convolve_overlap_save",
+)
+
+# Calls kept for export; the aggregated statistics cover every call.
+MAX_RECORDS = 100000
+
+_targets = {}
+_originals = {}
+_stats = {}
+_records = deque(maxlen=MAX_RECORDS)
+_lock = threading.Lock()
+_local = threading.local()
+_memory = False
+_started_tracing = False
+
+
+def register(owner, attribute, name=None):
+    """Add owner.attribute (a module or class function) to the instrumented set.
+
+    name is the label used in the statistics, by default the attribute name.
+    Takes effect on the next enable() if instrumentation is already on.
+    """
+    _targets[name or attribute] = (owner, attribute)
+
+
+def _register_logic():
+    for attribute, value in vars(logic).items():
+        if not inspect.isfunction(value) or value.__module__ != "logic":
+            continue
+        # a generator would only be timed while it is created
+        if inspect.isgeneratorfunction(value):
+            continue
+        if not attribute.startswith("_") or attribute in LOGIC_INTERNALS:
+            register(logic, attribute)
+    register(logic.SpectrumCache, "get", "SpectrumCache.get")
+
+
+_register_logic()
+
+
+def _size(obj):
+    """Number of samples in an argument or result, 0 for anything else."""
+    if isinstance(obj, np.ndarray):
+        return obj.size
+    if isinstance(obj, (list, tuple)):
+        # an (idxs, vals) or (vals, idxs) pair is one signal, not two
+        if (len(obj) == 2 and all(isinstance(item, np.ndarray) for item in obj)
+                and obj[0].shape == obj[1].shape):
+            return obj[1].size
+        if obj and isinstance(obj[0], (np.ndarray, list, tuple, logic.Signal)):
+            return sum(_size(item) for item in obj)
+        return len(obj)
+    if isinstance(obj, logic.Signal):
+        return len(obj)
+    return 0
+
+
+def _wrap(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        peaks = getattr(_local, "peaks", None)
+        if peaks is None:
+            peaks = _local.peaks = []
+        memory = _memory and tracemalloc.is_tracing()
+        if memory:
+            # remember the caller's peak so far before resetting it for this call
+            current, peak = tracemalloc.get_traced_memory()
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            tracemalloc.reset_peak()
+            peaks.append(current)
+            base = current
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = 0
+            if memory:
+                peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+                peak_bytes = peak - base
+        in_size = sum(_size(a) for a in args) + sum(_size(v) for v in kwargs.values())
+        _record(name, start, seconds, in_size, _size(result), peak_bytes)
+        return result
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _record(name, start, seconds, in_size, out_size, peak_bytes):
+    with _lock:
+        s = _stats.get(name)
+        if s is None:
+            s = _stats[name] = {"calls": 0, "total": 0.0, "min": float("inf"), "max": 0.0,
+                                "in_samples": 0, "out_samples": 0, "peak_bytes": 0}
+        s["calls"] += 1
+        s["total"] += seconds
+        s["min"] = min(s["min"], seconds)
+        s["max"] = max(s["max"], seconds)
+        s["in_samples"] += in_size
+        s["out_samples"] += out_size
+        s["peak_bytes"] = max(s["peak_bytes"], peak_bytes)
+        _records.append((name, start, seconds, in_size, out_size, peak_bytes))
+
+
+def enable(memory=False):
+    """Start recording; memory=True also traces allocations with tracemalloc."""
+    global _memory, _started_tracing
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    for name, (owner, attribute) in _targets.items():
+        if name not in _originals:
+            func = getattr(owner, attribute)
+            _originals[name] = func
+            setattr(owner, attribute, _wrap(name, func))
+
+
+def disable():
+    """Stop recording and restore the original functions. Statistics are kept."""
+    global _memory, _started_tracing
+    for name, func in _originals.items():
+        owner, attribute = _targets[name]
+        setattr(owner, attribute, func)
+    _originals.clear()
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    _memory = False
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    """Forget every recorded call."""
+    with _lock:
+        _stats.clear()
+        _records.clear()
+
+
+def stats():
+    """Aggregated statistics: {name: {calls, total, mean, min, max, in_samples, out_samples, peak_bytes}}.
+
+    Times are in seconds, peak_bytes is the largest per-call peak.
+    """
+    with _lock:
+        result = {name: dict(s) for name, s in _stats.items()}
+    for s in result.values():
+        s["mean"] = s["total"] / s["calls"]
+    return result
+
+
+RECORD_FIELDS = ("name", "start", "seconds", "in_samples", "out_samples", "peak_bytes")
+
+
+def records():
+    """The most recent calls (up to MAX_RECORDS) as dicts of RECORD_FIELDS."""
+    with _lock:
+        return [dict(zip(RECORD_FIELDS, r)) for r in _records]
+
+
+def export_json(filepath):
+    """Write the statistics and the call log as JSON."""
+    with open(filepath, "w") as file:
+        json.dump({"stats": stats(), "records": records()}, file, indent=1)
+
+
+def export_csv(filepath):
+    """Write the call log as CSV, one row per call."""
+    with open(filepath, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(RECORD_FIELDS)
+        with _lock:
+            writer.writerows(_records)
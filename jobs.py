@@ -0,0 +1,95 @@
+"""Background jobs for the GUI.
+
+A job runs a function on a worker thread so the Tk event loop keeps
+running. Tk itself is only touched from the main thread: run_job polls the
+job with root.after and calls the progress and completion callbacks there.
+
+Cancellation is cooperative. The job function gets a progress(fraction)
+callback as its `progress` keyword and should call it from its long loops;
+once cancel() was requested the next call raises JobCancelled, which ends
+the job without a result.
+"""
+import threading
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by its progress callback after cancel()."""
+
+
+class Job:
+    """A function running on a worker thread.
+
+    After the thread finished exactly one of result, error or cancelled is
+    set.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.fraction = 0.0
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.func(*self.args, progress=self.progress, **self.kwargs)
+        except JobCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+
+    def progress(self, fraction):
+        """Record progress (0..1); raises JobCancelled once cancel() was called."""
+        self.fraction = fraction
+        if self._cancel.is_set():
+            raise JobCancelled
+
+    def cancel(self):
+        """Ask the job to stop at its next progress report."""
+        self._cancel.set()
+
+    @property
+    def done(self):
+        return not self._thread.is_alive()
+
+
+def run_job(root, func, *args, on_done=None, on_error=None, on_cancel=None,
+            on_progress=None, poll_ms=50, **kwargs):
+    """Start func(*args, progress=..., **kwargs) on a worker thread.
+
+    Args:
+        root: Tk widget whose after() schedules the polling
+        on_done: called with the result when the job finished
+        on_error: called with the exception if the job failed
+        on_cancel: called without arguments if the job was cancelled
+        on_progress: called with the latest fraction on every poll
+        poll_ms: polling interval in milliseconds
+
+    All callbacks run on the Tk thread. Returns the Job.
+    """
+    job = Job(func, *args, **kwargs).start()
+
+    def poll():
+        if not job.done:
+            if on_progress is not None:
+                on_progress(job.fraction)
+            root.after(poll_ms, poll)
+        elif job.cancelled:
+            if on_cancel is not None:
+                on_cancel()
+        elif job.error is not None:
+            if on_error is not None:
+                on_error(job.error)
+        elif on_done is not None:
+            on_done(job.result)
+
+    root.after(poll_ms, poll)
+    return job
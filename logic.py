@@ -1,88 +1,1489 @@
-cur_vals = []
-cur_idxs = []
-def read_signal(filepath, idxs, vals):
-    """extracts the input from the filepath into idxs and vals (2 lists)"""
-    text_input = []
-    with open(filepath) as file:
-        text_input = file.readlines()[2:]
-
-    n = int(text_input[0].strip())
-    text_input = text_input[1:]
-    for i in range(n):
-        c, d = text_input[i].strip().split()
-        idxs.append(int(c))
-        vals.append(int(d))
-
-def sub_signal(idxs, vals):
-    vals = [-1 * val for val in vals]
-    return add_signal(idxs, vals)
-
-def advance_signal(idxs, vals, k):
-    for i in range(len(idxs)):
-        idxs[i] = idxs[i] + k 
-
-
-def delay_signal(idxs, vals, k):
-    for i in range(len(idxs)):
-            idxs[i] = idxs[i] - k 
-            
-def fold_signal(idxs, vals):
-    for i in range(len(idxs)):
-            idxs[i] = idxs[i] * -1 
-
-def moving_average(vals, window_size):
-    """Compute moving average of signal values.
-    
+import itertools
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+# Versions are unique across all signals, so a version alone identifies
+# the contents a cached result was computed from.
+_signal_versions = itertools.count(1)
+
+
+def _reduce_by_index(idxs, vals):
+    """Sort by index and sum the values of repeated indices.
+
+    Strictly ascending input is returned as is; anything else goes through
+    one stable sort and a reduceat over the runs of equal indices.
+    """
+    if len(idxs) < 2 or np.all(idxs[1:] > idxs[:-1]):
+        return idxs, vals
+    order = np.argsort(idxs, kind="stable")
+    idxs = idxs[order]
+    starts = np.flatnonzero(np.concatenate(([True], idxs[1:] != idxs[:-1])))
+    return idxs[starts], np.add.reduceat(vals[order], starts)
+
+
+class Signal:
+    """Discrete signal stored as two contiguous arrays.
+
+    Indices (int64) and values (explicit dtype, float64 by default) take 16
+    bytes per sample instead of two boxed Python numbers.
+
+    The stored base indices are ascending; the real indices are the affine
+    view sign * base + offset, so shifting and folding only touch offset and
+    sign. idxs and vals always read in ascending index order: a folded
+    signal is read back to front (a reversed view, no copy or sort).
+
+    version changes on every mutation made through the methods and the vals
+    setter (copies share it until one of them changes). Code that writes
+    into the arrays in place must call touch().
+    """
+
+    __slots__ = ("_base", "_vals", "offset", "sign", "_idxs", "version")
+
+    def __init__(self, idxs=(), vals=(), dtype=np.float64):
+        self._vals = np.array(vals, dtype=dtype)
+        self.set(np.array(idxs, dtype=np.int64), self._vals)
+
+    def __len__(self):
+        return len(self._base)
+
+    def __repr__(self):
+        return f"Signal(n={len(self)}, dtype={self.dtype}, offset={self.offset}, sign={self.sign})"
+
+    def touch(self):
+        """Mark the contents as changed, invalidating cached spectra."""
+        self.version = next(_signal_versions)
+
+    @property
+    def dtype(self):
+        return self._vals.dtype
+
+    @property
+    def nbytes(self):
+        return self._base.nbytes + self._vals.nbytes
+
+    @property
+    def idxs(self):
+        """Concrete ascending indices, materialised once per transform."""
+        if self._idxs is None:
+            if self.sign > 0:
+                self._idxs = self._base + self.offset if self.offset else self._base
+            else:
+                self._idxs = (self.offset - self._base)[::-1]
+        return self._idxs
+
+    @property
+    def vals(self):
+        return self._vals if self.sign > 0 else self._vals[::-1]
+
+    @vals.setter
+    def vals(self, vals):
+        vals = np.asarray(vals, dtype=self.dtype)
+        if vals.shape != self._base.shape:
+            raise ValueError("vals must have one value per index")
+        self._vals = vals if self.sign > 0 else vals[::-1]
+        self.touch()
+
+    def copy(self):
+        other = Signal.__new__(Signal)
+        other._base = self._base.copy()
+        other._vals = self._vals.copy()
+        other.offset = self.offset
+        other.sign = self.sign
+        other._idxs = None
+        other.version = self.version
+        return other
+
+    def state(self):
+        """The contents as a tuple sharing the arrays, taken in O(1).
+
+        Every method replaces the arrays instead of writing into them, so a
+        state stays valid until someone writes into the arrays in place.
+        """
+        return (self._base, self._vals, self.offset, self.sign, self.version)
+
+    def restore(self, state):
+        """Go back to a state() in O(1), version included."""
+        self._base, self._vals, self.offset, self.sign, self.version = state
+        self._idxs = None
+
+    def set(self, idxs, vals):
+        """Replace the contents, keeping the value dtype.
+
+        Unsorted indices are sorted and the values of repeated indices summed.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64)
+        vals = np.asarray(vals, dtype=self.dtype)
+        if idxs.shape != vals.shape or idxs.ndim != 1:
+            raise ValueError("idxs and vals must be 1-D and the same length")
+        self._base, self._vals = _reduce_by_index(idxs, vals)
+        self.offset = 0
+        self.sign = 1
+        self._idxs = None
+        self.touch()
+
+    def clear(self):
+        self.set((), ())
+
+    def promote(self, dtype):
+        """Widen the value dtype if values of dtype would change kind in it.
+
+        An integer signal that receives floats becomes a float signal instead
+        of truncating them; a float32 signal stays float32.
+        """
+        if not np.can_cast(dtype, self.dtype, "same_kind"):
+            self._vals = self._vals.astype(np.result_type(self.dtype, dtype))
+            self.touch()
+
+    def shift(self, k):
+        """Move every index by +k in O(1)."""
+        self.offset += k
+        self._idxs = None
+        self.touch()
+
+    def fold(self):
+        """Time-reverse n -> -n in O(1)."""
+        self.sign = -self.sign
+        self.offset = -self.offset
+        self._idxs = None
+        self.touch()
+
+    def materialize(self):
+        """Bake the pending shift/fold into the stored arrays."""
+        if self.offset or self.sign < 0:
+            idxs, vals = self.idxs.copy(), self.vals.copy()
+            self.set(idxs, vals)
+
+
+# The accumulated signal the GUI works on.
+current = Signal()
+
+
+def __getattr__(name):
+    # compatibility: logic.cur_idxs / logic.cur_vals read the current signal
+    if name == "cur_idxs":
+        return current.idxs
+    if name == "cur_vals":
+        return current.vals
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Samples parsed per block by read_signal; iter_signal_chunks takes its own size.
+READ_CHUNK_SIZE = 1 << 20
+
+
+def _read_header(file, filepath):
+    """Skip the two leading header lines and return the sample count N."""
+    file.readline()
+    file.readline()
+    line = file.readline()
+    try:
+        return int(line.strip())
+    except ValueError:
+        raise ValueError(f"{filepath}:3: expected the sample count, got {line.strip().decode(errors='replace')!r}") from None
+
+
+def _two_fields_per_line(data, lines):
+    """True if each of the joined lines holds exactly two whitespace separated fields."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    space = buf <= 32
+    # position of the first byte of every field
+    fields = np.flatnonzero(space[:-1] & ~space[1:]) + 1
+    if len(buf) and not space[0]:
+        fields = np.concatenate(([0], fields))
+    if len(fields) != 2 * len(lines):
+        return False
+    ends = np.cumsum(np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)))
+    starts = np.concatenate(([0], ends[:-1]))
+    # with 2 * len(lines) fields in total, fields 2k and 2k+1 both lying on
+    # line k means every line has exactly two
+    return bool(np.all(fields[0::2] >= starts) and np.all(fields[1::2] < ends))
+
+
+def _parse_block(lines, first_line_no, filepath):
+    """Convert a block of 'index value' lines into (int64, float64) arrays."""
+    data = b"".join(lines)
+    try:
+        flat = np.fromstring(data, sep=" ")
+    except ValueError:
+        flat = None
+    # the total alone would accept "1 2 3" followed by "4"
+    if flat is not None and flat.size == 2 * len(lines) and _two_fields_per_line(data, lines):
+        if np.abs(flat[0::2]).max() >= 2 ** 53:
+            # float64 rounds indices this large; parse the index column exactly
+            try:
+                idxs = np.array([int(line.split()[0]) for line in lines], dtype=np.int64)
+            except (ValueError, OverflowError):
+                idxs = None
+            if idxs is not None:
+                return idxs, flat[1::2].copy()
+        else:
+            idxs = flat[0::2].astype(np.int64)
+            if np.array_equal(idxs, flat[0::2]):
+                return idxs, flat[1::2].copy()
+
+    # slow path only to point at the offending line
+    for line_no, line in enumerate(lines, first_line_no):
+        parts = line.split()
+        try:
+            if len(parts) != 2 or not -2 ** 63 <= int(parts[0]) < 2 ** 63:
+                raise ValueError
+            float(parts[1])
+        except ValueError:
+            text = line.strip().decode(errors="replace")
+            raise ValueError(f"{filepath}:{line_no}: expected 'index value', got {text!r}") from None
+    raise ValueError(f"{filepath}: malformed sample block at line {first_line_no}")
+
+
+def iter_signal_chunks(filepath, chunk_size=65536):
+    """Yield (idxs, vals) array blocks of at most chunk_size samples.
+
+    Only one block is held in memory at a time, so files larger than RAM can
+    be streamed.
+    """
+    if is_binary_signal(filepath):
+        _, idxs, vals = _open_signal_binary(filepath)
+        for start in range(0, len(vals), chunk_size):
+            yield np.asarray(idxs[start:start + chunk_size]), vals[start:start + chunk_size]
+        return
+
+    with open(filepath, "rb") as file:
+        n = _read_header(file, filepath)
+        line_no = 4
+        remaining = n
+        while remaining > 0:
+            lines = list(itertools.islice(file, min(chunk_size, remaining)))
+            if not lines:
+                raise ValueError(f"{filepath}: header says {n} samples but the file has {n - remaining}")
+            yield _parse_block(lines, line_no, filepath)
+            line_no += len(lines)
+            remaining -= len(lines)
+
+
+def read_signal(filepath, idxs=None, vals=None):
+    """Read a signal file into (idxs, vals) arrays.
+
+    The format is two header lines, the sample count N, then N lines of
+    "index value". Malformed lines raise ValueError with the line number.
+    Files with the binary extension are memory-mapped by read_signal_binary.
+    Lists passed as idxs / vals are extended as well (old API).
+    """
+    if is_binary_signal(filepath):
+        out_idxs, out_vals = read_signal_binary(filepath)
+    else:
+        blocks = list(iter_signal_chunks(filepath, READ_CHUNK_SIZE))
+        if blocks:
+            out_idxs = np.concatenate([b[0] for b in blocks])
+            out_vals = np.concatenate([b[1] for b in blocks])
+        else:
+            out_idxs = np.zeros(0, dtype=np.int64)
+            out_vals = np.zeros(0)
+
+    if idxs is not None:
+        idxs.extend(out_idxs.tolist())
+    if vals is not None:
+        vals.extend(out_vals.tolist())
+    return out_idxs, out_vals
+
+def write_signal(filepath, idxs, vals, signal_type=0):
+    """Write a signal in the text format read by read_signal.
+
+    The two header lines hold the signal type (0 time, 1 frequency) and a
+    periodic flag (always 0 here).
+    """
+    idxs = np.asarray(idxs, dtype=np.int64)
+    vals = np.asarray(vals)
+    # integer-valued samples are written without a decimal point
+    if vals.dtype.kind == "f" and np.array_equal(vals, np.rint(vals)):
+        vals = vals.astype(np.int64)
+    with open(filepath, "w") as file:
+        file.write(f"{signal_type}\n0\n{len(vals)}\n")
+        for start in range(0, len(vals), READ_CHUNK_SIZE):
+            stop = start + READ_CHUNK_SIZE
+            lines = map("{} {}\n".format, idxs[start:stop].tolist(), vals[start:stop].tolist())
+            file.write("".join(lines))
+
+
+# Binary signal container (".sig"):
+#   32-byte little-endian header: magic, version, flags, value dtype code,
+#   sample count, start index; then the raw values, then (only if the
+#   indices are not start, start+1, ...) the raw int64 index array.
+BINARY_SIGNAL_EXT = ".sig"
+_BINARY_MAGIC = b"DSPS"
+_BINARY_VERSION = 1
+_BINARY_HEADER = "<4sBB2sQq8x"
+_BINARY_HEADER_SIZE = 32
+_BINARY_EXPLICIT_IDXS = 1
+
+
+def is_binary_signal(filepath):
+    return str(filepath).lower().endswith(BINARY_SIGNAL_EXT)
+
+
+def _binary_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind not in "fiu" or dtype.itemsize > 8:
+        raise ValueError(f"Unsupported value dtype for binary signals: {dtype}")
+    return dtype.newbyteorder("<")
+
+
+def _binary_header(count, start, dtype, explicit):
+    import struct
+
+    code = dtype.str[1:].encode()
+    flags = _BINARY_EXPLICIT_IDXS if explicit else 0
+    return struct.pack(_BINARY_HEADER, _BINARY_MAGIC, _BINARY_VERSION, flags, code, count, start)
+
+
+def write_signal_binary(filepath, idxs, vals, dtype=np.float64):
+    """Write a signal to the binary container format.
+
+    Indices that run start, start+1, ... are stored as just the start index.
+    """
+    idxs = np.asarray(idxs, dtype="<i8")
+    dtype = _binary_dtype(dtype)
+    vals = np.asarray(vals, dtype=dtype)
+    if idxs.shape != vals.shape:
+        raise ValueError("idxs and vals must be the same length")
+    start = int(idxs[0]) if len(idxs) else 0
+    explicit = not np.array_equal(idxs, np.arange(start, start + len(idxs)))
+
+    with open(filepath, "wb") as file:
+        file.write(_binary_header(len(vals), start, dtype, explicit))
+        file.write(vals.tobytes())
+        if explicit:
+            file.write(idxs.tobytes())
+
+
+class BinarySignalWriter:
+    """Write a binary signal file block by block with bounded memory.
+
+    Values go straight to the file, indices to a temporary file that is only
+    appended if they turn out not to be contiguous; the header is written on
+    close(). Usable as a context manager.
+    """
+
+    def __init__(self, filepath, dtype=np.float64):
+        import tempfile
+
+        self.dtype = _binary_dtype(dtype)
+        self.count = 0
+        self._start = None
+        self._contiguous = True
+        self._file = open(filepath, "wb")
+        self._file.write(bytes(_BINARY_HEADER_SIZE))
+        self._idx_file = tempfile.TemporaryFile()
+
+    def write(self, idxs, vals):
+        idxs = np.asarray(idxs, dtype="<i8")
+        if len(idxs) == 0:
+            return
+        if self._start is None:
+            self._start = int(idxs[0])
+        if self._contiguous:
+            expected = self._start + self.count
+            self._contiguous = np.array_equal(idxs, np.arange(expected, expected + len(idxs)))
+        self._file.write(np.asarray(vals, dtype=self.dtype).tobytes())
+        self._idx_file.write(idxs.tobytes())
+        self.count += len(idxs)
+
+    def close(self):
+        import shutil
+
+        if self._file.closed:
+            return
+        if not self._contiguous:
+            self._idx_file.seek(0)
+            shutil.copyfileobj(self._idx_file, self._file)
+        self._file.seek(0)
+        self._file.write(_binary_header(self.count, self._start or 0, self.dtype, not self._contiguous))
+        self._file.close()
+        self._idx_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_text_to_binary(txt_path, bin_path, dtype=np.float64, chunk_size=65536):
+    """Convert a .txt signal file to the binary format, one chunk at a time."""
+    with BinarySignalWriter(bin_path, dtype) as writer:
+        for idxs, vals in iter_signal_chunks(txt_path, chunk_size):
+            writer.write(idxs, vals)
+
+
+def _open_signal_binary(filepath):
+    import struct
+
+    with open(filepath, "rb") as file:
+        header = file.read(_BINARY_HEADER_SIZE)
+    if len(header) < _BINARY_HEADER_SIZE:
+        raise ValueError(f"{filepath}: truncated binary signal header")
+    magic, version, flags, code, count, start = struct.unpack(_BINARY_HEADER, header)
+    if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+        raise ValueError(f"{filepath}: not a binary signal file (version {_BINARY_VERSION})")
+    dtype = _binary_dtype("<" + code.decode())
+
+    if count == 0:
+        return start, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=dtype)
+    vals = np.memmap(filepath, dtype=dtype, mode="r", offset=_BINARY_HEADER_SIZE, shape=(count,))
+    if flags & _BINARY_EXPLICIT_IDXS:
+        idxs = np.memmap(filepath, dtype="<i8", mode="r",
+                         offset=_BINARY_HEADER_SIZE + count * dtype.itemsize, shape=(count,))
+    else:
+        idxs = np.arange(start, start + count, dtype=np.int64)
+    return start, idxs, vals
+
+
+def read_signal_binary(filepath):
+    """Memory-map a binary signal file and return (idxs, vals).
+
+    Nothing is read up front: pages are pulled in lazily as the arrays are
+    used, and the read-only maps are never written through.
+    """
+    _, idxs, vals = _open_signal_binary(filepath)
+    return idxs, vals
+
+def sub_signal(idxs, vals, target=None):
+    """Subtract the given signal from the current signal (or target)."""
+    return add_signal(idxs, -np.asarray(vals, dtype=float), target)
+
+def advance_signal(signal, k):
+    """Shift the signal k steps: x(n) -> x(n+k) moves every index by +k."""
+    signal.shift(k)
+
+
+def delay_signal(signal, k):
+    signal.shift(-k)
+
+def fold_signal(signal):
+    """Time-reverse the signal; indices still read ascending."""
+    signal.fold()
+
+MOVING_AVERAGE_MODES = ("trailing", "centered", "valid")
+
+
+class MovingAverageState:
+    """Resumable running-sum moving average.
+
+    Feed the signal in chunks with process() and call flush() at the end;
+    the concatenated output is identical to moving_average() on the whole
+    signal. Only the last window_size prefix sums are kept between chunks.
+
+    The prefix sums grow with the stream, and so does their rounding error.
+    With rebase=True the kept sums are shifted to start at zero every time
+    they are trimmed, which bounds the error for endless streams; the
+    output then differs from moving_average() in the last bits.
+
+    Modes:
+        trailing: mean of x[i-w+1..i], shrinking window at the start
+        centered: mean of the w samples around x[i], shrinking at both edges
+        valid: trailing mean only where the full window fits (N-w+1 outputs)
+    """
+
+    def __init__(self, window_size, mode="trailing", rebase=False):
+        if window_size <= 0:
+            raise ValueError("Window size must be positive")
+        if mode not in MOVING_AVERAGE_MODES:
+            raise ValueError(f"Unknown moving average mode: {mode}")
+        self.window_size = window_size
+        self.mode = mode
+        self.rebase = rebase
+        if mode == "centered":
+            self._before = (window_size - 1) // 2
+            self._after = window_size - 1 - self._before
+        else:
+            self._before = window_size - 1
+            self._after = 0
+        # prefix sums C[base..seen] of the whole stream, C[0] = 0 (minus a
+        # constant when rebased, which cancels in the differences)
+        self._prefix = np.zeros(1, dtype=np.int64)
+        self._base = 0
+        self._seen = 0
+        self._emitted = 0
+
+    def process(self, chunk):
+        """Consume the next chunk and return the outputs that are now complete."""
+        chunk = np.asarray(chunk)
+        if chunk.size:
+            # cumsum continues from the last prefix so chunking does not change rounding
+            sums = np.cumsum(np.concatenate((self._prefix[-1:], chunk)))
+            self._prefix = np.concatenate((self._prefix, sums[1:]))
+            self._seen += chunk.size
+        return self._emit(self._seen - self._after)
+
+    def flush(self):
+        """Return the outputs still waiting for samples past the end (centered mode)."""
+        return self._emit(self._seen)
+
+    def _emit(self, stop):
+        first = self._emitted
+        if self.mode == "valid":
+            first = max(first, self.window_size - 1)
+        if stop <= first:
+            return np.zeros(0)
+        i = np.arange(first, stop)
+        lo = np.maximum(i - self._before, 0)
+        hi = np.minimum(i + self._after + 1, self._seen)
+        C = self._prefix
+        result = (C[hi - self._base] - C[lo - self._base]) / (hi - lo)
+
+        self._emitted = stop
+        keep_from = max(stop - self._before, 0)
+        self._prefix = self._prefix[keep_from - self._base:]
+        if self.rebase:
+            self._prefix = self._prefix - self._prefix[0]
+        self._base = keep_from
+        return result
+
+
+# Samples handled between two progress reports by the operations that take
+# a progress callback (see jobs.py); at most about 20 reports per call.
+PROGRESS_CHUNK_SIZE = 1 << 18
+
+
+def _progress_chunks(n, progress, item_size=1):
+    """Split range(n) into (start, stop) chunks, one per progress report.
+
+    Without a progress callback everything is a single chunk.
+    """
+    if progress is None:
+        size = max(n, 1)
+    else:
+        size = max(-(-PROGRESS_CHUNK_SIZE // item_size), -(-n // 20))
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def moving_average(vals, window_size, mode="trailing", progress=None):
+    """Compute moving average of signal values in O(N) with prefix sums.
+
     Args:
         vals: list of signal values
         window_size: number of points to average over
-    
+        mode: "trailing" (default), "centered" or "valid", see MovingAverageState
+        progress: optional callable(fraction) called after every chunk; the
+            result is identical with or without it
+
     Returns:
-        list of moving average values (same length as input)
+        array of moving average values (same length as input, N-w+1 for "valid")
     """
     if window_size <= 0 or window_size > len(vals):
         raise ValueError("Window size must be positive and <= signal length")
-    
-    result = []
-    for i in range(len(vals)):
-        start = max(0, i - window_size + 1)
-        end = i + 1
-        avg = sum(vals[start:end]) / (end - start)
-        result.append(avg)
-    
-    return result
 
-def convolve_signals(signal1_vals, signal2_vals):    
-    if not signal1_vals or not signal2_vals:
+    state = MovingAverageState(window_size, mode)
+    vals = np.asarray(vals)
+    out = []
+    for start, stop in _progress_chunks(len(vals), progress):
+        out.append(state.process(vals[start:stop]))
+        if progress is not None:
+            progress(stop / len(vals))
+    out.append(state.flush())
+    return np.concatenate(out)
+
+# Cost of one FFT butterfly relative to one direct multiply-accumulate,
+# measured with calibrate_convolution(); drives method="auto".
+CONV_FFT_COST_RATIO = 30.0
+
+CONV_METHODS = ("auto", "direct", "fft", "overlap_add", "overlap_save", "parallel")
+
+
+def _conv_block_fft_size(M):
+    """FFT size for the block methods: room for blocks about 7x the kernel."""
+    return _next_power_of_two(8 * M)
+
+
+def _conv_costs(N, M):
+    """Estimated cost of each convolution method in direct-MAC units."""
+    n = _next_power_of_two(N + M - 1)
+    nfft = _conv_block_fft_size(min(N, M))
+    blocks = -(-max(N, M) // (nfft - min(N, M) + 1))
+    return {
+        "direct": float(N) * M,
+        "fft": CONV_FFT_COST_RATIO * 3 * n * np.log2(max(n, 2)),
+        "overlap_add": CONV_FFT_COST_RATIO * (2 * blocks + 1) * nfft * np.log2(nfft),
+    }
+
+
+def choose_convolution_method(N, M):
+    """Pick the cheapest convolution method for signals of length N and M."""
+    costs = _conv_costs(N, M)
+    return min(costs, key=costs.get)
+
+
+def _convolve_direct(a, b):
+    # zero-padded "valid" mode: every output is a full-length dot product,
+    # the same evaluation the streaming pipeline does block by block
+    pad = np.zeros(len(b) - 1)
+    return np.convolve(np.concatenate((pad, a, pad)), b, mode="valid")
+
+
+def _convolve_fft(a, b):
+    L = len(a) + len(b) - 1
+    n = _next_power_of_two(L)
+    A = rfft(np.pad(a, (0, n - len(a))))
+    B = rfft(np.pad(b, (0, n - len(b))))
+    return irfft(A * B, n)[:L]
+
+
+def _convolve_overlap_add(a, b, progress=None):
+    """Block convolution: transform fixed-size blocks of a and add the tails."""
+    N, M = len(a), len(b)
+    nfft = _conv_block_fft_size(M)
+    step = nfft - M + 1
+    blocks = -(-N // step)
+    padded = np.zeros(blocks * step)
+    padded[:N] = a
+    H = rfft(np.pad(b, (0, nfft - M)))
+
+    out = np.zeros(blocks * step + M - 1)
+    for start, stop in _progress_chunks(blocks, progress, step):
+        frames = np.zeros((stop - start, nfft))
+        frames[:, :step] = padded[start * step:stop * step].reshape(-1, step)
+        y = irfft(rfft(frames) * H, nfft)
+        out[start * step:stop * step] += y[:, :step].ravel()
+        # block tails (M-1 samples) never overlap each other since step > M
+        tail_pos = (np.arange(start + 1, stop + 1) * step)[:, None] + np.arange(M - 1)
+        out[tail_pos.ravel()] += y[:, step:].ravel()
+        if progress is not None:
+            progress(stop / blocks)
+    return out[:N + M - 1]
+
+
+def _convolve_overlap_save(a, b, progress=None):
+    """Block convolution: transform overlapping blocks of a, keep the valid part."""
+    N, M = len(a), len(b)
+    nfft = _conv_block_fft_size(M)
+    step = nfft - M + 1
+    out_len = N + M - 1
+    blocks = -(-out_len // step)
+    padded = np.zeros((blocks - 1) * step + nfft)
+    padded[M - 1:M - 1 + N] = a
+    frames = np.lib.stride_tricks.sliding_window_view(padded, nfft)[::step]
+    H = rfft(np.pad(b, (0, nfft - M)))
+
+    out = np.empty(blocks * step)
+    for start, stop in _progress_chunks(blocks, progress, step):
+        y = irfft(rfft(frames[start:stop]) * H, nfft)[:, M - 1:]
+        out[start * step:stop * step] = y.ravel()
+        if progress is not None:
+            progress(stop / blocks)
+    return out[:out_len]
+
+
+# Blocks handed out per worker by the parallel convolution; more than one
+# evens out workers that start late or run slower.
+CONV_PARALLEL_BLOCKS_PER_WORKER = 4
+
+
+def _convolve_shared_block(a_name, b_name, out_name, N, M, start, stop):
+    """Worker of _convolve_parallel: overlap-add of a[start:stop] with b.
+
+    Writes the first stop - start output samples straight into the shared
+    output and returns the M - 1 sample tail that overlaps the next block.
+    The segments belong to the parent, which unlinks them; pool workers
+    share its resource tracker, so attaching here registers nothing new.
+    """
+    from multiprocessing import shared_memory
+    handles = [shared_memory.SharedMemory(name=name) for name in (a_name, b_name, out_name)]
+    try:
+        a = np.ndarray(N, dtype=float, buffer=handles[0].buf)
+        b = np.ndarray(M, dtype=float, buffer=handles[1].buf)
+        out = np.ndarray(N + M - 1, dtype=float, buffer=handles[2].buf)
+        y = _convolve_overlap_add(a[start:stop], b)
+        out[start:stop] = y[:stop - start]
+        tail = y[stop - start:].copy()
+        del a, b, out
+    finally:
+        for shm in handles:
+            shm.close()
+    return tail
+
+
+def _convolve_parallel(a, b, workers=None, progress=None):
+    """Overlap-add convolution with the blocks of a spread over worker processes.
+
+    The inputs and the output live in shared memory, so only the segment
+    names and block bounds are pickled. Every span of a is a whole number of
+    overlap-add blocks, which keeps the result identical to the serial
+    _convolve_overlap_add; the tails between spans are summed at the end.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
+
+    N, M = len(a), len(b)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    step = _conv_block_fft_size(M) - M + 1
+    blocks = -(-N // step)
+    spans = min(blocks, workers * CONV_PARALLEL_BLOCKS_PER_WORKER)
+    if workers < 2 or spans < 2:
+        return _convolve_overlap_add(a, b, progress)
+    span = -(-blocks // spans) * step
+    bounds = [(start, min(start + span, N)) for start in range(0, N, span)]
+
+    segments = []
+    try:
+        for size in (N, M, N + M - 1):
+            segments.append(shared_memory.SharedMemory(create=True, size=size * 8))
+        shared = [np.ndarray(size, dtype=float, buffer=shm.buf)
+                  for size, shm in zip((N, M, N + M - 1), segments)]
+        shared[0][:] = a
+        shared[1][:] = b
+        shared[2][N:] = 0.0
+        names = [shm.name for shm in segments]
+
+        tails = {}
+        executor = ProcessPoolExecutor(min(workers, len(bounds)))
+        try:
+            futures = {executor.submit(_convolve_shared_block, *names, N, M, start, stop): stop
+                       for start, stop in bounds}
+            for future in as_completed(futures):
+                tails[futures[future]] = future.result()
+                if progress is not None:
+                    progress(len(tails) / len(bounds))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        out = shared[2].copy()
+        for stop, tail in tails.items():
+            out[stop:stop + M - 1] += tail
+        del shared
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return out
+
+
+def convolve_signals(signal1_vals, signal2_vals, method="auto", progress=None, workers=None):
+    """Linear convolution of two signals.
+
+    Args:
+        signal1_vals: values of the first signal
+        signal2_vals: values of the second signal
+        method: "direct", "fft", "overlap_add", "overlap_save", "parallel"
+            (overlap-add on worker processes, for very long signals) or
+            "auto" (pick the cheapest serial one from the lengths, see
+            CONV_FFT_COST_RATIO)
+        progress: optional callable(fraction); the block methods report
+            after every group of blocks, the others only when done
+        workers: number of processes for "parallel", default the CPU count
+
+    Returns:
+        (values, indices) of the N + M - 1 output samples
+    """
+    a = np.asarray(signal1_vals, dtype=float)
+    b = np.asarray(signal2_vals, dtype=float)
+    if a.size == 0 or b.size == 0:
         raise ValueError("Both signals must be non-empty")
-    
-    N = len(signal1_vals)
-    M = len(signal2_vals)
-    result_len = N + M - 1
-    result = [0.0] * result_len
-    
-    for n in range(result_len):
-        for k in range(max(0, n - M + 1), min(n + 1, N)):
-            result[n] += signal1_vals[k] * signal2_vals[n - k]
-    
-    indices = list(range(result_len))
+    if method not in CONV_METHODS:
+        raise ValueError(f"Unknown convolution method: {method}")
+
+    if method == "auto":
+        method = choose_convolution_method(len(a), len(b))
+    # block methods cut the longer signal into blocks of the shorter one
+    if len(b) > len(a):
+        a, b = b, a
+
+    if method == "direct":
+        result = _convolve_direct(a, b)
+    elif method == "fft":
+        result = _convolve_fft(a, b)
+    elif method == "overlap_add":
+        result = _convolve_overlap_add(a, b, progress)
+    elif method == "parallel":
+        result = _convolve_parallel(a, b, workers, progress)
+    else:
+        result = _convolve_overlap_save(a, b, progress)
+    if progress is not None:
+        progress(1.0)
+
+    indices = np.arange(len(result))
     return result, indices
 
+
+def calibrate_convolution(N=20000, M=200, repeat=3):
+    """Measure direct vs FFT cost on this machine and update CONV_FFT_COST_RATIO."""
+    import time
+    global CONV_FFT_COST_RATIO
+    a = np.random.default_rng(0).standard_normal(N)
+    b = a[:M].copy()
+
+    def best_time(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(a, b)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    direct = best_time(_convolve_direct) / (N * M)
+    n = _next_power_of_two(N + M - 1)
+    butterfly = best_time(_convolve_fft) / (3 * n * np.log2(n))
+    CONV_FFT_COST_RATIO = butterfly / direct
+    return CONV_FFT_COST_RATIO
+
+def _is_power_of_two(n):
+    return n > 0 and n & (n - 1) == 0
+
+
+def _next_power_of_two(n):
+    return 1 << (n - 1).bit_length()
+
+
+def _small_factors(n, limit=64):
+    """Prime factors of n if all are <= limit, otherwise None."""
+    factors = []
+    p = 2
+    while p * p <= n and p <= limit:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    if n > limit:
+        return None
+    if n > 1:
+        factors.append(n)
+    return factors
+
+
+def _fft_mixed_radix(x, factors, inverse=False):
+    """Unnormalized Cooley-Tukey FFT along the last axis for N = prod(factors).
+
+    The leading factors (up to a block of 32 points) are done as one small
+    DFT matrix product, every remaining factor r is a vectorized radix-r pass.
+    Powers of two use a plain butterfly for the radix-2 passes.
+    """
+    sign = 1 if inverse else -1
+    N = x.shape[-1]
+    batch = x.shape[:-1]
+    n_min = 1
+    while factors and n_min * factors[0] <= 32:
+        n_min *= factors.pop(0)
+    n = np.arange(n_min)
+    M = np.exp(sign * 2j * np.pi * np.outer(n, n) / n_min)
+    # column c of the (size, L) layout holds the DFT of x[c::L]
+    X = M @ x.reshape(batch + (n_min, N // n_min))
+    for r in factors:
+        size, L = X.shape[-2], X.shape[-1] // r
+        if r == 2:
+            twiddle = np.exp(sign * 1j * np.pi * np.arange(size) / size)[:, None]
+            even = X[..., :L]
+            odd = twiddle * X[..., L:]
+            X = np.concatenate((even + odd, even - odd), axis=-2)
+            continue
+        j = np.arange(r)
+        groups = X.reshape(batch + (size, r, L)).swapaxes(-3, -2)
+        twiddle = np.exp(sign * 2j * np.pi * np.outer(j, np.arange(size)) / (size * r))
+        groups = groups * twiddle[:, :, None]
+        F = np.exp(sign * 2j * np.pi * np.outer(j, j) / r)
+        X = (F @ groups.reshape(batch + (r, size * L))).reshape(batch + (r * size, L))
+    return X.reshape(batch + (N,))
+
+
+def _fft_radix2(x, inverse=False):
+    """Unnormalized radix-2 FFT along the last axis (length must be a power of two).
+
+    Butterfly passes are grouped three at a time (radix-8) to cut the number
+    of full-array passes.
+    """
+    stages = x.shape[-1].bit_length() - 1
+    base = min(stages, 5)
+    rest = stages - base
+    factors = [2] * base + [8] * (rest // 3) + [2] * (rest % 3)
+    return _fft_mixed_radix(x, factors, inverse)
+
+
+# Lengths whose Bluestein chirp and filter spectrum are kept, most recent
+# first; an entry takes 48 * N bytes or so.
+BLUESTEIN_CACHE_SIZE = 2
+
+_bluestein_filters = OrderedDict()
+_bluestein_lock = threading.Lock()
+
+
+def _bluestein_filter(N, M):
+    """Forward chirp of length N and the length-M spectrum of its conjugate filter.
+
+    Cached per N: repeated transforms of one length (fft then ifft, the
+    frames of a batch) then need two transforms instead of three.
+    """
+    with _bluestein_lock:
+        entry = _bluestein_filters.get(N)
+        if entry is not None:
+            _bluestein_filters.move_to_end(N)
+            return entry
+    n = np.arange(N, dtype=np.int64)
+    # n^2 mod 2N keeps the chirp phase accurate for long signals
+    chirp = np.exp(-1j * np.pi * ((n * n) % (2 * N)) / N)
+    b = np.zeros(M, dtype=complex)
+    b[:N] = np.conj(chirp)
+    b[M - N + 1:] = np.conj(chirp[1:][::-1])
+    entry = chirp, _fft_radix2(b)
+    with _bluestein_lock:
+        _bluestein_filters[N] = entry
+        while len(_bluestein_filters) > BLUESTEIN_CACHE_SIZE:
+            _bluestein_filters.popitem(last=False)
+    return entry
+
+
+def _fft_bluestein(x, inverse=False):
+    """Unnormalized FFT of any length along the last axis (Bluestein chirp-z).
+
+    The length-N transform is rewritten as a convolution with a chirp and
+    evaluated with power-of-two radix-2 transforms of length >= 2N-1.
+    """
+    N = x.shape[-1]
+    M = _next_power_of_two(2 * N - 1)
+    chirp, B = _bluestein_filter(N, M)
+    if inverse:
+        # the filter is even, so its spectrum is too: conjugating the chirp
+        # conjugates the spectrum
+        chirp, B = np.conj(chirp), np.conj(B)
+    a = np.zeros(x.shape[:-1] + (M,), dtype=complex)
+    a[..., :N] = x * chirp
+    conv = _fft_radix2(_fft_radix2(a) * B, inverse=True) / M
+    return conv[..., :N] * chirp
+
+
+def _fft_core(x, inverse=False):
+    N = x.shape[-1]
+    if N <= 1:
+        return x.astype(complex)
+    if _is_power_of_two(N):
+        return _fft_radix2(x, inverse)
+    factors = _small_factors(N)
+    if factors is not None:
+        return _fft_mixed_radix(x, factors, inverse)
+    return _fft_bluestein(x, inverse)
+
+
+def fft(vals):
+    """Fast Fourier Transform of the signal (any length, O(N log N)).
+
+    Lengths with a prime factor above 64 (e.g. a prime N) go through
+    Bluestein's algorithm: three power-of-two transforms of 2N to 4N
+    points, two once the length is cached. For N near 10^6 that is about
+    a second for the first transform and 0.6 s after, against 0.1 s for
+    N = 2^20; pad to a power of two where zero-padding is acceptable
+    (convolve_signals does).
+
+    Args:
+        vals: sequence or array of samples (real or complex)
+
+    Returns:
+        complex numpy array X[k] = sum x[n] * exp(-2j*pi*k*n/N)
+    """
+    return _fft_core(np.asarray(vals, dtype=complex))
+
+
+def ifft(spectrum):
+    """Inverse FFT: x[n] = 1/N * sum X[k] * exp(2j*pi*k*n/N)."""
+    X = np.asarray(spectrum, dtype=complex)
+    if X.shape[-1] == 0:
+        return X
+    return _fft_core(X, inverse=True) / X.shape[-1]
+
+
+def rfft(vals):
+    """FFT of a real signal returning only the non-redundant bins 0..N//2.
+
+    Even lengths pack the signal into a half-length complex transform.
+    """
+    x = np.asarray(vals, dtype=float)
+    N = x.shape[-1]
+    if N < 2 or N % 2:
+        return fft(x)[..., :N // 2 + 1]
+    half = N // 2
+    Z = _fft_core(x[..., 0::2] + 1j * x[..., 1::2])
+    k = np.arange(half + 1)
+    Zk = Z[..., k % half]
+    Zc = np.conj(Z[..., (-k) % half])
+    return (Zk + Zc) / 2 + np.exp(-2j * np.pi * k / N) * (Zk - Zc) / 2j
+
+
+def irfft(half_spectrum, n=None):
+    """Inverse of rfft: rebuild the real signal of length n (default 2*(K-1))."""
+    X = np.asarray(half_spectrum, dtype=complex)
+    K = X.shape[-1]
+    if n is None:
+        n = 2 * (K - 1)
+    full = np.zeros(X.shape[:-1] + (n,), dtype=complex)
+    m = min(K, n // 2 + 1)
+    full[..., :m] = X[..., :m]
+    # mirror the conjugate half (bins n-1 down to n//2+1)
+    mirror = np.arange(1, (n + 1) // 2)
+    full[..., n - mirror] = np.conj(full[..., mirror])
+    return ifft(full).real
+
+
 def dft(vals, inverse=False):
-    """"Calculate Fourier Transform of the signal"""
-    import cmath
-    f = []
-    N = len(vals)
-    for k in range(N):
-        f_k = 0
-        for n in range(N):
-            phase = (2*cmath.pi*k*n) / N 
-            phase = phase if inverse else -1 * phase
-            f_k += vals[n]*cmath.rect(1,phase) 
-        if inverse:
-            f_k = round((1 / N) * f_k.real)
-        f.append(f_k)
-    return f
+    """Calculate Fourier Transform of the signal.
+
+    Forward returns the complex spectrum. Inverse returns the real part of the
+    reconstruction rounded to integers, like the original signal files.
+    """
+    if inverse:
+        return np.rint(ifft(vals).real).astype(np.int64)
+    return fft(vals)
+
+
+SpectrumCacheInfo = namedtuple("SpectrumCacheInfo", "hits misses currsize maxsize nbytes")
+
+
+class SpectrumCache:
+    """Bounded LRU of transforms keyed by (signal version, kind, length).
+
+    Entries are read-only arrays. The cache holds at most maxsize entries and
+    max_bytes of array data; the least recently used entries go first.
+    A lock guards the bookkeeping, so background jobs and the GUI thread
+    can share one cache; transforms are computed outside it.
+    """
+
+    KINDS = ("dft", "magnitude", "phase", "idft")
+
+    def __init__(self, maxsize=32, max_bytes=1 << 28):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, signal, kind="dft", n=None):
+        """Return a transform of signal.vals, computing it only on a miss.
+
+        Args:
+            signal: Signal whose values are transformed
+            kind: "dft" (complex spectrum), "magnitude", "phase", or "idft"
+                (the rounded reconstruction from the spectrum, see dft)
+            n: transform length; values are zero-padded or truncated to n
+                (default: the signal length)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown transform kind: {kind}")
+        n = len(signal) if n is None else int(n)
+        key = (signal.version, kind, n)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+            self.misses += 1
+
+        if kind == "dft":
+            x = signal.vals
+            if n != len(x):
+                padded = np.zeros(n, dtype=x.dtype)
+                padded[:min(n, len(x))] = x[:n]
+                x = padded
+            entry = dft(x)
+        else:
+            spectrum = self.get(signal, "dft", n)
+            if kind == "magnitude":
+                entry = np.abs(spectrum)
+            elif kind == "phase":
+                entry = np.angle(spectrum)
+            else:
+                entry = dft(spectrum, inverse=True)
+        entry.flags.writeable = False
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            # another thread may have computed the same key meanwhile
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            while len(self._entries) > self.maxsize or self._nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._nbytes -= old.nbytes
+
+    def info(self):
+        with self._lock:
+            return SpectrumCacheInfo(self.hits, self.misses, len(self._entries), self.maxsize, self._nbytes)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+spectrum_cache = SpectrumCache()
+
+
+TONE_TYPES = ("sine", "cosine")
+SYNTHESIS_METHODS = ("direct", "recurrence")
+
+# Samples generated per pass by synthesize; bounds the (tones x block) work arrays.
+SYNTHESIS_BLOCK_SIZE = 1 << 14
+
+
+def _parse_tones(tones):
+    """Split tone tuples into amplitude, frequency, phase and is-sine arrays."""
+    amplitudes, freqs, phases, is_sine = [], [], [], []
+    for tone in tones:
+        tone = tuple(tone)
+        if not 2 <= len(tone) <= 4:
+            raise ValueError(f"A tone is (amplitude, frequency[, phase[, type]]), got {tone!r}")
+        amplitude, freq, phase, kind = tone + (0.0, "sine")[len(tone) - 2:]
+        if kind not in TONE_TYPES:
+            raise ValueError(f"Unknown tone type: {kind}")
+        amplitudes.append(float(amplitude))
+        freqs.append(float(freq))
+        phases.append(float(phase))
+        is_sine.append(kind == "sine")
+    return np.array(amplitudes), np.array(freqs), np.array(phases), np.array(is_sine, dtype=bool)
+
+
+def synthesize(num_samples, tones, fs=1.0, noise=0.0, seed=None, start=0, method="direct"):
+    """Sum of sampled tones, optionally with Gaussian noise, as a Signal.
+
+    Sample n is sum A * sin(2*pi*f*n/fs + phase) (cos for "cosine" tones)
+    for n = start .. start+num_samples-1; phases are reduced through the
+    fractional cycle count f*n/fs mod 1, so they stay exact for long outputs.
+
+    Args:
+        num_samples: number of samples
+        tones: (amplitude, frequency in Hz[, phase in radians[, type]])
+            tuples, type "sine" (default) or "cosine"
+        fs: sampling frequency in Hz
+        noise: standard deviation of the added Gaussian noise
+        seed: seed for the noise generator
+        start: index of the first sample
+        method: "direct" evaluates every sample of every tone;
+            "recurrence" is a phase accumulator: each block starts from the
+            exact phase of every tone and advances it by multiplying with
+            precomputed rotations, turning the sum over tones into one
+            complex matrix-vector product per block (much faster for many
+            tones, same values up to rounding)
+
+    Returns:
+        Signal with float64 values
+    """
+    if num_samples < 0:
+        raise ValueError("Number of samples must be non-negative")
+    if fs <= 0:
+        raise ValueError("Sampling frequency must be positive")
+    if method not in SYNTHESIS_METHODS:
+        raise ValueError(f"Unknown synthesis method: {method}")
+    amplitudes, freqs, phases, is_sine = _parse_tones(tones)
+    cycles = freqs / fs
+    # Re(a * e^{i x}) gives A cos x for a = A and A sin x for a = -iA
+    coeffs = np.where(is_sine, -1j * amplitudes, amplitudes + 0j)
+    rng = np.random.default_rng(seed) if noise else None
+
+    vals = np.empty(num_samples)
+    B = SYNTHESIS_BLOCK_SIZE
+    if method == "recurrence" and len(cycles):
+        rotations = np.exp(2j * np.pi * np.outer(cycles, np.arange(min(B, num_samples))))
+    for block_start in range(0, num_samples, B):
+        m = min(B, num_samples - block_start)
+        n0 = start + block_start
+        if not len(cycles):
+            block = np.zeros(m)
+        elif method == "direct":
+            frac = np.mod(np.outer(cycles, np.arange(n0, n0 + m)), 1.0)
+            angle = 2 * np.pi * frac + phases[:, None]
+            block = amplitudes @ np.where(is_sine[:, None], np.sin(angle), np.cos(angle))
+        else:
+            start_phase = 2 * np.pi * np.mod(cycles * n0, 1.0) + phases
+            block = ((coeffs * np.exp(1j * start_phase)) @ rotations[:, :m]).real
+        if rng is not None:
+            block += noise * rng.standard_normal(m)
+        vals[block_start:block_start + m] = block
+    return Signal(np.arange(start, start + num_samples), vals)
+
+
+def goertzel(vals, freqs, fs=1.0, block_size=None):
+    """Evaluate the spectrum at arbitrary frequencies with the Goertzel algorithm.
+
+    The signal is cut into blocks of block_size samples (default about
+    sqrt(N)) and the Goertzel recursion runs over all blocks and all
+    frequencies at once, so the Python loop is only block_size long. The
+    block results are then phase-shifted to their offsets and summed. Cost
+    is O(N * F) with O(N * F / block_size) memory.
+
+    Args:
+        vals: signal values
+        freqs: frequencies in Hz, not limited to bin centres
+        fs: sampling frequency in Hz
+
+    Returns:
+        complex array with X(f) = sum_n x[n] * exp(-2j*pi*f*n/fs) per
+        frequency; at f = k*fs/N this is dft(vals)[k]
+    """
+    if fs <= 0:
+        raise ValueError("Sampling frequency must be positive")
+    x = np.asarray(vals, dtype=float)
+    w = 2 * np.pi * np.atleast_1d(np.asarray(freqs, dtype=float)) / fs
+    N = len(x)
+    if N == 0:
+        return np.zeros(len(w), dtype=complex)
+    B = block_size or max(int(np.sqrt(N)), 1)
+    K = -(-N // B)
+    blocks = np.zeros(K * B)
+    blocks[:N] = x
+    blocks = blocks.reshape(K, B)
+
+    coeff = 2 * np.cos(w)
+    s1 = np.zeros((K, len(w)))
+    s2 = np.zeros((K, len(w)))
+    for n in range(B):
+        s1, s2 = blocks[:, n, None] + coeff * s1 - s2, s1
+    # y = s[B-1] - e^{-jw} s[B-2] = e^{jw(B-1)} * sum_m x[m] e^{-jwm}
+    block_X = (s1 - np.exp(-1j * w) * s2) * np.exp(-1j * w * (B - 1))
+    return (block_X * np.exp(-1j * np.outer(np.arange(K) * B, w))).sum(axis=0)
+
+
+class SlidingDFT:
+    """DFT of the last N samples, updated as samples arrive.
+
+    One new sample updates every tracked bin in O(1):
+        X_k <- (X_k - x_oldest + x_new) * exp(2j*pi*k/N)
+    and a block of L <= N samples in one O(N log N) transform (or
+    O(L * bins) for a bin subset). The spectrum matches dft() of the
+    window, oldest sample first. The recursion accumulates rounding error,
+    so every resync_every samples the bins are recomputed from the window.
+
+    Args:
+        window: the initial N samples
+        bins: bin numbers to track (default all N)
+        resync_every: samples between exact recomputations (default N,
+            which keeps the amortised cost per sample at O(log N))
+    """
+
+    def __init__(self, window, bins=None, resync_every=None):
+        self._window = np.array(window, dtype=complex if np.iscomplexobj(window) else float)
+        N = len(self._window)
+        if N == 0:
+            raise ValueError("Window must be non-empty")
+        self.bins = np.arange(N) if bins is None else np.asarray(bins, dtype=np.int64) % N
+        self.resync_every = N if resync_every is None else resync_every
+        if self.resync_every <= 0:
+            raise ValueError("resync_every must be positive")
+        self._twiddle = np.exp(2j * np.pi * self.bins / N)
+        self._pos = 0
+        self._since_resync = 0
+        self.resync()
+
+    def __len__(self):
+        return len(self._window)
+
+    @property
+    def window(self):
+        """Current window, oldest sample first."""
+        return np.roll(self._window, -self._pos)
+
+    @property
+    def spectrum(self):
+        """The tracked bins of the window's DFT (read-only)."""
+        view = self._X.view()
+        view.flags.writeable = False
+        return view
+
+    def _bins_dft(self, x):
+        """DFT of x (length N) at the tracked bins."""
+        N = len(self._window)
+        if len(self.bins) > np.log2(N) + 1:
+            return fft(np.pad(x, (0, N - len(x))))[self.bins]
+        return np.exp(-2j * np.pi * np.outer(self.bins, np.arange(len(x))) / N) @ x
+
+    def resync(self):
+        """Recompute the bins exactly from the window."""
+        self._X = self._bins_dft(self.window)
+        self._since_resync = 0
+
+    def update(self, sample):
+        """Slide the window by one sample and return the spectrum."""
+        oldest = self._window[self._pos]
+        self._window[self._pos] = sample
+        self._pos = (self._pos + 1) % len(self._window)
+        self._X = (self._X + (sample - oldest)) * self._twiddle
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self.resync()
+        return self.spectrum
+
+    def extend(self, samples):
+        """Slide the window over a block of samples and return the spectrum.
+
+        After L samples X_k = w^L * (X_k + sum_j d_j * w^-j), with
+        w = exp(2j*pi*k/N) and d_j the new minus the leaving sample, so the
+        whole block costs one transform of the differences.
+        """
+        samples = np.asarray(samples)
+        N = len(self._window)
+        L = len(samples)
+        if L == 0:
+            return self.spectrum
+        if L >= N:
+            self._window[:] = samples[L - N:]
+            self._pos = 0
+            self.resync()
+            return self.spectrum
+        slots = (self._pos + np.arange(L)) % N
+        diff = samples - self._window[slots]
+        self._window[slots] = samples
+        self._pos = (self._pos + L) % N
+        self._X = (self._X + self._bins_dft(diff)) * np.exp(2j * np.pi * self.bins * L / N)
+        self._since_resync += L
+        if self._since_resync >= self.resync_every:
+            self.resync()
+        return self.spectrum
+
+
+WINDOW_TYPES = ("rectangular", "hann", "hamming", "blackman")
+
+
+def window_function(name, length):
+    """Periodic window of the given length, the form that overlap-adds evenly."""
+    if name not in WINDOW_TYPES:
+        raise ValueError(f"Unknown window: {name}")
+    phase = 2 * np.pi * np.arange(length) / max(length, 1)
+    if name == "rectangular":
+        return np.ones(length)
+    if name == "hann":
+        return 0.5 - 0.5 * np.cos(phase)
+    if name == "hamming":
+        return 0.54 - 0.46 * np.cos(phase)
+    return 0.42 - 0.5 * np.cos(phase) + 0.08 * np.cos(2 * phase)
+
+
+def _stft_layout(N, frame_length, hop):
+    """Front padding and frame count that cover every sample with all its frames."""
+    if frame_length < 1:
+        raise ValueError("Frame length must be positive")
+    if not 1 <= hop <= frame_length:
+        raise ValueError("Hop must be between 1 and the frame length")
+    pad = frame_length - hop
+    frames = (pad + N - 1) // hop + 1 if N else 0
+    return pad, frames
+
+
+def _frame_groups(frames, frame_length, workers, progress):
+    """(start, stop) frame ranges: one per progress report, at least a few per worker."""
+    groups = _progress_chunks(frames, progress, frame_length)
+    if workers > 1 and len(groups) < workers * CONV_PARALLEL_BLOCKS_PER_WORKER:
+        size = max(-(-frames // (workers * CONV_PARALLEL_BLOCKS_PER_WORKER)), 1)
+        groups = [(start, min(start + size, frames)) for start in range(0, frames, size)]
+    return groups
+
+
+def stft(vals, frame_length=256, hop=None, window="hann", workers=None, progress=None):
+    """Short-time Fourier transform.
+
+    The signal is zero-padded by frame_length - hop on both sides so every
+    sample lies in the same number of frames, cut into frames of
+    frame_length samples hop apart (a strided view, no copy), windowed and
+    transformed together as one 2-D rfft. With workers > 1 groups of frames
+    are transformed on a thread pool.
+
+    Args:
+        vals: signal values
+        frame_length: samples per frame
+        hop: samples between frame starts (default frame_length // 4)
+        window: one of WINDOW_TYPES
+        workers: threads for the frame transforms (default: no pool)
+        progress: optional callable(fraction), called after every frame group
+
+    Returns:
+        (spectra, centres): complex array of shape (frames, frame_length // 2 + 1)
+        and the sample position of every frame centre; bin k is at k * fs / frame_length
+    """
+    x = np.asarray(vals, dtype=float)
+    hop = hop or max(frame_length // 4, 1)
+    pad, frames = _stft_layout(len(x), frame_length, hop)
+    padded = np.zeros(max((frames - 1) * hop, 0) + frame_length)
+    padded[pad:pad + len(x)] = x
+    windows = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop][:frames]
+    w = window_function(window, frame_length)
+    spectra = np.empty((frames, frame_length // 2 + 1), dtype=complex)
+
+    def transform(group):
+        start, stop = group
+        spectra[start:stop] = rfft(windows[start:stop] * w)
+
+    groups = _frame_groups(frames, frame_length, workers or 1, progress)
+    if workers and workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(workers)
+        try:
+            for done, _ in enumerate(executor.map(transform, groups), 1):
+                if progress is not None:
+                    progress(done / len(groups))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    else:
+        for done, group in enumerate(groups, 1):
+            transform(group)
+            if progress is not None:
+                progress(done / len(groups))
+
+    centres = np.arange(frames) * hop - pad + (frame_length - 1) / 2
+    return spectra, centres
+
+
+def istft(spectra, frame_length=None, hop=None, window="hann", length=None):
+    """Inverse of stft by weighted overlap-add.
+
+    Every frame is inverse transformed and windowed again, the frames are
+    summed at their offsets and divided by the summed squared window, which
+    undoes stft exactly wherever the window sum is not zero (every sample
+    for the windows in WINDOW_TYPES with hop < frame_length).
+
+    Args:
+        spectra: (frames, bins) array from stft
+        frame_length: samples per frame (default 2 * (bins - 1))
+        hop: as given to stft (default frame_length // 4)
+        window: as given to stft
+        length: samples to return (default everything the frames cover)
+
+    Returns:
+        float array of the reconstructed signal
+    """
+    X = np.asarray(spectra, dtype=complex)
+    frames = X.shape[0]
+    frame_length = frame_length or 2 * (X.shape[1] - 1)
+    hop = hop or max(frame_length // 4, 1)
+    pad, _ = _stft_layout(1, frame_length, hop)
+    w = window_function(window, frame_length)
+    y = irfft(X, frame_length) * w if frames else np.zeros((0, frame_length))
+
+    # frame k adds its piece j (hop samples) to output block k + j
+    pieces = -(-frame_length // hop)
+    y = np.pad(y, ((0, 0), (0, pieces * hop - frame_length))).reshape(frames, pieces, hop)
+    w2 = np.pad(w * w, (0, pieces * hop - frame_length)).reshape(pieces, hop)
+    out = np.zeros((frames + pieces - 1, hop))
+    norm = np.zeros((frames + pieces - 1, hop))
+    for j in range(pieces):
+        out[j:j + frames] += y[:, j]
+        norm[j:j + frames] += w2[j]
+    out = out.ravel()
+    norm = norm.ravel()
+    np.divide(out, norm, out=out, where=norm > 1e-10)
+
+    out = out[pad:]
+    if length is None:
+        length = max(len(out) - pad, 0)
+    if length > len(out):
+        out = np.concatenate((out, np.zeros(length - len(out))))
+    return out[:length]
 
 
 
@@ -90,127 +1491,565 @@ def first_derivative(vals):
     """Return first derivative y(n) = x(n) - x(n-1)."""
     if len(vals) < 2:
         raise ValueError("Signal must have at least 2 samples for first derivative")
-    return [vals[i] - vals[i-1] for i in range(1, len(vals))]
+    x = np.asarray(vals)
+    return x[1:] - x[:-1]
 
 def second_derivative(vals):
     """Return second derivative y(n) = x(n+1) - 2*x(n) + x(n-1)."""
     if len(vals) < 3:
         raise ValueError("Signal must have at least 3 samples for second derivative")
-    return [vals[i+1] - 2*vals[i] + vals[i-1] for i in range(1, len(vals)-1)]
+    x = np.asarray(vals)
+    return x[2:] - 2 * x[1:-1] + x[:-2]
 
 # Keep existing (older) inplace-naming functions for compatibility if needed,
 # but prefer the return-style API above in GUI.
 def first_dervative(idxs, vals):
-    """Legacy: inplace mutation (kept for compatibility)."""
-    global cur_idxs, cur_vals
-    new_idxs = []
-    new_vals = []
-    for i in range(1, len(cur_idxs)):
-        new_idxs.append(cur_idxs[i])
-        new_vals.append(cur_vals[i] - cur_vals[i-1])
-    cur_idxs = new_idxs
-    cur_vals = new_vals
+    """Legacy: inplace mutation of the current signal (kept for compatibility)."""
+    current.set(current.idxs[1:], first_derivative(current.vals))
 
 def second_dervative(idxs, vals):
-    """Legacy: inplace mutation (kept for compatibility)."""
-    global cur_idxs, cur_vals
-    new_idxs = []
-    new_vals = []
-    for i in range(0, len(cur_idxs)-1):
-        new_idxs.append(cur_idxs[i])
-        new_vals.append(cur_vals[i+1] - 2*cur_vals[i] + cur_vals[i-1])
-    cur_idxs = new_idxs
-    cur_vals = new_vals
+    """Legacy: inplace mutation of the current signal (kept for compatibility)."""
+    x = current.vals
+    current.set(current.idxs[:-1], x[1:] - 2 * x[:-1] + np.roll(x, 1)[:-1])
 
-def add_signal(idxs, vals):
+def _merge_add(idxs_a, vals_a, idxs_b, vals_b):
+    """Sum two index-sorted signals sample by sample over the union of their indices.
+
+    Linear merge: b is located in a with a binary search, matching samples
+    are summed in place and the rest are inserted at their sorted position.
+    """
+    pos = np.searchsorted(idxs_a, idxs_b)
+    found = pos < len(idxs_a)
+    found[found] = idxs_a[pos[found]] == idxs_b[found]
+
+    out_vals = np.array(vals_a, dtype=float)
+    np.add.at(out_vals, pos[found], vals_b[found])
+    new = ~found
+    out_idxs = np.insert(idxs_a, pos[new], idxs_b[new])
+    out_vals = np.insert(out_vals, pos[new], vals_b[new])
+    return out_idxs, out_vals
+
+def add_signal(idxs, vals, target=None):
     """
-    Add the given signal (idxs, vals) into the global cur_idxs / cur_vals.
-    This function MUTATES cur_idxs and cur_vals in-place so external modules
-    that hold references to these lists see updates.
+    Add the given signal (idxs, vals) into the current signal, or into the
+    Signal passed as target.
+    Samples at the same index are summed; the result is sorted by index.
+    A RunSignal target is merged run by run (see add_runs).
     """
-    global cur_idxs, cur_vals
+    if target is None:
+        target = current
+    idxs = np.asarray(idxs, dtype=np.int64)
+    vals = np.asarray(vals, dtype=float)
 
     # guard
-    if not idxs or not vals:
+    if len(idxs) == 0 or len(vals) == 0:
+        return
+
+    if isinstance(target, RunSignal):
+        merged = add_runs([target, RunSignal.from_arrays(idxs, vals)])
+        target.set_runs(merged.starts, merged.lengths, merged.vals)
         return
 
-    # If no accumulated signal yet, extend the existing lists (mutate in-place)
-    if len(cur_idxs) == 0:
-        cur_idxs.extend(idxs)
-        cur_vals.extend(vals)
+    # _merge_add expects each index of b once
+    idxs, vals = _reduce_by_index(idxs, vals)
+    target.promote(vals.dtype)
+    if len(target) == 0:
+        # copy: the caller (or a read-only .sig map) must not be able to
+        # change the signal's storage behind its version
+        target.set(np.array(idxs), np.array(vals))
         return
 
-    # Merge two sorted index lists and sum overlapping samples
-    i, j = 0, 0
-    result_idxs = []
-    result_vals = []
-
-    while i < len(cur_idxs) and j < len(idxs):
-        a = cur_idxs[i]
-        b = idxs[j]
-        if a < b:
-            result_idxs.append(a)
-            result_vals.append(cur_vals[i])
-            i += 1
-        elif a > b:
-            result_idxs.append(b)
-            result_vals.append(vals[j])
-            j += 1
-        else:  # equal index
-            result_idxs.append(a)
-            result_vals.append(cur_vals[i] + vals[j])
-            i += 1
-            j += 1
-
-    # append remaining tail from cur
-    while i < len(cur_idxs):
-        result_idxs.append(cur_idxs[i])
-        result_vals.append(cur_vals[i])
-        i += 1
-
-    # append remaining tail from new signal
-    while j < len(idxs):
-        result_idxs.append(idxs[j])
-        result_vals.append(vals[j])
-        j += 1
-
-    # MUTATE the original lists so references remain valid
-    cur_idxs[:] = result_idxs
-    cur_vals[:] = result_vals
-
-def multiply(vals, c):
-    """Multiply given list of signal values in place."""
-    for i in range(len(vals)):
-        vals[i] *= c
+    target.set(*_merge_add(target.idxs, target.vals, idxs, vals))
+
+def add_signals(signals, weights=None, target=None):
+    """
+    Add many signals into the current signal (or target) in one pass.
+
+    Args:
+        signals: iterable of (idxs, vals) pairs
+        weights: optional per-signal factors (e.g. -1 to subtract), default 1
+        target: Signal to accumulate into, default the current signal
+
+    All inputs are concatenated with the current signal and reduced by
+    index in a single stable sort, instead of one full merge per signal.
+    The sort finds the already-sorted runs, so it acts as a k-way merge.
+    """
+    signals = list(signals)
+    if weights is None:
+        weights = [1] * len(signals)
+    if len(weights) != len(signals):
+        raise ValueError("Need one weight per signal")
+
+    if target is None:
+        target = current
+    all_idxs = [target.idxs]
+    all_vals = [target.vals.astype(float, copy=False)]
+    for (idxs, vals), w in zip(signals, weights):
+        idxs = np.asarray(idxs, dtype=np.int64)
+        vals = np.asarray(vals, dtype=float)
+        if idxs.shape != vals.shape:
+            raise ValueError("idxs and vals must be the same length")
+        all_idxs.append(idxs)
+        all_vals.append(vals * w if w != 1 else vals)
+
+    idxs = np.concatenate(all_idxs)
+    if len(idxs) == 0:
+        return
+    vals = np.concatenate(all_vals)
+    target.promote(vals.dtype)
+    target.set(*_reduce_by_index(idxs, vals))
+
+def _run_offsets(lengths):
+    """Position of every run's first sample in the packed values."""
+    offsets = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return offsets
+
+
+def _sum_runs(starts, lengths, vals):
+    """Sum runs that may overlap or touch into maximal, disjoint runs.
+
+    Returns (starts, lengths, vals) of the union of the input runs, where
+    every index holds the sum of the samples of all runs covering it. The
+    runs are sorted and merged as intervals (O(R log R) for R runs), only
+    the final scatter-add touches every sample.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    vals = np.asarray(vals, dtype=float)
+    if len(starts) == 0:
+        return starts, lengths, vals
+    ends = starts + lengths
+    order = np.argsort(starts, kind="stable")
+    s, e = starts[order], ends[order]
+    # a new output run begins where a run starts past everything before it
+    reach = np.maximum.accumulate(e)
+    first = np.flatnonzero(np.concatenate(([True], s[1:] > reach[:-1])))
+    out_starts = s[first]
+    out_lengths = np.maximum.reduceat(e, first) - out_starts
+    out_offsets = _run_offsets(out_lengths)
+
+    owner = np.searchsorted(out_starts, starts, side="right") - 1
+    run_pos = out_offsets[owner] + (starts - out_starts[owner])
+    sample_pos = np.repeat(run_pos - _run_offsets(lengths), lengths) + np.arange(len(vals))
+    out_vals = np.bincount(sample_pos, weights=vals, minlength=int(out_lengths.sum()))
+    return out_starts, out_lengths, out_vals
+
+
+class RunSignal:
+    """Signal whose indices are stored as runs of consecutive integers.
+
+    Run r covers the indices starts[r] .. starts[r] + lengths[r] - 1 and
+    vals holds the samples of all runs back to back. Runs are ascending,
+    disjoint and separated by gaps; an isolated index is a run of length 1.
+    Index storage and the cost of shift, fold, add_signal and convolve_runs
+    scale with the number of runs rather than the index span, e.g. 0..10
+    plus 10^9..10^9+10 is two runs.
+    """
+
+    __slots__ = ("starts", "lengths", "vals", "version")
+
+    def __init__(self, starts=(), lengths=(), vals=()):
+        self.starts = np.array(starts, dtype=np.int64)
+        self.lengths = np.array(lengths, dtype=np.int64)
+        self.vals = np.array(vals, dtype=float)
+        if self.starts.shape != self.lengths.shape or np.any(self.lengths <= 0):
+            raise ValueError("Need one positive length per run start")
+        if self.lengths.sum() != len(self.vals):
+            raise ValueError("Run lengths must add up to the number of values")
+        self.touch()
+
+    @classmethod
+    def from_arrays(cls, idxs, vals, drop_zeros=False):
+        """Build from explicit samples; repeated indices are summed.
+
+        With drop_zeros samples equal to zero are left out, so long zero
+        stretches become gaps.
+        """
+        idxs = np.asarray(idxs, dtype=np.int64)
+        vals = np.asarray(vals, dtype=float)
+        if idxs.shape != vals.shape:
+            raise ValueError("idxs and vals must be the same length")
+        if len(idxs) > 1 and np.any(idxs[1:] <= idxs[:-1]):
+            starts, lengths, vals = _sum_runs(idxs, np.ones(len(idxs), dtype=np.int64), vals)
+            idxs = np.repeat(starts - _run_offsets(lengths), lengths) + np.arange(len(vals))
+        if drop_zeros:
+            keep = vals != 0
+            idxs, vals = idxs[keep], vals[keep]
+        breaks = np.flatnonzero(idxs[1:] - idxs[:-1] != 1) + 1
+        bounds = np.concatenate(([0], breaks, [len(idxs)])) if len(idxs) else np.zeros(1, dtype=np.int64)
+        run = cls.__new__(cls)
+        run.starts = idxs[bounds[:-1]]
+        run.lengths = np.diff(bounds)
+        run.vals = vals
+        run.touch()
+        return run
+
+    @classmethod
+    def from_signal(cls, signal, drop_zeros=False):
+        return cls.from_arrays(signal.idxs, signal.vals, drop_zeros)
+
+    def to_signal(self):
+        return Signal(self.idxs, self.vals)
+
+    def __len__(self):
+        return len(self.vals)
+
+    def __repr__(self):
+        return f"RunSignal(n={len(self)}, runs={self.nruns})"
+
+    def touch(self):
+        """Mark the contents as changed, see Signal.touch."""
+        self.version = next(_signal_versions)
+
+    @property
+    def nruns(self):
+        return len(self.starts)
+
+    @property
+    def nbytes(self):
+        return self.starts.nbytes + self.lengths.nbytes + self.vals.nbytes
+
+    @property
+    def idxs(self):
+        """Explicit ascending indices (expands the runs, O(N))."""
+        return np.repeat(self.starts - _run_offsets(self.lengths), self.lengths) + np.arange(len(self.vals))
+
+    def copy(self):
+        other = RunSignal.__new__(RunSignal)
+        other.starts = self.starts.copy()
+        other.lengths = self.lengths.copy()
+        other.vals = self.vals.copy()
+        other.version = self.version
+        return other
+
+    def set_runs(self, starts, lengths, vals):
+        self.starts, self.lengths, self.vals = starts, lengths, vals
+        self.touch()
+
+    def shift(self, k):
+        """Move every index by +k in O(runs)."""
+        self.set_runs(self.starts + k, self.lengths, self.vals)
+
+    def fold(self):
+        """Time-reverse n -> -n in O(runs); the values become a reversed view."""
+        self.set_runs(-(self.starts + self.lengths - 1)[::-1], self.lengths[::-1], self.vals[::-1])
+
+    def drop_zeros(self):
+        """Remove zero-valued samples, splitting runs around them."""
+        dropped = RunSignal.from_arrays(self.idxs, self.vals, drop_zeros=True)
+        self.set_runs(dropped.starts, dropped.lengths, dropped.vals)
+
+
+def add_runs(signals, weights=None):
+    """Weighted sum of RunSignals over the union of their indices, as a RunSignal."""
+    signals = list(signals)
+    if weights is None:
+        weights = [1] * len(signals)
+    if len(weights) != len(signals):
+        raise ValueError("Need one weight per signal")
+    if not signals:
+        return RunSignal()
+    result = RunSignal.__new__(RunSignal)
+    result.set_runs(*_sum_runs(np.concatenate([s.starts for s in signals]),
+                               np.concatenate([s.lengths for s in signals]),
+                               np.concatenate([s.vals * w if w != 1 else s.vals
+                                               for s, w in zip(signals, weights)])))
+    return result
+
+
+# Overhead of one convolve_signals call in convolve_runs, in samples processed.
+RUN_CONV_CALL_COST = 2000
+
+# Direct multiply-accumulates per sample processed by the run loop (packing,
+# per-run calls and the final run merge), measured against np.convolve.
+RUN_CONV_SAMPLE_COST = 45
+
+
+def _densify_runs(run):
+    """Values and a 0/1 support mask over the index span of a RunSignal."""
+    start = int(run.starts[0])
+    positions = run.idxs - start
+    vals = np.zeros(int(positions[-1]) + 1)
+    vals[positions] = run.vals
+    mask = np.zeros(len(vals))
+    mask[positions] = 1
+    return start, vals, mask
+
+
+def convolve_runs(signal1, signal2, method="auto"):
+    """Index-aware linear convolution of two RunSignals: y[n] = sum x1[i] * x2[n - i].
+
+    Loops over the runs of one signal. Each of its runs u is convolved in
+    one convolve_signals call with all runs of the other signal packed back
+    to back, separated by len(u) - 1 zeros so their outputs do not mix; the
+    pieces are then placed at their indices and summed with the run merge.
+    Gaps between runs are never materialised: the work is about
+    runs1 * len2 + runs2 * len1 samples whichever side is looped over, so
+    the side is picked to keep both the number of calls and the kernel
+    lengths small.
+
+    The merge also sorts runs1 * runs2 pieces, so for many short runs
+    over a small span the loop loses to convolving the spans densely; when
+    its estimated cost exceeds the dense one the spans are convolved
+    instead, and a second convolution of the support masks keeps the
+    output on the same indices.
+    """
+    a, b = signal1, signal2
+    if len(a) == 0 or len(b) == 0:
+        raise ValueError("Both signals must be non-empty")
+
+    packed = a.nruns * len(b) + b.nruns * len(a)
+
+    def loop_cost(x):
+        # per-call overhead plus block convolution with kernels of x's run length
+        return x.nruns * RUN_CONV_CALL_COST + packed * np.log2(max(len(x) / x.nruns, 2))
+    if loop_cost(b) < loop_cost(a):
+        a, b = b, a
+
+    pieces = a.nruns * b.nruns
+    run_cost = RUN_CONV_SAMPLE_COST * (loop_cost(a) + pieces * np.log2(max(pieces, 2)))
+    span_a = int(a.starts[-1] + a.lengths[-1] - a.starts[0])
+    span_b = int(b.starts[-1] + b.lengths[-1] - b.starts[0])
+    costs = _conv_costs(span_a, span_b)
+    dense_cost = 2 * costs.get(method, min(costs.values()))
+    if dense_cost < run_cost:
+        start_a, vals_a, mask_a = _densify_runs(a)
+        start_b, vals_b, mask_b = _densify_runs(b)
+        out, _ = convolve_signals(vals_a, vals_b, method)
+        hits, _ = convolve_signals(mask_a, mask_b, method)
+        keep = np.flatnonzero(hits > 0.5)
+        return RunSignal.from_arrays(keep + (start_a + start_b), out[keep])
+
+    b_offsets = _run_offsets(b.lengths)
+
+    starts, lengths, vals = [], [], []
+    a_offsets = _run_offsets(a.lengths)
+    for start, length, offset in zip(a.starts.tolist(), a.lengths.tolist(), a_offsets.tolist()):
+        u = a.vals[offset:offset + length]
+        gap = length - 1
+        packed = np.zeros(len(b) + gap * (b.nruns - 1))
+        packed_offsets = b_offsets + gap * np.arange(b.nruns)
+        positions = np.repeat(packed_offsets - b_offsets, b.lengths) + np.arange(len(b))
+        packed[positions] = b.vals
+        out, _ = convolve_signals(packed, u, method)
+        starts.append(b.starts + start)
+        lengths.append(b.lengths + gap)
+        vals.append(out)
+    result = RunSignal.__new__(RunSignal)
+    result.set_runs(*_sum_runs(np.concatenate(starts), np.concatenate(lengths), np.concatenate(vals)))
+    return result
+
+
+def multiply(signal, c):
+    """Multiply the signal values by the constant c.
+
+    An integer signal times a non-integer c becomes a float signal.
+    """
+    signal.promote(np.result_type(signal.dtype, c))
+    signal.vals = signal.vals * c
 
     
+QUANTIZER_KINDS = ("mid_rise", "mid_tread")
+
+# Codes are computed in float64, which holds integers exactly up to 2**53.
+QUANTIZER_MAX_BITS = 53
+
+
+def code_dtype(levels):
+    """Smallest unsigned integer dtype that holds the codes 0..levels-1."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if levels - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"Too many quantization levels: {levels}")
+
+
+def code_bits(levels):
+    """Bits needed per code for the given number of levels."""
+    return max((levels - 1).bit_length(), 1)
+
+
+def quantize_signal(vals, bits=None, levels=None, kind="mid_rise", value_range=None, pack=False):
+    """Uniform quantization of the signal values.
+
+    Args:
+        vals: signal values
+        bits: number of bits, levels = 2**bits (give bits or levels),
+            at most QUANTIZER_MAX_BITS
+        levels: number of levels, 1 < levels <= 2**QUANTIZER_MAX_BITS
+        kind: "mid_rise": levels at low + (i + 0.5) * step with
+            step = (high - low) / levels, i.e. cell centres;
+            "mid_tread": levels at low + i * step with
+            step = (high - low) / (levels - 1), both ends included
+        value_range: (low, high) to quantize over, default the min and max
+            of vals; samples outside are clipped to the outer levels
+        pack: return the codes bit-packed, see pack_codes
+
+    Returns:
+        (quantized, error, codes) with error = vals - quantized and codes
+        in the smallest unsigned dtype (code_dtype), or packed to
+        code_bits(levels) bits per sample (decode with unpack_codes)
+    """
+    if (bits is None) == (levels is None):
+        raise ValueError("Give either bits or levels")
+    if bits is not None:
+        if bits <= 0:
+            raise ValueError("Bits must be positive")
+        if bits > QUANTIZER_MAX_BITS:
+            raise ValueError(f"Bits must be at most {QUANTIZER_MAX_BITS}")
+        levels = 2 ** bits
+    if levels <= 1:
+        raise ValueError("Levels must be integer > 1")
+    if levels > 2 ** QUANTIZER_MAX_BITS:
+        raise ValueError(f"Levels must be at most 2**{QUANTIZER_MAX_BITS}")
+    if kind not in QUANTIZER_KINDS:
+        raise ValueError(f"Unknown quantizer: {kind}")
+
+    x = np.asarray(vals, dtype=float)
+    if value_range is not None:
+        low, high = map(float, value_range)
+        if high < low:
+            raise ValueError("Range must be (low, high) with low <= high")
+    elif x.size:
+        low, high = float(x.min()), float(x.max())
+    else:
+        low = high = 0.0
+    dtype = code_dtype(levels)
+
+    if high == low:
+        # degenerate: all samples on a single level
+        codes = np.zeros(x.shape, dtype=dtype)
+        quantized = np.full(x.shape, low)
+    elif kind == "mid_rise":
+        step = (high - low) / levels
+        codes = np.clip(np.floor((x - low) / step), 0, levels - 1).astype(dtype)
+        quantized = low + (codes + 0.5) * step
+    else:
+        step = (high - low) / (levels - 1)
+        codes = np.clip(np.rint((x - low) / step), 0, levels - 1).astype(dtype)
+        quantized = low + codes * step
+    error = x - quantized
+
+    if pack:
+        codes = pack_codes(codes, code_bits(levels))
+    return quantized, error, codes
+
+
+def pack_codes(codes, bits):
+    """Pack unsigned integer codes to exactly `bits` bits each (MSB first).
+
+    Returns a uint8 array of ceil(len(codes) * bits / 8) bytes.
+    """
+    codes = np.asarray(codes)
+    width = code_dtype(1 << bits).itemsize
+    # big-endian bytes of every code, keep only the low `bits` bits
+    raw = codes.astype(f">u{width}").view(np.uint8).reshape(-1, width)
+    return np.packbits(np.unpackbits(raw, axis=1)[:, 8 * width - bits:])
+
+
+def unpack_codes(packed, bits, count):
+    """Decode count codes packed by pack_codes, in the smallest dtype."""
+    dtype = code_dtype(1 << bits)
+    width = dtype.itemsize
+    unpacked = np.unpackbits(np.asarray(packed, dtype=np.uint8), count=count * bits).reshape(count, bits)
+    planes = np.zeros((count, 8 * width), dtype=np.uint8)
+    planes[:, 8 * width - bits:] = unpacked
+    return np.packbits(planes, axis=1).view(f">u{width}").ravel().astype(dtype)
+
+
 def quantize(vals, bits):
-    """Quantize given list of signal values in place."""
-    levels = 2 ** bits
-    min_val = min(vals)
-    max_val = max(vals)
-    delta = (max_val - min_val) / levels
-
-    def quantize_error(original_vals, quantized_vals):
-        """Calculate quantization error between original and quantized values."""
-        error = []
-        for o, q in zip(original_vals, quantized_vals):
-            error.append(o - q)
-        return error
-
-    for i in range(len(vals)):
-        q_level = round((vals[i] - min_val) / delta)
-        vals[i] = min_val + q_level * delta
-    
+    """Quantize given list of signal values in place (mid-rise, see quantize_signal)."""
+    quantized, _, _ = quantize_signal(vals, bits=bits)
+    vals[:] = quantized if isinstance(vals, np.ndarray) else quantized.tolist()
+
+
+def _visible_slice(x, xlim):
+    """Slice of the ascending x inside xlim, with one extra point on each side."""
+    if xlim is None:
+        return slice(0, len(x))
+    left, right = xlim
+    if x.dtype.kind in "iu":
+        # compare in x's own dtype so searchsorted does not convert all of x
+        left = x.dtype.type(max(np.floor(left), np.iinfo(x.dtype).min))
+        right = x.dtype.type(min(np.ceil(right), np.iinfo(x.dtype).max))
+    lo = max(np.searchsorted(x, left, side="left") - 1, 0)
+    hi = min(np.searchsorted(x, right, side="right") + 1, len(x))
+    return slice(lo, hi)
+
+
+def minmax_envelope(x, y, n_bins, xlim=None):
+    """Reduce (x, y) to the min and max of y in n_bins equal-width x bins.
+
+    x must be ascending. Only the part inside xlim is used. Returns
+    (bin_x, y_min, y_max) with one entry per non-empty bin, or the raw
+    samples (y_min == y_max) when there are fewer than 2*n_bins of them.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    part = _visible_slice(x, xlim)
+    x, y = x[part], y[part]
+    if len(x) <= 2 * n_bins:
+        return x, y, y
+
+    edges = np.linspace(x[0], x[-1], n_bins + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side="left"))
+    starts = starts[starts < len(x)]
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+
+def downsample_image(image, max_rows, max_cols):
+    """Shrink a 2-D array to at most max_rows x max_cols by block maxima.
+
+    Rows and columns are grouped in equal runs (the last one may be
+    shorter) and each block keeps its maximum, so narrow peaks in a
+    spectrogram stay visible.
+    """
+    image = np.asarray(image)
+    for axis, limit in ((0, max_rows), (1, max_cols)):
+        n = image.shape[axis]
+        if n > limit > 0:
+            image = np.maximum.reduceat(image, np.arange(0, n, -(-n // limit)), axis=axis)
+    return image
+
+
+def lttb(x, y, n_out, xlim=None):
+    """Largest-Triangle-Three-Buckets downsampling of an ascending-x line.
+
+    Keeps the first and last points and, from each of n_out-2 buckets, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, so peaks and shape survive.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    part = _visible_slice(x, xlim)
+    x, y = x[part], y[part]
+    N = len(x)
+    if n_out >= N or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, N - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, N - 1
+    xf = x.astype(float)
+    yf = y.astype(float)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = xf[hi:edges[i + 2]].mean()
+            next_y = yf[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xf[-1], yf[-1]
+        area = np.abs((xf[a] - next_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (next_y - yf[a]))
+        a = lo + int(np.argmax(area)) if hi > lo else lo
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
 
 def reposition_array(indices, values):
-    
-    paired = list(zip(indices, values))
-    
-    paired.sort(key=lambda x: x[0])
-    
-    ordered_values = [val for _, val in paired]
-    return ordered_values
+    """Return the values ordered by ascending index."""
+    order = np.argsort(indices, kind="stable")
+    return np.asarray(values)[order]
 
 
 
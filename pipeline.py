@@ -0,0 +1,231 @@
+"""Streaming pipeline: chain logic operators over blocks with bounded memory.
+
+Every operator is a block processor that keeps just the history it needs
+between blocks (window prefix sums, previous samples, convolution overlap).
+Blocks are (idxs, vals) array pairs, e.g. from logic.iter_signal_chunks:
+
+    chain = Pipeline(MovingAverageBlock(5), FirstDerivativeBlock())
+    idxs, vals = chain.run(logic.iter_signal_chunks("big.txt"))
+
+The output is bit-identical to calling the batch functions one after
+another (convolution: with method="direct"; moving average: without
+rebase).
+"""
+import numpy as np
+
+import logic
+
+_NO_IDXS = np.zeros(0, dtype=np.int64)
+
+
+def _empty():
+    return _NO_IDXS, np.zeros(0)
+
+
+class BlockProcessor:
+    """Base class for a stateful operator applied block by block.
+
+    process() returns the output that is complete after the block, flush()
+    returns what is left at the end of the stream. Output indices are taken
+    from a queue of the input indices, after dropping the first `skip`.
+    """
+
+    def __init__(self, skip=0):
+        self._idxs = _NO_IDXS
+        self._skip = skip
+
+    def _queue(self, idxs):
+        idxs = np.asarray(idxs, dtype=np.int64)
+        if self._skip:
+            drop = min(self._skip, len(idxs))
+            idxs = idxs[drop:]
+            self._skip -= drop
+        self._idxs = np.concatenate((self._idxs, idxs))
+
+    def _take(self, vals):
+        n = len(vals)
+        idxs, self._idxs = self._idxs[:n], self._idxs[n:]
+        return idxs, vals
+
+    def process(self, idxs, vals):
+        raise NotImplementedError
+
+    def flush(self):
+        return _empty()
+
+
+class ScaleBlock(BlockProcessor):
+    """Streaming logic.multiply: y(n) = c * x(n)."""
+
+    def __init__(self, c):
+        super().__init__()
+        self.c = c
+
+    def process(self, idxs, vals):
+        return np.asarray(idxs, dtype=np.int64), np.asarray(vals, dtype=float) * self.c
+
+
+class MovingAverageBlock(BlockProcessor):
+    """Streaming logic.moving_average on top of logic.MovingAverageState.
+
+    Pass rebase=True for unbounded streams (see MovingAverageState).
+    """
+
+    def __init__(self, window_size, mode="trailing", rebase=False):
+        super().__init__(skip=window_size - 1 if mode == "valid" else 0)
+        self.state = logic.MovingAverageState(window_size, mode, rebase)
+
+    def process(self, idxs, vals):
+        self._queue(idxs)
+        return self._take(self.state.process(vals))
+
+    def flush(self):
+        if self.state._seen < self.state.window_size:
+            raise ValueError("Window size must be positive and <= signal length")
+        return self._take(self.state.flush())
+
+
+class FirstDerivativeBlock(BlockProcessor):
+    """Streaming logic.first_derivative, output indices idxs[1:]."""
+
+    order = 1
+
+    def __init__(self):
+        # both derivatives are centred on x(n) with n starting at idxs[1]
+        super().__init__(skip=1)
+        self._prev = None
+        self._seen = 0
+
+    def _apply(self, x):
+        return x[1:] - x[:-1]
+
+    def process(self, idxs, vals):
+        self._queue(idxs)
+        vals = np.asarray(vals)
+        self._seen += len(vals)
+        x = vals if self._prev is None else np.concatenate((self._prev, vals))
+        self._prev = x[-self.order:]
+        if len(x) <= self.order:
+            return self._take(np.zeros(0))
+        return self._take(self._apply(x))
+
+    def flush(self):
+        if self._seen <= self.order:
+            raise ValueError(f"Signal must have at least {self.order + 1} samples for "
+                             + ("first" if self.order == 1 else "second") + " derivative")
+        return _empty()
+
+
+class SecondDerivativeBlock(FirstDerivativeBlock):
+    """Streaming logic.second_derivative, output indices idxs[1:-1]."""
+
+    order = 2
+
+    def _apply(self, x):
+        return x[2:] - 2 * x[1:-1] + x[:-2]
+
+
+class ConvolveBlock(BlockProcessor):
+    """Streaming logic.convolve_signals of the stream with a fixed kernel.
+
+    method="direct" carries the last M-1 input samples and matches the batch
+    direct method bit for bit (when the stream is at least as long as the
+    kernel, otherwise the batch function swaps the operands);
+    method="overlap_add" FFT-convolves each block
+    and carries the M-1 sample overlap tail. Output indices run 0..N+M-2
+    like the batch function.
+    """
+
+    def __init__(self, kernel, method="direct"):
+        super().__init__()
+        if method not in ("direct", "overlap_add"):
+            raise ValueError(f"Unknown streaming convolution method: {method}")
+        self.kernel = np.asarray(kernel, dtype=float)
+        if self.kernel.size == 0:
+            raise ValueError("Both signals must be non-empty")
+        self.method = method
+        M = len(self.kernel)
+        self._history = np.zeros(M - 1)
+        self._count = 0
+
+    def _emit(self, vals):
+        idxs = np.arange(self._count, self._count + len(vals))
+        self._count += len(vals)
+        return idxs, vals
+
+    def process(self, idxs, vals):
+        x = np.asarray(vals, dtype=float)
+        if x.size == 0:
+            return _empty()
+        M = len(self.kernel)
+        if self.method == "direct":
+            ext = np.concatenate((self._history, x))
+            y = np.convolve(ext, self.kernel, mode="valid")
+            self._history = ext[len(ext) - (M - 1):]
+        else:
+            # here _history holds the overlap tail still to be added
+            full, _ = logic.convolve_signals(x, self.kernel, method="fft")
+            acc = np.zeros(max(len(full), M - 1))
+            acc[:M - 1] += self._history
+            acc[:len(full)] += full
+            y = acc[:len(x)]
+            self._history = acc[len(x):len(x) + M - 1]
+        return self._emit(y)
+
+    def flush(self):
+        if self._count == 0:
+            raise ValueError("Both signals must be non-empty")
+        M = len(self.kernel)
+        if M == 1:
+            return _empty()
+        if self.method == "direct":
+            ext = np.concatenate((self._history, np.zeros(M - 1)))
+            return self._emit(np.convolve(ext, self.kernel, mode="valid")[:M - 1])
+        return self._emit(self._history)
+
+
+class Pipeline:
+    """A chain of block processors applied in order."""
+
+    def __init__(self, *stages):
+        self.stages = list(stages)
+
+    def process(self, idxs, vals):
+        for stage in self.stages:
+            idxs, vals = stage.process(idxs, vals)
+        return idxs, vals
+
+    def flush(self):
+        """Flush the stages in order, pushing each stage's tail through the rest."""
+        idxs, vals = _empty()
+        for stage in self.stages:
+            head_idxs, head_vals = stage.process(idxs, vals)
+            tail_idxs, tail_vals = stage.flush()
+            idxs = np.concatenate((head_idxs, tail_idxs))
+            vals = np.concatenate((head_vals, tail_vals))
+        return idxs, vals
+
+    def run(self, source, sink=None):
+        """Pipe every (idxs, vals) block of source through the chain.
+
+        Args:
+            source: iterable of (idxs, vals) blocks
+            sink: callable(idxs, vals) receiving each output block, e.g.
+                logic.BinarySignalWriter(path).write; if None the output is
+                collected and returned as (idxs, vals)
+        """
+        collected = []
+        emit = sink if sink is not None else lambda i, v: collected.append((i, v))
+        for idxs, vals in source:
+            out_idxs, out_vals = self.process(idxs, vals)
+            if len(out_vals):
+                emit(out_idxs, out_vals)
+        out_idxs, out_vals = self.flush()
+        if len(out_vals):
+            emit(out_idxs, out_vals)
+
+        if sink is None:
+            if not collected:
+                return _empty()
+            return (np.concatenate([c[0] for c in collected]),
+                    np.concatenate([c[1] for c in collected]))
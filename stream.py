@@ -0,0 +1,309 @@
+"""Live input: samples read from a pipe or socket into fixed-size ring buffers.
+
+    live = stream.LiveStream("tcp:5000", capacity=1 << 18, window_size=5).start()
+    ...
+    idxs, vals = live.buffers["moving_avg"].latest()
+    live.stop()
+
+Sources:
+    -           standard input
+    PATH        a named pipe (or any file), read until the writer closes it
+    tcp:PORT    one connection accepted on 127.0.0.1:PORT
+    udp:PORT    datagrams received on 127.0.0.1:PORT
+
+Formats: "text" is whitespace separated numbers, one sample per number
+(so one value per line works); "f32" and "f64" are raw little-endian
+floats. Samples are numbered 0, 1, 2, ... as they arrive.
+
+A reader thread parses whatever arrived, writes it into the ring buffers
+and pushes it through the streaming moving average and derivatives of
+pipeline.py, which only keep the history they need. Memory stays fixed
+however long the acquisition runs, and the moving average rebases its
+running sums so its rounding error does not grow with the sample count;
+the buffers hold the latest capacity samples of the signal and of every
+derived stream.
+"""
+import os
+import socket
+import sys
+import threading
+
+import numpy as np
+
+import pipeline
+
+STREAM_FORMATS = ("text", "f32", "f64")
+
+# Bytes asked for per read; a read returns earlier with whatever is there.
+STREAM_READ_SIZE = 1 << 16
+
+# Seconds a socket waits for data before the reader checks for stop().
+SOCKET_TIMEOUT = 0.2
+
+
+class RingBuffer:
+    """The latest capacity (index, value) samples in preallocated arrays.
+
+    write() copies a block in with at most two slice assignments and
+    latest() copies the contents out in arrival order; both hold a lock, so
+    one thread can write while another reads.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.capacity = capacity
+        self._idxs = np.zeros(capacity, dtype=np.int64)
+        self._vals = np.zeros(capacity, dtype=dtype)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self):
+        """Samples written since the start, including overwritten ones."""
+        return self._total
+
+    def write(self, idxs, vals):
+        n = len(vals)
+        # only the last capacity samples of a block survive anyway
+        skip = max(n - self.capacity, 0)
+        idxs, vals = idxs[skip:], vals[skip:]
+        with self._lock:
+            start = (self._total + skip) % self.capacity
+            first = min(len(vals), self.capacity - start)
+            self._idxs[start:start + first] = idxs[:first]
+            self._vals[start:start + first] = vals[:first]
+            self._idxs[:len(vals) - first] = idxs[first:]
+            self._vals[:len(vals) - first] = vals[first:]
+            self._total += n
+
+    def latest(self, n=None):
+        """Copies (idxs, vals) of the last n samples (default all), oldest first."""
+        with self._lock:
+            count = len(self) if n is None else min(n, len(self))
+            end = self._total % self.capacity
+            start = (end - count) % self.capacity
+            if start + count <= self.capacity:
+                return self._idxs[start:start + count].copy(), self._vals[start:start + count].copy()
+            return (np.concatenate((self._idxs[start:], self._idxs[:end])),
+                    np.concatenate((self._vals[start:], self._vals[:end])))
+
+    def clear(self):
+        with self._lock:
+            self._total = 0
+
+
+class TextParser:
+    """Numbers from text arriving in arbitrary pieces.
+
+    A number cut at the end of a piece is kept until the rest arrives.
+    """
+
+    def __init__(self):
+        self._rest = b""
+
+    def feed(self, data):
+        data = self._rest + data
+        cut = max(data.rfind(b" "), data.rfind(b"\n"), data.rfind(b"\t"), data.rfind(b"\r"))
+        self._rest = data[cut + 1:]
+        return _parse_numbers(data[:cut + 1])
+
+    def flush(self):
+        data, self._rest = self._rest, b""
+        return _parse_numbers(data)
+
+
+class BinaryParser:
+    """Raw little-endian floats arriving in arbitrary pieces."""
+
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self._rest = b""
+
+    def feed(self, data):
+        data = self._rest + data
+        whole = len(data) - len(data) % self.dtype.itemsize
+        self._rest = data[whole:]
+        return np.frombuffer(data[:whole], dtype=self.dtype).astype(float)
+
+    def flush(self):
+        if self._rest:
+            raise ValueError(f"Stream ended inside a sample ({len(self._rest)} trailing bytes)")
+        return np.zeros(0)
+
+
+def _parse_numbers(data):
+    if not data.strip():
+        return np.zeros(0)
+    try:
+        vals = np.fromstring(data, sep=" ")
+    except ValueError:
+        vals = None
+    if vals is None or vals.size != len(data.split()):
+        raise ValueError(f"Malformed number in stream near {data[:40]!r}")
+    return vals
+
+
+def make_parser(fmt):
+    if fmt == "text":
+        return TextParser()
+    if fmt == "f32":
+        return BinaryParser(np.float32)
+    if fmt == "f64":
+        return BinaryParser(np.float64)
+    raise ValueError(f"Unknown stream format: {fmt}")
+
+
+class FileSource:
+    """Standard input ("-"), a named pipe or a file, read with os.read.
+
+    Opening a named pipe waits for a writer, and a read waits for data, so
+    stop() only takes effect once the writer sends something or closes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def read(self, size):
+        if self._fd is None:
+            self._fd = sys.stdin.fileno() if self.path == "-" else os.open(self.path, os.O_RDONLY)
+        return os.read(self._fd, size)
+
+    def close(self):
+        if self._fd is not None and self.path != "-":
+            os.close(self._fd)
+        self._fd = None
+
+
+class TcpSource:
+    """One TCP connection accepted on host:port; the stream ends when it closes."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(SOCKET_TIMEOUT)
+        self._conn = None
+
+    def read(self, size):
+        """Bytes received, b"" at the end, None if nothing came within the timeout."""
+        try:
+            if self._conn is None:
+                self._conn, _ = self._server.accept()
+                self._conn.settimeout(SOCKET_TIMEOUT)
+            return self._conn.recv(size)
+        except socket.timeout:
+            return None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._server.close()
+
+
+class UdpSource:
+    """Datagrams received on host:port; the stream only ends with stop()."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self._socket.settimeout(SOCKET_TIMEOUT)
+
+    def read(self, size):
+        try:
+            return self._socket.recv(max(size, 65535))
+        except socket.timeout:
+            return None
+
+    def close(self):
+        self._socket.close()
+
+
+def open_source(spec):
+    """Source for "-", "tcp:PORT", "udp:PORT" or a path (see the module docstring)."""
+    kind, _, port = spec.partition(":")
+    if kind in ("tcp", "udp") and port:
+        try:
+            port = int(port)
+        except ValueError:
+            raise ValueError(f"Invalid port in {spec!r}") from None
+        return TcpSource(port) if kind == "tcp" else UdpSource(port)
+    return FileSource(spec)
+
+
+class LiveStream:
+    """A source read on a background thread into one RingBuffer per stream.
+
+    buffers holds "signal" (the raw samples), "moving_avg" (trailing
+    moving average), "first_deriv" and "second_deriv", each with the
+    sample indices of the streaming operators in pipeline.py.
+    """
+
+    STREAMS = ("signal", "moving_avg", "first_deriv", "second_deriv")
+
+    def __init__(self, source, capacity=1 << 18, fmt="text", window_size=5):
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Unknown stream format: {fmt}")
+        if window_size <= 0:
+            raise ValueError("Window size must be positive")
+        self.source = source
+        self.fmt = fmt
+        self.stages = {
+            "moving_avg": pipeline.MovingAverageBlock(window_size, rebase=True),
+            "first_deriv": pipeline.FirstDerivativeBlock(),
+            "second_deriv": pipeline.SecondDerivativeBlock(),
+        }
+        self.buffers = {name: RingBuffer(capacity) for name in self.STREAMS}
+        self.error = None
+        self._count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the reader to finish; it stops at its next read."""
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def total(self):
+        """Samples received so far."""
+        return self._count
+
+    def _run(self):
+        source = None
+        try:
+            source = open_source(self.source) if isinstance(self.source, str) else self.source
+            parser = make_parser(self.fmt)
+            while not self._stop.is_set():
+                data = source.read(STREAM_READ_SIZE)
+                if data is None:
+                    continue
+                if not data:
+                    break
+                self._push(parser.feed(data))
+            self._push(parser.flush())
+        except Exception as e:
+            self.error = e
+        finally:
+            if source is not None:
+                source.close()
+
+    def _push(self, vals):
+        if not len(vals):
+            return
+        idxs = np.arange(self._count, self._count + len(vals))
+        self._count += len(vals)
+        self.buffers["signal"].write(idxs, vals)
+        for name, stage in self.stages.items():
+            out_idxs, out_vals = stage.process(idxs, vals)
+            if len(out_vals):
+                self.buffers[name].write(out_idxs, out_vals)
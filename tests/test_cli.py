@@ -0,0 +1,53 @@
+"""Operation chains of the batch processor."""
+import numpy as np
+import pytest
+
+import cli
+import logic
+
+
+def test_parse_chain_converts_arguments():
+    chain = cli.parse_chain("shift:-3, multiply:2.5,ma:5:centered,derivative:2,quantize:8,fold,,dft")
+    assert chain == [("shift", [-3]), ("multiply", [2.5]), ("ma", [5, "centered"]),
+                     ("derivative", ["2"]), ("quantize", [8]), ("fold", []), ("dft", [])]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("add", "add takes 1 argument"),
+    ("fold:1", "fold takes 0 argument"),
+    ("ma:5:trailing:x", "ma takes 1 to 2 argument"),
+    ("shift:abc", "Invalid argument for shift: 'abc'"),
+    ("multiply:x", "Invalid argument"),
+    ("ma:0", "Invalid argument"),
+    ("ma:5:sideways", "Invalid argument"),
+    ("derivative:3", "Invalid argument"),
+    ("convolve:k.txt:slow", "Invalid argument"),
+    ("quantize:8:round", "Invalid argument"),
+    ("scale:2", "Unknown operation"),
+    ("dft,fold", "dft must be the last"),
+])
+def test_parse_chain_rejects(text, message):
+    with pytest.raises(ValueError, match=message):
+        cli.parse_chain(text)
+
+
+def test_main_reports_a_bad_chain_before_reading_files(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["-c", "shift:abc", "-o", str(tmp_path / "out"), str(tmp_path / "missing.txt")])
+    assert exit_info.value.code == 2
+    assert "Invalid argument for shift" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
+
+
+def test_process_file_applies_the_chain(tmp_path, rng):
+    path = str(tmp_path / "sig.txt")
+    vals = rng.standard_normal(100)
+    logic.write_signal(path, np.arange(100), vals)
+    chain = cli.parse_chain("multiply:2,ma:4:valid,derivative:1,shift:10")
+    (tmp_path / "out").mkdir()
+    _, n_in, n_out, _ = cli.process_file(path, chain, str(tmp_path / "out"))
+    idxs, out = logic.read_signal(str(tmp_path / "out" / "sig.txt"))
+    expected = logic.first_derivative(logic.moving_average(vals * 2, 4, "valid"))
+    assert (n_in, n_out) == (100, 96)
+    np.testing.assert_array_equal(idxs, np.arange(4, 100) + 10)
+    np.testing.assert_allclose(out, expected, rtol=1e-12, atol=1e-12)
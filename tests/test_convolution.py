@@ -0,0 +1,50 @@
+"""convolve_signals against np.convolve."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _assert_close(actual, expected):
+    scale = max(np.abs(expected).max(initial=0.0), 1.0)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12 * scale)
+
+
+@pytest.mark.parametrize("method", [m for m in logic.CONV_METHODS if m != "parallel"])
+@pytest.mark.parametrize("n, m", [(1, 1), (50, 7), (7, 50), (1000, 33), (3000, 1000), (20000, 33)])
+def test_convolve_signals_matches_numpy(rng, method, n, m):
+    a = rng.standard_normal(n)
+    b = rng.standard_normal(m)
+    vals, idxs = logic.convolve_signals(a, b, method)
+    _assert_close(vals, np.convolve(a, b))
+    np.testing.assert_array_equal(idxs, np.arange(n + m - 1))
+
+
+def test_choose_convolution_method():
+    assert logic.choose_convolution_method(10, 3) == "direct"
+    assert logic.choose_convolution_method(1 << 20, 1 << 12) != "direct"
+
+
+def test_convolve_signals_rejects_bad_input():
+    with pytest.raises(ValueError):
+        logic.convolve_signals([], [1.0])
+    with pytest.raises(ValueError):
+        logic.convolve_signals([1.0], [1.0], method="bogus")
+
+
+@pytest.mark.parametrize("n, m", [(20000, 33), (33, 20000), (50000, 1000)])
+def test_parallel_convolution_is_identical_to_overlap_add(rng, n, m):
+    a = rng.standard_normal(n)
+    b = rng.standard_normal(m)
+    reported = []
+    vals, idxs = logic.convolve_signals(a, b, "parallel", progress=reported.append, workers=2)
+    np.testing.assert_array_equal(vals, logic.convolve_signals(a, b, "overlap_add")[0])
+    np.testing.assert_array_equal(idxs, np.arange(n + m - 1))
+    assert reported[-1] == 1
+
+
+def test_parallel_convolution_with_one_worker_runs_serially(rng):
+    a = rng.standard_normal(5000)
+    b = rng.standard_normal(17)
+    vals, _ = logic.convolve_signals(a, b, "parallel", workers=1)
+    np.testing.assert_array_equal(vals, logic.convolve_signals(a, b, "overlap_add")[0])
@@ -0,0 +1,59 @@
+"""Level-of-detail reduction for plotting."""
+import numpy as np
+
+import logic
+
+
+def test_minmax_envelope_keeps_the_extremes(rng):
+    x = np.arange(100000)
+    y = rng.standard_normal(100000)
+    y[12345] = 50
+    y[67890] = -50
+    bin_x, y_min, y_max = logic.minmax_envelope(x, y, 500)
+    assert len(bin_x) <= 500
+    assert y_max.max() == 50 and y_min.min() == -50
+    assert np.all(y_min <= y_max)
+    # every bin's min/max equals the samples between its start and the next
+    starts = np.searchsorted(x, bin_x)
+    for i in (0, 17, len(starts) - 1):
+        stop = starts[i + 1] if i + 1 < len(starts) else len(x)
+        assert y_min[i] == y[starts[i]:stop].min()
+        assert y_max[i] == y[starts[i]:stop].max()
+
+
+def test_minmax_envelope_returns_few_samples_as_they_are():
+    x = np.arange(10)
+    y = np.arange(10.0)
+    bin_x, y_min, y_max = logic.minmax_envelope(x, y, 100)
+    np.testing.assert_array_equal(bin_x, x)
+    np.testing.assert_array_equal(y_min, y)
+    np.testing.assert_array_equal(y_max, y)
+
+
+def test_minmax_envelope_only_uses_the_visible_part():
+    x = np.arange(100000)
+    y = np.zeros(100000)
+    y[10] = 9
+    bin_x, _, y_max = logic.minmax_envelope(x, y, 100, xlim=(5000.5, 6000.5))
+    # one extra sample on each side keeps the line running off the edges
+    assert bin_x[0] >= 4999 and bin_x[-1] <= 6002
+    assert y_max.max() == 0
+
+
+def test_lttb_keeps_the_ends_and_peaks(rng):
+    x = np.arange(10000)
+    y = rng.standard_normal(10000) * 0.01
+    y[4321] = 10
+    out_x, out_y = logic.lttb(x, y, 200)
+    assert len(out_x) == 200
+    assert out_x[0] == 0 and out_x[-1] == 9999
+    assert np.all(np.diff(out_x) > 0)
+    assert 4321 in out_x
+    np.testing.assert_array_equal(out_y, y[out_x])
+
+
+def test_lttb_returns_short_input_unchanged():
+    x, y = np.arange(5), np.ones(5)
+    out_x, out_y = logic.lttb(x, y, 10)
+    np.testing.assert_array_equal(out_x, x)
+    np.testing.assert_array_equal(out_y, y)
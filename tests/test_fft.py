@@ -0,0 +1,49 @@
+"""fft, ifft, rfft and irfft against numpy.fft."""
+import numpy as np
+import pytest
+
+import logic
+
+# radix-2, mixed-radix (small factors) and Bluestein (prime) lengths
+FFT_LENGTHS = [1, 2, 8, 1024, 6, 12, 360, 1000, 7, 97, 1009, 2 * 101]
+
+
+def _assert_close(actual, expected):
+    scale = max(np.abs(expected).max(initial=0.0), 1.0)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12 * scale)
+
+
+@pytest.mark.parametrize("n", FFT_LENGTHS)
+def test_fft_matches_numpy(rng, n):
+    x = rng.standard_normal(n) + 1j * rng.standard_normal(n)
+    _assert_close(logic.fft(x), np.fft.fft(x))
+
+
+@pytest.mark.parametrize("n", FFT_LENGTHS)
+def test_ifft_matches_numpy(rng, n):
+    X = rng.standard_normal(n) + 1j * rng.standard_normal(n)
+    _assert_close(logic.ifft(X), np.fft.ifft(X))
+
+
+@pytest.mark.parametrize("n", FFT_LENGTHS)
+def test_rfft_matches_numpy(rng, n):
+    x = rng.standard_normal(n)
+    _assert_close(logic.rfft(x), np.fft.rfft(x))
+
+
+@pytest.mark.parametrize("n", [2, 8, 1024, 12, 1000, 7, 97, 1009])
+def test_irfft_inverts_rfft(rng, n):
+    x = rng.standard_normal(n)
+    _assert_close(logic.irfft(logic.rfft(x), n), x)
+
+
+def test_fft_batched_rows(rng):
+    x = rng.standard_normal((5, 97))
+    _assert_close(logic.fft(x), np.fft.fft(x, axis=-1))
+
+
+def test_bluestein_cached_length_both_directions(rng):
+    x = rng.standard_normal(1009) + 1j * rng.standard_normal(1009)
+    for _ in range(2):
+        _assert_close(logic.fft(x), np.fft.fft(x))
+        _assert_close(logic.ifft(x), np.fft.ifft(x))
@@ -0,0 +1,44 @@
+"""Goertzel probing against the DFT and the direct sum."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _direct(x, freqs, fs):
+    n = np.arange(len(x))
+    return np.exp(-2j * np.pi * np.outer(freqs, n) / fs) @ x
+
+
+@pytest.mark.parametrize("N", [1, 7, 100, 1000, 1009])
+def test_bin_centres_match_the_dft(rng, N):
+    x = rng.standard_normal(N)
+    k = np.arange(N)
+    np.testing.assert_allclose(logic.goertzel(x, k * 8.0 / N, fs=8.0), np.fft.fft(x), rtol=0, atol=1e-9 * N)
+
+
+@pytest.mark.parametrize("block_size", [None, 1, 13, 5000])
+def test_arbitrary_frequencies(rng, block_size):
+    x = rng.standard_normal(999)
+    freqs = [0.0, 1.234, 100.5, 499.9, 1000.0]
+    np.testing.assert_allclose(logic.goertzel(x, freqs, fs=1000.0, block_size=block_size),
+                               _direct(x, np.array(freqs), 1000.0), rtol=0, atol=1e-6)
+
+
+def test_finds_a_synthesized_tone():
+    fs = 1000.0
+    x = logic.synthesize(1000, [(2.0, 50.0, 0.3)], fs=fs).vals
+    X = logic.goertzel(x, [50.0, 120.0], fs=fs)
+    np.testing.assert_allclose(np.abs(X[0]) * 2 / len(x), 2.0, rtol=1e-9)
+    np.testing.assert_allclose(np.angle(X[0]), 0.3 - np.pi / 2, atol=1e-9)
+    assert np.abs(X[1]) < 1e-9
+
+
+def test_empty_signal_and_scalar_frequency():
+    np.testing.assert_array_equal(logic.goertzel([], [1.0, 2.0]), [0, 0])
+    assert logic.goertzel([1.0, 1.0], 0.0).shape == (1,)
+
+
+def test_rejects_bad_sampling_frequency():
+    with pytest.raises(ValueError):
+        logic.goertzel([1.0], [0.1], fs=0)
@@ -0,0 +1,136 @@
+"""Undo and redo of the operations on a Signal."""
+import numpy as np
+
+import history
+import logic
+
+
+def _snapshot(signal):
+    return signal.idxs.copy(), signal.vals.copy()
+
+
+def _assert_same(signal, snapshot):
+    np.testing.assert_array_equal(signal.idxs, snapshot[0])
+    np.testing.assert_array_equal(signal.vals, snapshot[1])
+    assert signal.vals.dtype == snapshot[1].dtype
+
+
+def test_undo_and_redo_every_operation(rng):
+    s = logic.Signal(np.arange(-5, 5), rng.standard_normal(10))
+    h = history.History(s)
+    steps = [_snapshot(s)]
+    h.shift(3)
+    steps.append(_snapshot(s))
+    h.fold()
+    steps.append(_snapshot(s))
+    h.multiply(0.5)
+    steps.append(_snapshot(s))
+    h.apply("add", logic.add_signal, [100, 101], [1.0, 2.0], s)
+    steps.append(_snapshot(s))
+    assert len(h) == 4
+
+    for name, before in zip(["add", "multiply 0.5", "fold", "shift +3"], steps[-2::-1]):
+        assert h.undo() == name
+        _assert_same(s, before)
+    assert h.undo() is None and h.can_redo
+    for after in steps[1:]:
+        h.redo()
+        _assert_same(s, after)
+    assert h.redo() is None
+
+
+def test_float_multiply_keeps_no_state(rng):
+    s = logic.Signal(np.arange(1000), rng.standard_normal(1000))
+    before = _snapshot(s)
+    h = history.History(s)
+    h.multiply(3.0)
+    assert h.nbytes() == 0
+    h.undo()
+    np.testing.assert_allclose(s.vals, before[1], rtol=1e-15)
+
+
+def test_exact_multiply_restores_bit_for_bit(rng):
+    s = logic.Signal(np.arange(1000), rng.standard_normal(1000))
+    before = _snapshot(s)
+    h = history.History(s)
+    h.multiply(0.1, exact=True)
+    assert h.nbytes() == before[1].nbytes
+    h.undo()
+    _assert_same(s, before)
+
+
+def test_multiply_by_zero_and_integer_signals_restore_the_state():
+    s = logic.Signal([0, 1, 2], [3, -7, 11], dtype=np.int64)
+    before = _snapshot(s)
+    h = history.History(s)
+    h.multiply(0.5)
+    assert s.vals.dtype.kind == "f"
+    h.multiply(0)
+    h.undo()
+    h.undo()
+    _assert_same(s, before)
+    h.redo()
+    np.testing.assert_array_equal(s.vals, [1.5, -3.5, 5.5])
+
+
+def test_new_operation_clears_redo(rng):
+    s = logic.Signal(np.arange(10), rng.standard_normal(10))
+    h = history.History(s)
+    h.shift(1)
+    h.undo()
+    h.fold()
+    assert not h.can_redo
+
+
+def test_change_behind_the_history_clears_it(rng):
+    s = logic.Signal(np.arange(10), rng.standard_normal(10))
+    h = history.History(s)
+    h.shift(1)
+    s.shift(5)
+    assert h.undo() is None
+    assert len(h) == 0
+    np.testing.assert_array_equal(s.idxs, np.arange(6, 16))
+
+
+def test_apply_without_a_change_records_nothing(rng):
+    s = logic.Signal(np.arange(10), rng.standard_normal(10))
+    h = history.History(s)
+    h.apply("nothing", lambda: None)
+    assert len(h) == 0
+
+
+def test_states_are_dropped_oldest_first_over_max_bytes(rng):
+    s = logic.Signal(np.arange(1000), rng.standard_normal(1000))
+    h = history.History(s, max_bytes=3 * 16000)
+    for k in range(6):
+        h.apply(f"set {k}", s.set, np.arange(1000), rng.standard_normal(1000))
+        h.shift(1)
+        assert h.nbytes() <= h.max_bytes
+    # the undo history ends where the oldest kept state was dropped
+    names = []
+    while True:
+        name = h.undo()
+        if name is None:
+            break
+        names.append(name)
+    assert names[-1] != "set 0"
+    assert names[:2] == ["shift +1", "set 5"]
+
+
+def test_exact_multiply_falls_back_to_its_record_over_max_bytes(rng):
+    s = logic.Signal(np.arange(1000), rng.standard_normal(1000))
+    h = history.History(s, max_bytes=10000)
+    h.multiply(4.0, exact=True)
+    h.multiply(0.25, exact=True)
+    assert len(h) == 2 and h.nbytes() <= h.max_bytes
+    h.undo()
+    h.undo()
+    assert not h.can_undo
+
+
+def test_max_records(rng):
+    s = logic.Signal(np.arange(10), rng.standard_normal(10))
+    h = history.History(s, max_records=3)
+    for _ in range(5):
+        h.shift(1)
+    assert len(h) == 3
@@ -0,0 +1,39 @@
+"""Call statistics recorded by the instrumentation."""
+import numpy as np
+import pytest
+
+import instrument
+import logic
+
+
+@pytest.fixture
+def enabled():
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def test_pair_results_count_as_one_signal(enabled, rng):
+    vals = rng.standard_normal(100)
+    logic.convolve_signals(vals, np.ones(5), method="direct")
+    s = instrument.stats()["convolve_signals"]
+    assert s["calls"] == 1
+    assert s["in_samples"] == 105
+    assert s["out_samples"] == 104
+
+
+def test_read_signal_counts_samples(enabled, tmp_path):
+    path = str(tmp_path / "sig.txt")
+    logic.write_signal(path, np.arange(50), np.ones(50))
+    logic.read_signal(path)
+    assert instrument.stats()["read_signal"]["out_samples"] == 50
+
+
+def test_disable_restores_the_originals():
+    original = logic.moving_average
+    instrument.enable()
+    assert logic.moving_average is not original
+    instrument.disable()
+    assert logic.moving_average is original
@@ -0,0 +1,128 @@
+"""Reading and writing signal files."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _write(tmp_path, body, name="sig.txt"):
+    path = tmp_path / name
+    path.write_bytes(body)
+    return str(path)
+
+
+def test_read_signal(tmp_path):
+    path = _write(tmp_path, b"0\n0\n3\n-1 2.5\n0 3\n4 -1e3\n")
+    idxs, vals = logic.read_signal(path)
+    assert idxs.dtype == np.int64
+    np.testing.assert_array_equal(idxs, [-1, 0, 4])
+    np.testing.assert_array_equal(vals, [2.5, 3, -1000])
+
+
+def test_read_signal_crlf_and_extra_whitespace(tmp_path):
+    path = _write(tmp_path, b"0\r\n0\r\n3\r\n 1 2\r\n3\t4 \r\n5 6")
+    idxs, vals = logic.read_signal(path)
+    np.testing.assert_array_equal(idxs, [1, 3, 5])
+    np.testing.assert_array_equal(vals, [2, 4, 6])
+
+
+@pytest.mark.parametrize("body, line", [
+    (b"1 2 3\n4\n5 6\n", 4),
+    (b"1\n2 3 4\n5 6\n", 4),
+    (b"1 2\n\n5 6\n", 5),
+    (b"1 2\n3 x\n5 6\n", 5),
+    (b"1 2\n1.5 4\n5 6\n", 5),
+    (b"1 2\n9223372036854775808 4\n5 6\n", 5),
+])
+def test_read_signal_malformed_line(tmp_path, body, line):
+    path = _write(tmp_path, b"0\n0\n3\n" + body)
+    with pytest.raises(ValueError, match=f":{line}:"):
+        logic.read_signal(path)
+
+
+def test_read_signal_short_file(tmp_path):
+    path = _write(tmp_path, b"0\n0\n5\n1 2\n3 4\n")
+    with pytest.raises(ValueError, match="header says 5 samples but the file has 2"):
+        logic.read_signal(path)
+
+
+def test_read_signal_bad_count(tmp_path):
+    path = _write(tmp_path, b"0\n0\nthree\n1 2\n")
+    with pytest.raises(ValueError, match=":3:"):
+        logic.read_signal(path)
+
+
+def test_read_signal_indices_beyond_float_precision(tmp_path):
+    path = _write(tmp_path, b"0\n0\n3\n9007199254740993 1.5\n-9007199254740995 2\n5 3\n")
+    idxs, vals = logic.read_signal(path)
+    np.testing.assert_array_equal(idxs, [2 ** 53 + 1, -(2 ** 53) - 3, 5])
+    np.testing.assert_array_equal(vals, [1.5, 2, 3])
+
+
+def test_iter_signal_chunks_matches_read_signal(tmp_path):
+    rng = np.random.default_rng(0)
+    idxs = np.cumsum(rng.integers(1, 5, 1000)) - 500
+    vals = rng.standard_normal(1000)
+    path = str(tmp_path / "sig.txt")
+    logic.write_signal(path, idxs, vals)
+    blocks = list(logic.iter_signal_chunks(path, 97))
+    assert max(len(b[0]) for b in blocks) == 97
+    np.testing.assert_array_equal(np.concatenate([b[0] for b in blocks]), idxs)
+    np.testing.assert_array_equal(np.concatenate([b[1] for b in blocks]), vals)
+    read_idxs, read_vals = logic.read_signal(path)
+    np.testing.assert_array_equal(read_idxs, idxs)
+    np.testing.assert_array_equal(read_vals, vals)
+
+
+@pytest.mark.parametrize("idxs", [np.arange(-3, 997), np.cumsum(np.arange(1000)) - 7, np.zeros(0, dtype=np.int64)])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int32])
+def test_binary_round_trip(tmp_path, rng, idxs, dtype):
+    vals = rng.integers(-100, 100, len(idxs)).astype(dtype)
+    path = str(tmp_path / ("sig" + logic.BINARY_SIGNAL_EXT))
+    logic.write_signal_binary(path, idxs, vals, dtype)
+    read_idxs, read_vals = logic.read_signal(path)
+    np.testing.assert_array_equal(read_idxs, idxs)
+    np.testing.assert_array_equal(read_vals, vals)
+    assert read_vals.dtype == np.dtype(dtype)
+    if len(idxs):
+        assert not read_vals.flags.writeable
+
+
+def test_binary_contiguous_indices_are_not_stored(tmp_path):
+    dense = str(tmp_path / "a.sig")
+    sparse = str(tmp_path / "b.sig")
+    logic.write_signal_binary(dense, np.arange(100), np.ones(100))
+    logic.write_signal_binary(sparse, np.arange(100) * 2, np.ones(100))
+    assert (tmp_path / "b.sig").stat().st_size - (tmp_path / "a.sig").stat().st_size == 800
+
+
+def test_convert_text_to_binary(tmp_path, rng):
+    idxs = np.cumsum(rng.integers(1, 3, 500))
+    vals = rng.standard_normal(500)
+    txt = str(tmp_path / "sig.txt")
+    sig = str(tmp_path / "sig.sig")
+    logic.write_signal(txt, idxs, vals)
+    logic.convert_text_to_binary(txt, sig, chunk_size=33)
+    read_idxs, read_vals = logic.read_signal(sig)
+    np.testing.assert_array_equal(read_idxs, idxs)
+    np.testing.assert_array_equal(read_vals, vals)
+    assert sum(len(b[0]) for b in logic.iter_signal_chunks(sig, 64)) == 500
+
+
+def test_binary_rejects_other_files(tmp_path):
+    path = _write(tmp_path, b"0\n0\n1\n1 2\n" + b" " * 40, "fake.sig")
+    with pytest.raises(ValueError, match="not a binary signal file"):
+        logic.read_signal(path)
+    path = _write(tmp_path, b"DSPS", "short.sig")
+    with pytest.raises(ValueError, match="truncated"):
+        logic.read_signal(path)
+
+
+def test_signal_from_binary_file_does_not_keep_the_map(tmp_path):
+    path = str(tmp_path / "sig.sig")
+    logic.write_signal_binary(path, [0, 3, 7], [1.0, 2, 3])
+    idxs, vals = logic.read_signal(path)
+    s = logic.Signal()
+    logic.add_signal(idxs, vals, s)
+    assert not np.shares_memory(s.vals, vals)
+    assert not np.shares_memory(s.idxs, idxs)
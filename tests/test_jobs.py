@@ -0,0 +1,96 @@
+"""Background jobs and the progress reporting of the long operations."""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import jobs
+import logic
+
+
+class FakeRoot:
+    """Stands in for the Tk root: after() queues, pump() runs the queue."""
+
+    def __init__(self):
+        self.queue = []
+
+    def after(self, ms, func):
+        self.queue.append(func)
+
+    def pump(self, timeout=10):
+        end = time.time() + timeout
+        while self.queue and time.time() < end:
+            self.queue.pop(0)()
+            time.sleep(0.001)
+
+
+def test_run_job_delivers_the_result():
+    root = FakeRoot()
+    results = []
+    jobs.run_job(root, lambda x, progress: progress(0.5) or x * 2, 21, on_done=results.append)
+    root.pump()
+    assert results == [42]
+
+
+def test_run_job_reports_errors():
+    root = FakeRoot()
+    errors = []
+
+    def fail(progress):
+        raise ValueError("boom")
+    jobs.run_job(root, fail, on_error=errors.append, on_done=pytest.fail)
+    root.pump()
+    assert len(errors) == 1 and str(errors[0]) == "boom"
+
+
+def test_cancel_stops_at_the_next_progress_report():
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(progress):
+        started.set()
+        release.wait(5)
+        progress(0.5)
+        return "finished"
+    root = FakeRoot()
+    cancelled = []
+    job = jobs.run_job(root, work, on_cancel=lambda: cancelled.append(True), on_done=pytest.fail)
+    started.wait(5)
+    job.cancel()
+    release.set()
+    root.pump()
+    assert job.cancelled and cancelled == [True] and job.result is None
+
+
+def test_progress_does_not_change_results(rng, monkeypatch):
+    monkeypatch.setattr(logic, "PROGRESS_CHUNK_SIZE", 64)
+    x = rng.standard_normal(5000)
+    reports = []
+    out = logic.moving_average(x, 9, "centered", progress=reports.append)
+    np.testing.assert_array_equal(out, logic.moving_average(x, 9, "centered"))
+    assert len(reports) > 1 and reports[-1] == 1
+
+    reports.clear()
+    kernel = rng.standard_normal(40)
+    vals, _ = logic.convolve_signals(x, kernel, "overlap_add", progress=reports.append)
+    np.testing.assert_array_equal(vals, logic.convolve_signals(x, kernel, "overlap_add")[0])
+    assert reports[-1] == 1
+
+
+def test_spectrum_cache_shared_between_threads(rng):
+    cache = logic.SpectrumCache(maxsize=4)
+    signals = [logic.Signal(np.arange(128), rng.standard_normal(128)) for _ in range(8)]
+    kinds = logic.SpectrumCache.KINDS
+
+    def work():
+        for i in range(200):
+            cache.get(signals[i % 8], kinds[i % 4])
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    info = cache.info()
+    assert info.currsize <= 4
+    assert info.nbytes == sum(e.nbytes for e in cache._entries.values())
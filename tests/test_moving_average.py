@@ -0,0 +1,37 @@
+"""moving_average and its resumable state."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _moving_average_reference(x, w, mode):
+    if mode == "valid":
+        return np.convolve(x, np.ones(w), "valid") / w
+    before = (w - 1) // 2 if mode == "centered" else w - 1
+    after = w - 1 - before
+    return np.array([x[max(i - before, 0):i + after + 1].mean() for i in range(len(x))])
+
+
+@pytest.mark.parametrize("mode", logic.MOVING_AVERAGE_MODES)
+@pytest.mark.parametrize("w", [1, 2, 5, 64])
+def test_moving_average_matches_reference(rng, mode, w):
+    x = rng.standard_normal(300)
+    np.testing.assert_allclose(logic.moving_average(x, w, mode), _moving_average_reference(x, w, mode),
+                               rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("mode", logic.MOVING_AVERAGE_MODES)
+def test_moving_average_state_chunks_match_batch(rng, mode):
+    x = rng.standard_normal(1000)
+    state = logic.MovingAverageState(7, mode)
+    out = [state.process(x[i:i + 37]) for i in range(0, len(x), 37)]
+    np.testing.assert_array_equal(np.concatenate(out + [state.flush()]),
+                                  logic.moving_average(x, 7, mode))
+
+
+def test_moving_average_rejects_bad_window():
+    with pytest.raises(ValueError):
+        logic.moving_average(np.ones(3), 4)
+    with pytest.raises(ValueError):
+        logic.moving_average(np.ones(3), 0)
@@ -0,0 +1,75 @@
+"""The streaming pipeline against the batch functions it claims to match."""
+import numpy as np
+import pytest
+
+import logic
+import pipeline
+
+
+def _blocks(idxs, vals, size):
+    return [(idxs[i:i + size], vals[i:i + size]) for i in range(0, len(vals), size)]
+
+
+@pytest.fixture
+def signal(rng):
+    idxs = np.cumsum(rng.integers(1, 3, 2000)) - 100
+    return idxs, rng.standard_normal(2000)
+
+
+@pytest.mark.parametrize("mode", logic.MOVING_AVERAGE_MODES)
+@pytest.mark.parametrize("size", [1, 7, 256, 5000])
+def test_moving_average_then_derivative_is_bit_identical(signal, mode, size):
+    idxs, vals = signal
+    chain = pipeline.Pipeline(pipeline.ScaleBlock(0.5), pipeline.MovingAverageBlock(9, mode),
+                              pipeline.FirstDerivativeBlock())
+    out_idxs, out_vals = chain.run(_blocks(idxs, vals, size))
+
+    averaged = logic.moving_average(vals * 0.5, 9, mode)
+    averaged_idxs = idxs[8:] if mode == "valid" else idxs
+    np.testing.assert_array_equal(out_vals, logic.first_derivative(averaged))
+    np.testing.assert_array_equal(out_idxs, averaged_idxs[1:])
+
+
+@pytest.mark.parametrize("size", [1, 3, 100])
+def test_second_derivative_is_bit_identical(signal, size):
+    idxs, vals = signal
+    out_idxs, out_vals = pipeline.Pipeline(pipeline.SecondDerivativeBlock()).run(_blocks(idxs, vals, size))
+    np.testing.assert_array_equal(out_vals, logic.second_derivative(vals))
+    np.testing.assert_array_equal(out_idxs, idxs[1:-1])
+
+
+@pytest.mark.parametrize("size", [1, 10, 333])
+def test_direct_convolution_is_bit_identical(signal, rng, size):
+    idxs, vals = signal
+    kernel = rng.standard_normal(25)
+    out_idxs, out_vals = pipeline.Pipeline(pipeline.ConvolveBlock(kernel)).run(_blocks(idxs, vals, size))
+    batch_vals, batch_idxs = logic.convolve_signals(vals, kernel, method="direct")
+    np.testing.assert_array_equal(out_vals, batch_vals)
+    np.testing.assert_array_equal(out_idxs, batch_idxs)
+
+
+def test_overlap_add_convolution_matches(signal, rng):
+    idxs, vals = signal
+    kernel = rng.standard_normal(25)
+    block = pipeline.ConvolveBlock(kernel, method="overlap_add")
+    out_idxs, out_vals = pipeline.Pipeline(block).run(_blocks(idxs, vals, 100))
+    np.testing.assert_allclose(out_vals, np.convolve(vals, kernel), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(out_idxs, np.arange(len(vals) + 24))
+
+
+def test_run_from_a_file_into_a_sink(tmp_path, signal):
+    idxs, vals = signal
+    path = str(tmp_path / "sig.txt")
+    logic.write_signal(path, idxs, vals)
+    received = []
+    chain = pipeline.Pipeline(pipeline.MovingAverageBlock(5))
+    result = chain.run(logic.iter_signal_chunks(path, 300), sink=lambda i, v: received.append(v))
+    assert result is None
+    np.testing.assert_array_equal(np.concatenate(received), logic.moving_average(vals, 5))
+
+
+def test_short_streams_raise_like_the_batch_functions():
+    with pytest.raises(ValueError):
+        pipeline.Pipeline(pipeline.MovingAverageBlock(5)).run([(np.arange(3), np.ones(3))])
+    with pytest.raises(ValueError):
+        pipeline.Pipeline(pipeline.SecondDerivativeBlock()).run([(np.arange(2), np.ones(2))])
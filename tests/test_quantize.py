@@ -0,0 +1,70 @@
+"""Uniform quantization and the bit-packed code storage."""
+import numpy as np
+import pytest
+
+import logic
+
+
+@pytest.mark.parametrize("bits", [1, 3, 7, 8, 9, 12, 16, 17, 31, 33, 53])
+def test_pack_unpack_round_trip(rng, bits):
+    codes = rng.integers(0, 1 << bits, 1001, dtype=np.uint64).astype(logic.code_dtype(1 << bits))
+    packed = logic.pack_codes(codes, bits)
+    assert packed.dtype == np.uint8 and len(packed) == -(-len(codes) * bits // 8)
+    unpacked = logic.unpack_codes(packed, bits, len(codes))
+    assert unpacked.dtype == codes.dtype
+    np.testing.assert_array_equal(unpacked, codes)
+
+
+@pytest.mark.parametrize("levels, dtype", [(2, np.uint8), (256, np.uint8), (257, np.uint16),
+                                           (1 << 16, np.uint16), ((1 << 16) + 1, np.uint32)])
+def test_code_dtype(levels, dtype):
+    assert logic.code_dtype(levels) == dtype
+
+
+@pytest.mark.parametrize("kind", logic.QUANTIZER_KINDS)
+@pytest.mark.parametrize("levels", [2, 5, 256])
+def test_quantize_signal(rng, kind, levels):
+    x = rng.uniform(-3, 5, 2000)
+    quantized, error, codes = logic.quantize_signal(x, levels=levels, kind=kind)
+    np.testing.assert_array_equal(error, x - quantized)
+    assert codes.min() >= 0 and codes.max() <= levels - 1
+    if kind == "mid_rise":
+        step = (x.max() - x.min()) / levels
+        np.testing.assert_allclose(quantized, x.min() + (codes + 0.5) * step)
+    else:
+        step = (x.max() - x.min()) / (levels - 1)
+        np.testing.assert_allclose(quantized, x.min() + codes * step)
+    assert np.abs(error).max() <= step / 2 * (1 + 1e-9)
+
+
+def test_quantize_signal_packed_codes(rng):
+    x = rng.standard_normal(777)
+    _, _, codes = logic.quantize_signal(x, bits=5)
+    _, _, packed = logic.quantize_signal(x, bits=5, pack=True)
+    np.testing.assert_array_equal(logic.unpack_codes(packed, 5, len(x)), codes)
+
+
+def test_quantize_signal_value_range_clips():
+    quantized, _, codes = logic.quantize_signal([-10.0, 0.5, 10.0], levels=2, value_range=(0, 1))
+    np.testing.assert_array_equal(codes, [0, 1, 1])
+    np.testing.assert_array_equal(quantized, [0.25, 0.75, 0.75])
+
+
+def test_quantize_signal_constant_input():
+    quantized, error, codes = logic.quantize_signal([2.0, 2.0], bits=3)
+    np.testing.assert_array_equal(quantized, [2, 2])
+    np.testing.assert_array_equal(codes, [0, 0])
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"bits": 2, "levels": 4}, {"bits": 0}, {"bits": 54},
+                                    {"levels": 1}, {"levels": 2 ** 53 + 1}, {"bits": 2, "kind": "x"}])
+def test_quantize_signal_rejects(kwargs):
+    with pytest.raises(ValueError):
+        logic.quantize_signal([0.0, 1.0], **kwargs)
+
+
+def test_53_bits_is_exact(rng):
+    x = rng.standard_normal(100)
+    quantized, error, codes = logic.quantize_signal(x, bits=53)
+    assert codes.dtype == np.uint64 and codes.max() <= 2 ** 53 - 1
+    assert np.abs(error).max() < 1e-12
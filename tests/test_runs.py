@@ -0,0 +1,103 @@
+"""Run-length index storage and index-aware convolution of RunSignals."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _random_runs(rng, nruns, max_length, max_gap):
+    lengths = rng.integers(1, max_length + 1, nruns)
+    gaps = rng.integers(1, max_gap + 1, nruns)
+    starts = np.cumsum(lengths + gaps) - lengths - 50
+    return logic.RunSignal(starts, lengths, rng.standard_normal(lengths.sum()))
+
+
+def _brute_convolve(x, y):
+    out = {}
+    for i, a in zip(x.idxs.tolist(), x.vals):
+        for j, b in zip(y.idxs.tolist(), y.vals):
+            out[i + j] = out.get(i + j, 0.0) + a * b
+    idxs = np.array(sorted(out), dtype=np.int64)
+    return idxs, np.array([out[i] for i in idxs.tolist()])
+
+
+def test_from_arrays_groups_consecutive_indices():
+    run = logic.RunSignal.from_arrays([0, 1, 2, 10 ** 9, 10 ** 9 + 1, 5], [1.0, 2, 3, 4, 5, 6])
+    np.testing.assert_array_equal(run.starts, [0, 5, 10 ** 9])
+    np.testing.assert_array_equal(run.lengths, [3, 1, 2])
+    np.testing.assert_array_equal(run.idxs, [0, 1, 2, 5, 10 ** 9, 10 ** 9 + 1])
+    np.testing.assert_array_equal(run.vals, [1, 2, 3, 6, 4, 5])
+
+
+def test_from_arrays_sums_repeats_and_drops_zeros():
+    run = logic.RunSignal.from_arrays([3, 1, 3, 2, 4], [1.0, 0, 2, 5, 0], drop_zeros=True)
+    np.testing.assert_array_equal(run.idxs, [2, 3])
+    np.testing.assert_array_equal(run.vals, [5, 3])
+
+
+def test_signal_round_trip(rng):
+    s = logic.Signal(np.cumsum(rng.integers(1, 4, 300)), rng.standard_normal(300))
+    back = logic.RunSignal.from_signal(s).to_signal()
+    np.testing.assert_array_equal(back.idxs, s.idxs)
+    np.testing.assert_array_equal(back.vals, s.vals)
+
+
+def test_shift_and_fold(rng):
+    run = _random_runs(rng, 20, 5, 10 ** 6)
+    idxs, vals, version = run.idxs, run.vals.copy(), run.version
+    run.shift(-7)
+    assert run.version != version
+    np.testing.assert_array_equal(run.idxs, idxs - 7)
+    run.fold()
+    np.testing.assert_array_equal(run.idxs, (7 - idxs)[::-1])
+    np.testing.assert_array_equal(run.vals, vals[::-1])
+
+
+def test_add_runs_matches_dense_sum(rng):
+    x = _random_runs(rng, 30, 6, 4)
+    y = _random_runs(rng, 25, 8, 3)
+    total = logic.add_runs([x, y], weights=[2.0, -1.0])
+    expected = logic.Signal()
+    logic.add_signal(x.idxs, 2 * x.vals, expected)
+    logic.add_signal(y.idxs, -y.vals, expected)
+    np.testing.assert_array_equal(total.idxs, expected.idxs)
+    np.testing.assert_allclose(total.vals, expected.vals, rtol=0, atol=1e-12)
+    assert np.all(total.starts[1:] > total.starts[:-1] + total.lengths[:-1])
+
+
+def test_add_signal_into_a_run_target():
+    target = logic.RunSignal([0], [2], [1.0, 1.0])
+    logic.add_signal([1, 10 ** 9], [2.0, 3.0], target)
+    np.testing.assert_array_equal(target.idxs, [0, 1, 10 ** 9])
+    np.testing.assert_array_equal(target.vals, [1, 3, 3])
+
+
+@pytest.mark.parametrize("shape", [(3, 50, 10 ** 6), (10, 5, 2), (40, 1, 1), (1, 200, 1)])
+def test_convolve_runs_matches_brute_force(rng, shape):
+    x = _random_runs(rng, *shape)
+    y = _random_runs(rng, 7, 4, 30)
+    expected_idxs, expected_vals = _brute_convolve(x, y)
+    for first, second in ((x, y), (y, x)):
+        out = logic.convolve_runs(first, second)
+        np.testing.assert_array_equal(out.idxs, expected_idxs)
+        np.testing.assert_allclose(out.vals, expected_vals, rtol=0, atol=1e-9)
+
+
+def test_convolve_runs_dense_fallback(rng, monkeypatch):
+    # make the run loop look expensive so the span convolution is used
+    monkeypatch.setattr(logic, "RUN_CONV_SAMPLE_COST", 10 ** 9)
+    x = _random_runs(rng, 15, 3, 5)
+    y = _random_runs(rng, 10, 2, 4)
+    expected_idxs, expected_vals = _brute_convolve(x, y)
+    out = logic.convolve_runs(x, y)
+    np.testing.assert_array_equal(out.idxs, expected_idxs)
+    np.testing.assert_allclose(out.vals, expected_vals, rtol=0, atol=1e-9)
+
+
+def test_rejects():
+    with pytest.raises(ValueError):
+        logic.RunSignal([0, 5], [2], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        logic.RunSignal([0], [3], [1.0])
+    with pytest.raises(ValueError):
+        logic.convolve_runs(logic.RunSignal(), logic.RunSignal([0], [1], [1.0]))
@@ -0,0 +1,147 @@
+"""The Signal type and the operations that accumulate into it."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def test_set_sorts_and_sums_repeated_indices():
+    s = logic.Signal([2, 0, 1, 1], [1.0, 2, 3, 4])
+    np.testing.assert_array_equal(s.idxs, [0, 1, 2])
+    np.testing.assert_array_equal(s.vals, [2, 7, 1])
+
+
+def test_set_rejects_mismatched_lengths():
+    with pytest.raises(ValueError):
+        logic.Signal().set([0, 1], [1.0])
+
+
+def test_mutations_change_the_version():
+    s = logic.Signal([0, 1], [1.0, 2])
+    versions = {s.version}
+    for op in (lambda: s.shift(1), s.fold, lambda: logic.multiply(s, 2),
+               lambda: logic.add_signal([5], [1.0], s)):
+        op()
+        assert s.version not in versions
+        versions.add(s.version)
+    copy = s.copy()
+    assert copy.version == s.version
+
+
+def test_multiply_promotes_integer_signals():
+    s = logic.Signal([0, 1], [1, 2], dtype=np.int64)
+    logic.multiply(s, 0.5)
+    assert s.dtype == np.float64
+    np.testing.assert_array_equal(s.vals, [0.5, 1])
+
+    s = logic.Signal([0, 1], [1, 2], dtype=np.int64)
+    logic.multiply(s, 3)
+    assert s.dtype == np.int64
+    np.testing.assert_array_equal(s.vals, [3, 6])
+
+    s = logic.Signal([0, 1], [1, 2], dtype=np.float32)
+    logic.multiply(s, 0.5)
+    assert s.dtype == np.float32
+
+
+def test_adding_floats_promotes_integer_signals():
+    s = logic.Signal([0, 1], [1, 2], dtype=np.int64)
+    logic.add_signal([1, 2], [0.5, 0.5], s)
+    np.testing.assert_array_equal(s.vals, [1, 2.5, 0.5])
+
+    s = logic.Signal([0, 1], [1, 2], dtype=np.int64)
+    logic.add_signals([([1, 2], [0.5, 0.5])], target=s)
+    np.testing.assert_array_equal(s.vals, [1, 2.5, 0.5])
+
+
+def test_add_signal_into_empty_target_copies_the_input():
+    idxs, vals = np.arange(3), np.ones(3)
+    s = logic.Signal()
+    logic.add_signal(idxs, vals, s)
+    version = s.version
+    vals[:] = 5
+    idxs[:] = 7
+    np.testing.assert_array_equal(s.idxs, [0, 1, 2])
+    np.testing.assert_array_equal(s.vals, [1, 1, 1])
+    assert s.version == version
+
+
+def _reference_fold_shift(idxs, vals, ops):
+    pairs = dict(zip(idxs.tolist(), vals.tolist()))
+    for op, k in ops:
+        pairs = {(-i if op == "fold" else i + k): v for i, v in pairs.items()}
+    keys = sorted(pairs)
+    return np.array(keys), np.array([pairs[i] for i in keys])
+
+
+def test_shift_and_fold_match_rewriting_every_index(rng):
+    idxs = np.cumsum(rng.integers(1, 4, 50)) - 60
+    vals = rng.standard_normal(50)
+    s = logic.Signal(idxs, vals)
+    ops = [("shift", 3), ("fold", 0), ("shift", -7), ("fold", 0), ("fold", 0), ("shift", 2)]
+    for op, k in ops:
+        if op == "fold":
+            logic.fold_signal(s)
+        else:
+            logic.advance_signal(s, k)
+    ref_idxs, ref_vals = _reference_fold_shift(idxs, vals, ops)
+    np.testing.assert_array_equal(s.idxs, ref_idxs)
+    np.testing.assert_array_equal(s.vals, ref_vals)
+
+    s.materialize()
+    assert (s.offset, s.sign) == (0, 1)
+    np.testing.assert_array_equal(s.idxs, ref_idxs)
+    np.testing.assert_array_equal(s.vals, ref_vals)
+
+
+def test_delay_is_a_negative_advance():
+    s = logic.Signal([0, 1], [1.0, 2])
+    logic.delay_signal(s, 3)
+    np.testing.assert_array_equal(s.idxs, [-3, -2])
+
+
+def test_add_into_a_folded_signal():
+    s = logic.Signal([0, 1, 2], [1.0, 2, 3])
+    s.fold()
+    logic.add_signal([-2, 5], [10.0, 1], s)
+    np.testing.assert_array_equal(s.idxs, [-2, -1, 0, 5])
+    np.testing.assert_array_equal(s.vals, [13, 2, 1, 1])
+
+
+def test_add_signal_sums_repeated_input_indices():
+    s = logic.Signal()
+    logic.add_signal([2, 2], [1.0, 1], s)
+    np.testing.assert_array_equal(s.idxs, [2])
+    np.testing.assert_array_equal(s.vals, [2])
+
+    s = logic.Signal([1, 2], [1.0, 1])
+    logic.add_signal([3, 3, 2, 0, 0], [1.0, 1, 1, 1, 1], s)
+    np.testing.assert_array_equal(s.idxs, [0, 1, 2, 3])
+    np.testing.assert_array_equal(s.vals, [2, 1, 2, 2])
+
+
+def test_add_signals_matches_one_add_at_a_time(rng):
+    signals = [(rng.integers(-50, 50, n), rng.standard_normal(n)) for n in (30, 1, 200, 0, 75)]
+    weights = [1, -1, 0.5, 2, -3]
+    batch = logic.Signal([0, 7], [1.0, 2])
+    logic.add_signals(signals, weights, batch)
+
+    one_by_one = logic.Signal([0, 7], [1.0, 2])
+    for (idxs, vals), w in zip(signals, weights):
+        logic.add_signal(idxs, np.asarray(vals) * w, one_by_one)
+    np.testing.assert_array_equal(batch.idxs, one_by_one.idxs)
+    np.testing.assert_allclose(batch.vals, one_by_one.vals, rtol=0, atol=1e-12)
+
+
+def test_add_signals_checks_its_arguments():
+    with pytest.raises(ValueError):
+        logic.add_signals([([0], [1.0])], weights=[1, 2], target=logic.Signal())
+    with pytest.raises(ValueError):
+        logic.add_signals([([0, 1], [1.0])], target=logic.Signal())
+
+
+def test_sub_signal():
+    s = logic.Signal([0, 1], [1.0, 2])
+    logic.sub_signal([1, 2], [2.0, 3], s)
+    np.testing.assert_array_equal(s.idxs, [0, 1, 2])
+    np.testing.assert_array_equal(s.vals, [1, 0, -3])
@@ -0,0 +1,68 @@
+"""SlidingDFT against a full transform of the current window."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _assert_close(actual, expected):
+    scale = max(np.abs(expected).max(initial=0.0), 1.0)
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9 * scale)
+
+
+@pytest.mark.parametrize("N", [1, 8, 12, 97])
+def test_update_matches_dft_of_window(rng, N):
+    x = rng.standard_normal(N + 300)
+    sdft = logic.SlidingDFT(x[:N], resync_every=10 ** 9)
+    for i in range(N, len(x)):
+        spectrum = sdft.update(x[i])
+    np.testing.assert_array_equal(sdft.window, x[-N:])
+    _assert_close(spectrum, np.fft.fft(x[-N:]))
+
+
+@pytest.mark.parametrize("L", [1, 5, 63, 64, 200])
+def test_extend_matches_dft_of_window(rng, L):
+    N = 64
+    x = rng.standard_normal(N + 3 * L)
+    sdft = logic.SlidingDFT(x[:N])
+    for start in range(N, len(x), L):
+        sdft.extend(x[start:start + L])
+    np.testing.assert_array_equal(sdft.window, x[-N:])
+    _assert_close(sdft.spectrum, np.fft.fft(x[-N:]))
+
+
+def test_bin_subset(rng):
+    x = rng.standard_normal(500)
+    bins = [0, 3, -1]
+    sdft = logic.SlidingDFT(x[:50], bins=bins)
+    for v in x[50:300]:
+        sdft.update(v)
+    sdft.extend(x[300:])
+    _assert_close(sdft.spectrum, np.fft.fft(x[-50:])[bins])
+
+
+def test_complex_samples(rng):
+    x = rng.standard_normal(40) + 1j * rng.standard_normal(40)
+    sdft = logic.SlidingDFT(x[:16])
+    sdft.extend(x[16:])
+    _assert_close(sdft.spectrum, np.fft.fft(x[-16:]))
+
+
+def test_resync_bounds_the_drift(rng):
+    x = rng.standard_normal(20000) * 1e6
+    sdft = logic.SlidingDFT(x[:32], resync_every=32)
+    for v in x[32:]:
+        sdft.update(v)
+    np.testing.assert_allclose(sdft.spectrum, np.fft.fft(x[-32:]), rtol=0, atol=1e-6)
+
+
+def test_spectrum_is_read_only(rng):
+    sdft = logic.SlidingDFT(rng.standard_normal(8))
+    with pytest.raises(ValueError):
+        sdft.spectrum[0] = 0
+
+
+@pytest.mark.parametrize("args", [([],), ([1.0, 2.0], None, 0)])
+def test_rejects(args):
+    with pytest.raises(ValueError):
+        logic.SlidingDFT(*args)
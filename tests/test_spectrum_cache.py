@@ -0,0 +1,66 @@
+"""The versioned spectrum cache."""
+import numpy as np
+import pytest
+
+import logic
+
+
+@pytest.fixture
+def signal(rng):
+    return logic.Signal(np.arange(64), rng.integers(-9, 9, 64).astype(float))
+
+
+def test_repeated_requests_hit(signal):
+    cache = logic.SpectrumCache()
+    first = cache.get(signal, "dft")
+    assert cache.get(signal, "dft") is first
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    np.testing.assert_allclose(first, np.fft.fft(signal.vals), atol=1e-9)
+    assert not first.flags.writeable
+
+
+def test_derived_kinds_reuse_the_spectrum(signal):
+    cache = logic.SpectrumCache()
+    X = cache.get(signal, "dft")
+    np.testing.assert_array_equal(cache.get(signal, "magnitude"), np.abs(X))
+    np.testing.assert_array_equal(cache.get(signal, "phase"), np.angle(X))
+    np.testing.assert_array_equal(cache.get(signal, "idft"), signal.vals.astype(np.int64))
+    assert cache.info().misses == 4 and cache.info().hits == 3
+
+
+def test_mutation_invalidates(signal):
+    cache = logic.SpectrumCache()
+    before = cache.get(signal, "dft")
+    logic.multiply(signal, 2)
+    after = cache.get(signal, "dft")
+    np.testing.assert_allclose(after, 2 * before, atol=1e-9)
+    assert cache.info().misses == 2
+
+
+def test_padded_length(signal):
+    cache = logic.SpectrumCache()
+    X = cache.get(signal, "dft", n=100)
+    np.testing.assert_allclose(X, np.fft.fft(signal.vals, 100), atol=1e-9)
+
+
+def test_bounded_by_entries_and_bytes(rng):
+    signals = [logic.Signal(np.arange(64), rng.standard_normal(64)) for _ in range(5)]
+    cache = logic.SpectrumCache(maxsize=3)
+    for s in signals:
+        cache.get(s, "dft")
+    assert cache.info().currsize == 3
+    cache.get(signals[-1], "dft")
+    assert cache.info().hits == 1
+    cache.get(signals[0], "dft")
+    assert cache.info().misses == 6
+
+    cache = logic.SpectrumCache(max_bytes=64 * 16 * 2)
+    for s in signals:
+        cache.get(s, "dft")
+    assert cache.info().currsize == 2 and cache.info().nbytes == 64 * 16 * 2
+
+
+def test_unknown_kind(signal):
+    with pytest.raises(ValueError):
+        logic.SpectrumCache().get(signal, "cepstrum")
@@ -0,0 +1,67 @@
+"""Short-time Fourier transform and its overlap-add inverse."""
+import numpy as np
+import pytest
+
+import logic
+
+
+def _frame_reference(x, frame_length, hop, window):
+    pad = frame_length - hop
+    padded = np.concatenate((np.zeros(pad), x, np.zeros(frame_length)))
+    w = logic.window_function(window, frame_length)
+    frames = []
+    start = 0
+    while start < pad + len(x):
+        frames.append(np.fft.rfft(padded[start:start + frame_length] * w))
+        start += hop
+    return np.array(frames)
+
+
+@pytest.mark.parametrize("window", logic.WINDOW_TYPES)
+@pytest.mark.parametrize("n, frame_length, hop", [(1000, 64, 16), (999, 50, 25), (10, 16, 4), (300, 8, 8)])
+def test_stft_matches_framed_rfft(rng, window, n, frame_length, hop):
+    x = rng.standard_normal(n)
+    spectra, centres = logic.stft(x, frame_length, hop, window)
+    expected = _frame_reference(x, frame_length, hop, window)
+    assert spectra.shape == expected.shape
+    np.testing.assert_allclose(spectra, expected, rtol=0, atol=1e-10)
+    np.testing.assert_allclose(np.diff(centres), hop)
+    assert centres[0] == hop - frame_length + (frame_length - 1) / 2
+
+
+@pytest.mark.parametrize("window", logic.WINDOW_TYPES)
+@pytest.mark.parametrize("frame_length, hop", [(64, 16), (50, 25), (33, 10), (16, 15)])
+def test_istft_inverts_stft(rng, window, frame_length, hop):
+    x = rng.standard_normal(1234)
+    spectra, _ = logic.stft(x, frame_length, hop, window)
+    y = logic.istft(spectra, frame_length, hop, window, length=len(x))
+    np.testing.assert_allclose(y, x, rtol=0, atol=1e-10)
+
+
+def test_threaded_frames_are_identical(rng):
+    x = rng.standard_normal(50000)
+    reported = []
+    serial, _ = logic.stft(x, 256, 64)
+    threaded, _ = logic.stft(x, 256, 64, workers=3, progress=reported.append)
+    np.testing.assert_array_equal(threaded, serial)
+    assert reported[-1] == 1
+
+
+def test_tone_lands_in_its_bin():
+    x = logic.synthesize(4096, [(1.0, 32.0)], fs=256.0).vals
+    spectra, _ = logic.stft(x, 256, 64)
+    assert np.all(np.argmax(np.abs(spectra[4:-4]), axis=1) == 32)
+
+
+def test_empty_signal():
+    spectra, centres = logic.stft([], 16)
+    assert spectra.shape == (0, 9) and len(centres) == 0
+    assert len(logic.istft(spectra, 16)) == 0
+
+
+@pytest.mark.parametrize("kwargs", [{"frame_length": 0}, {"hop": 20}, {"window": "x"}])
+def test_rejects(kwargs):
+    args = {"frame_length": 16}
+    args.update(kwargs)
+    with pytest.raises(ValueError):
+        logic.stft(np.ones(100), **args)
@@ -0,0 +1,106 @@
+"""Ring buffers, incremental parsers and the live stream reader."""
+import numpy as np
+import pytest
+
+import logic
+import stream
+
+
+def test_ring_buffer_keeps_the_latest_samples():
+    buf = stream.RingBuffer(5)
+    assert len(buf) == 0 and len(buf.latest()[0]) == 0
+    buf.write(np.arange(3), np.arange(3) * 1.0)
+    buf.write(np.arange(3, 7), np.arange(3, 7) * 1.0)
+    assert len(buf) == 5 and buf.total == 7
+    idxs, vals = buf.latest()
+    np.testing.assert_array_equal(idxs, [2, 3, 4, 5, 6])
+    np.testing.assert_array_equal(vals, [2, 3, 4, 5, 6])
+    np.testing.assert_array_equal(buf.latest(2)[0], [5, 6])
+
+
+def test_ring_buffer_block_larger_than_capacity():
+    buf = stream.RingBuffer(4)
+    buf.write(np.arange(1), np.zeros(1))
+    buf.write(np.arange(1, 11), np.arange(1, 11) * 1.0)
+    assert buf.total == 11
+    np.testing.assert_array_equal(buf.latest()[0], [7, 8, 9, 10])
+    buf.clear()
+    assert len(buf) == 0
+
+
+def test_ring_buffer_rejects_zero_capacity():
+    with pytest.raises(ValueError):
+        stream.RingBuffer(0)
+
+
+def test_text_parser_joins_numbers_split_across_pieces():
+    parser = stream.make_parser("text")
+    got = [parser.feed(piece) for piece in (b"1.5 2", b"0 -3", b"\n4e", b"1\r\n5")]
+    got.append(parser.flush())
+    np.testing.assert_array_equal(np.concatenate(got), [1.5, 20, -3, 40, 5])
+
+
+def test_text_parser_rejects_garbage():
+    with pytest.raises(ValueError):
+        stream.make_parser("text").feed(b"1 x 2\n")
+
+
+@pytest.mark.parametrize("fmt, dtype", [("f32", "<f4"), ("f64", "<f8")])
+def test_binary_parser_joins_samples_split_across_pieces(fmt, dtype):
+    data = np.array([1.5, -2, 3e3], dtype=dtype).tobytes()
+    parser = stream.make_parser(fmt)
+    got = [parser.feed(data[i:i + 3]) for i in range(0, len(data), 3)]
+    np.testing.assert_array_equal(np.concatenate(got), [1.5, -2, 3e3])
+    assert len(parser.flush()) == 0
+    parser.feed(b"\0")
+    with pytest.raises(ValueError):
+        parser.flush()
+
+
+def test_open_source():
+    assert isinstance(stream.open_source("-"), stream.FileSource)
+    assert isinstance(stream.open_source("tcp.txt"), stream.FileSource)
+    with pytest.raises(ValueError):
+        stream.open_source("tcp:http")
+    with pytest.raises(ValueError):
+        stream.make_parser("f16")
+
+
+def test_live_stream_from_a_file(tmp_path, rng):
+    vals = np.round(rng.standard_normal(5000), 6)
+    path = tmp_path / "samples.txt"
+    path.write_text("\n".join(map(repr, vals.tolist())))
+    live = stream.LiveStream(str(path), capacity=1000, window_size=5).start()
+    live._thread.join(10)
+    assert not live.running and live.error is None and live.total == 5000
+
+    idxs, got = live.buffers["signal"].latest()
+    np.testing.assert_array_equal(idxs, np.arange(4000, 5000))
+    np.testing.assert_array_equal(got, vals[-1000:])
+    np.testing.assert_allclose(live.buffers["moving_avg"].latest()[1],
+                               logic.moving_average(vals, 5)[-1000:], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(live.buffers["first_deriv"].latest()[1],
+                                  logic.first_derivative(vals)[-1000:])
+    idxs, got = live.buffers["second_deriv"].latest()
+    np.testing.assert_array_equal(idxs, np.arange(3999, 4999))
+    np.testing.assert_array_equal(got, logic.second_derivative(vals)[-1000:])
+
+
+def test_live_stream_reports_errors(tmp_path):
+    path = tmp_path / "bad.txt"
+    path.write_text("1 2 oops 3\n")
+    live = stream.LiveStream(str(path)).start()
+    live._thread.join(10)
+    assert isinstance(live.error, ValueError)
+
+
+def test_rebased_moving_average_error_stays_bounded(rng):
+    w = 8
+    states = [logic.MovingAverageState(w), logic.MovingAverageState(w, rebase=True)]
+    for _ in range(200):
+        x = 1e6 + rng.standard_normal(10000)
+        outs = [state.process(x) for state in states]
+    exact = np.convolve(x, np.ones(w) / w, "valid")
+    plain, rebased = (np.abs(out[w - 1:] - exact).max() for out in outs)
+    assert rebased < 1e-5
+    assert rebased * 10 < plain
@@ -0,0 +1,63 @@
+"""Multi-tone synthesis against the per-sample formula."""
+import math
+
+import numpy as np
+import pytest
+
+import logic
+
+
+def _reference(num_samples, tones, fs, start=0):
+    out = []
+    for n in range(start, start + num_samples):
+        v = 0.0
+        for amplitude, freq, phase, kind in tones:
+            f = math.sin if kind == "sine" else math.cos
+            v += amplitude * f(2 * math.pi * freq * n / fs + phase)
+        out.append(v)
+    return np.array(out)
+
+
+TONES = [(1.0, 50.0, 0.0, "sine"), (0.5, 123.4, 1.0, "cosine"), (2.0, 0.0, 0.3, "sine")]
+
+
+@pytest.mark.parametrize("method", logic.SYNTHESIS_METHODS)
+@pytest.mark.parametrize("start", [0, -17, 10 ** 6])
+def test_matches_the_per_sample_formula(method, start):
+    s = logic.synthesize(3000, TONES, fs=1000.0, start=start, method=method)
+    np.testing.assert_array_equal(s.idxs, np.arange(start, start + 3000))
+    np.testing.assert_allclose(s.vals, _reference(3000, TONES, 1000.0, start), rtol=0, atol=1e-7)
+
+
+def test_methods_agree_across_blocks(rng):
+    tones = [(a, f, p) for a, f, p in rng.uniform(0, 1, (40, 3)) * [1, 500, 6]]
+    n = logic.SYNTHESIS_BLOCK_SIZE * 2 + 5
+    direct = logic.synthesize(n, tones, fs=1000.0)
+    recurrence = logic.synthesize(n, tones, fs=1000.0, method="recurrence")
+    np.testing.assert_allclose(recurrence.vals, direct.vals, rtol=0, atol=1e-9)
+
+
+def test_short_tones_default_to_sine_with_zero_phase():
+    np.testing.assert_array_equal(logic.synthesize(10, [(1.0, 0.1)], fs=1.0).vals,
+                                  logic.synthesize(10, [(1.0, 0.1, 0.0, "sine")], fs=1.0).vals)
+
+
+def test_noise_is_seeded():
+    a = logic.synthesize(100, [], noise=0.5, seed=3)
+    b = logic.synthesize(100, [], noise=0.5, seed=3)
+    np.testing.assert_array_equal(a.vals, b.vals)
+    assert 0.3 < a.vals.std() < 0.7
+
+
+def test_empty():
+    assert len(logic.synthesize(0, TONES)) == 0
+    np.testing.assert_array_equal(logic.synthesize(4, []).vals, np.zeros(4))
+
+
+@pytest.mark.parametrize("kwargs", [{"num_samples": -1}, {"fs": 0}, {"method": "x"},
+                                    {"tones": [(1.0,)]}, {"tones": [(1.0, 2.0, 0.0, "square")]}])
+def test_rejects(kwargs):
+    args = {"num_samples": 10, "tones": TONES}
+    args.update(kwargs)
+    with pytest.raises(ValueError):
+        logic.synthesize(**args)